@@ -0,0 +1,103 @@
+import asyncio
+import logging
+
+from googleapiclient.errors import HttpError
+
+import extract_data
+
+"""The --stream --async pipeline: fetch, score and write the source concurrently over an AsyncSheetsTransport."""
+
+logger = logging.getLogger(__name__)
+
+async def iter_source_windows_async(transport, window_rows=extract_data.DEFAULT_WINDOW_ROWS,
+                                    spreadsheet_id=extract_data.SOURCE_SPREADSHEET_ID, tab=extract_data.SOURCE_TAB,
+                                    fetch_ahead=2):
+    """Yield the validated source windows of extract_data.iter_valid_windows over an AsyncSheetsTransport.
+
+    ``fetch_ahead`` windows are requested at once, so up to ``fetch_ahead - 1``
+    requests past the last row are wasted while the rest overlap.
+    """
+    index = await asyncio.to_thread(extract_data.resolve_header_index, transport.service(), spreadsheet_id, tab)
+    if index is None:
+        return
+    validate = extract_data.window_validator(f'{spreadsheet_id}:{tab}')
+
+    async def fetch(start):
+        end = start + window_rows - 1
+        logger.info(f"Fetching rows {start}-{end} from spreadsheet ID: {spreadsheet_id}")
+        try:
+            with extract_data.get_metrics().stage('fetch'):
+                result = await transport.client.values_batch_get(
+                    spreadsheet_id, extract_data.window_ranges(index, tab, start, end), 'COLUMNS')
+        except HttpError as e:
+            if extract_data.past_last_row(e):
+                return None
+            raise
+        return extract_data.window_from_result(result)
+
+    start = 2  # Row 1 holds the header
+    while True:
+        starts = [start + n * window_rows for n in range(max(1, fetch_ahead))]
+        for window in await asyncio.gather(*map(fetch, starts)):
+            if window is None:
+                return
+            if validate is not None:
+                window = validate(window)
+            if window is not None:
+                yield window
+        start = starts[-1] + window_rows
+
+async def stream_async(transport, window_rows=extract_data.DEFAULT_WINDOW_ROWS, compact=False, observe=None,
+                       queue_size=2, fetch_ahead=2):
+    """Fetch, score and write the source as in extract_data.write_streaming, with the three stages overlapped.
+
+    Fetching runs on the transport's event loop while earlier windows are scored
+    and written on worker threads; bounded queues of ``queue_size`` chunks keep
+    a slow stage from letting windows pile up in memory. ``observe``, when given,
+    is called with every scored chunk (e.g. Rollup.add). Returns the number of
+    rows written and raises on failure.
+    """
+    service = transport.service()
+    windows, chunks = asyncio.Queue(queue_size), asyncio.Queue(queue_size)
+    done = object()
+
+    async def fetch():
+        async for window in iter_source_windows_async(transport, window_rows, fetch_ahead=fetch_ahead):
+            await windows.put(window)
+        await windows.put(done)
+
+    def score(window):
+        frame = extract_data.build_compact_frame(window) if compact else extract_data.build_frame(window)
+        chunk = extract_data.score_ratings(frame)
+        if observe is not None:
+            observe(chunk)
+        return chunk
+
+    async def transform():
+        while (window := await windows.get()) is not done:
+            await chunks.put(await asyncio.to_thread(score, window))
+        await chunks.put(done)
+
+    async def write():
+        written = 0
+        while (chunk := await chunks.get()) is not done:
+            if not await asyncio.to_thread(extract_data.write_chunk, service, chunk, written):
+                raise RuntimeError("Failed to write the first chunk to the target sheet")
+            written += len(chunk)
+            logger.info(f"Streamed {written} rows to target sheet")
+        return written
+
+    tasks = [asyncio.ensure_future(stage()) for stage in (fetch, transform, write)]
+    try:
+        return (await asyncio.gather(*tasks))[-1]
+    finally:
+        for task in tasks:
+            task.cancel()
+
+def run_stream_async(transport, window_rows=extract_data.DEFAULT_WINDOW_ROWS, compact=False, observe=None):
+    """Run stream_async to completion from blocking code; returns None on failure, like write_streaming."""
+    try:
+        return transport.run(stream_async(transport, window_rows, compact, observe))
+    except Exception as e:
+        logger.error(f"Failed to stream to target sheet: {str(e)}", exc_info=True)
+        return None
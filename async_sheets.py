@@ -0,0 +1,237 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import json
+import logging
+import threading
+from urllib.parse import quote, urlencode
+
+import httpx
+
+"""asyncio transport for the Google Sheets v4 REST endpoints this project uses.
+
+AsyncHTTPPool holds the pooled keep-alive connections of an httpx.AsyncClient,
+which like httplib2 honours the HTTP_PROXY/HTTPS_PROXY/NO_PROXY environment
+variables. AsyncSheetsClient maps the Sheets calls onto it and raises
+googleapiclient's HttpError on error statuses, so retry and error handling
+written for the blocking client apply unchanged. AsyncSheetsTransport runs both
+on a background event loop and hands out SyncSheetsService, a thin wrapper with
+the ``service.spreadsheets()...execute()`` interface of googleapiclient.
+"""
+
+logger = logging.getLogger(__name__)
+
+SHEETS_BASE_URL = 'https://sheets.googleapis.com'
+DEFAULT_MAX_CONNECTIONS = 10
+DEFAULT_TIMEOUT = 120.0
+# Far above a window of source rows, but a bound on what one response may hold in memory
+DEFAULT_MAX_RESPONSE_BYTES = 256 * 1024 * 1024
+USER_AGENT = 'sheet-extraction-async/1'
+
+class AsyncHTTPPool:
+    """Keep-alive HTTP connections (an httpx.AsyncClient), at most ``max_connections`` open at once.
+
+    Proxies come from the environment unless ``proxy`` names one for every
+    request. gzip bodies are decoded, and a body growing past
+    ``max_response_bytes`` once decoded is abandoned with a ValueError.
+    Timeouts are raised as TimeoutError and other transport failures as
+    ConnectionError, which RequestScheduler retries. Must be used from a
+    single event loop.
+    """
+
+    def __init__(self, max_connections=DEFAULT_MAX_CONNECTIONS, timeout=DEFAULT_TIMEOUT, ssl_context=None,
+                 proxy=None, max_response_bytes=DEFAULT_MAX_RESPONSE_BYTES):
+        self.max_response_bytes = max_response_bytes
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=timeout, verify=ssl_context or True, proxy=proxy, headers={'User-Agent': USER_AGENT})
+
+    async def request(self, method, url, headers=None, body=None):
+        """Send one request and return ``(status, headers, body)``; header names are lower-case."""
+        try:
+            async with self._client.stream(method, url, headers=headers, content=body) as response:
+                content = bytearray()
+                async for chunk in response.aiter_bytes():
+                    content += chunk
+                    if len(content) > self.max_response_bytes:
+                        raise ValueError(f"{method} {url} returned more than {self.max_response_bytes} bytes")
+                return response.status_code, dict(response.headers), bytes(content)
+        except httpx.TimeoutException as e:
+            raise TimeoutError(f"{method} {url} timed out: {str(e)}") from e
+        except httpx.TransportError as e:
+            raise ConnectionError(f"{method} {url} failed: {str(e)}") from e
+
+    async def close(self):
+        """Close every pooled connection."""
+        await self._client.aclose()
+
+class AsyncSheetsClient:
+    """Coroutine methods for the Sheets v4 calls used by the pipeline.
+
+    ``token`` is a callable returning the current access token (or None to send
+    no Authorization header); it may block to refresh the token, so it runs on
+    a thread of its own rather than the event loop. ``execute``, when given,
+    wraps every call (e.g. RequestScheduler.execute_async for the shared quota
+    and retries); ``request`` is the single unwrapped attempt.
+    """
+
+    def __init__(self, pool, token=None, base_url=SHEETS_BASE_URL, execute=None):
+        self.pool = pool
+        self.token = token
+        self.base_url = base_url.rstrip('/')
+        self.execute = execute
+        # Not the loop's default executor, so a request never waits behind work handed to asyncio.to_thread
+        self._token_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sheets-token') if token else None
+
+    def close(self):
+        """Stop the thread fetching access tokens."""
+        if self._token_executor is not None:
+            self._token_executor.shutdown(wait=False)
+
+    def url(self, spreadsheet_id, path='', params=None):
+        """Return the URL of a spreadsheet resource; ``path`` is appended as-is after the ID."""
+        query = urlencode(params or {}, doseq=True)
+        url = f"{self.base_url}/v4/spreadsheets/{quote(spreadsheet_id, safe='')}{path}"
+        return url + (f'?{query}' if query else '')
+
+    async def request(self, method, url, body=None):
+        """Make one API request and return the decoded JSON response, raising HttpError on error statuses."""
+        headers = {'Accept': 'application/json'}
+        token = None
+        if self.token:
+            token = await asyncio.get_running_loop().run_in_executor(self._token_executor, self.token)
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        data = None
+        if body is not None:
+            headers['Content-Type'] = 'application/json'
+            data = body if isinstance(body, bytes) else json.dumps(body).encode('utf-8')
+        status, response_headers, content = await self.pool.request(method, url, headers, data)
+        if status >= 400:
+            import httplib2
+            from googleapiclient.errors import HttpError
+            raise HttpError(httplib2.Response({**response_headers, 'status': status}), content, uri=url)
+        return json.loads(content) if content else {}
+
+    async def _call(self, method, url, body=None):
+        if self.execute is None:
+            return await self.request(method, url, body)
+        return await self.execute(lambda: self.request(method, url, body))
+
+    async def values_get(self, spreadsheet_id, range, major_dimension='ROWS'):
+        """spreadsheets.values.get"""
+        return await self._call('GET', self.url(spreadsheet_id, f"/values/{quote(range, safe='')}",
+                                                {'majorDimension': major_dimension}))
+
+    async def values_batch_get(self, spreadsheet_id, ranges, major_dimension='ROWS'):
+        """spreadsheets.values.batchGet"""
+        return await self._call('GET', self.url(spreadsheet_id, '/values:batchGet',
+                                                {'ranges': list(ranges), 'majorDimension': major_dimension}))
+
+    async def get(self, spreadsheet_id, fields=None):
+        """spreadsheets.get"""
+        return await self._call('GET', self.url(spreadsheet_id, params={'fields': fields} if fields else None))
+
+    async def batch_update(self, spreadsheet_id, requests):
+        """spreadsheets.batchUpdate"""
+        return await self._call('POST', self.url(spreadsheet_id, ':batchUpdate'), {'requests': requests})
+
+class EventLoopThread:
+    """An event loop running forever on a daemon thread, for driving coroutines from blocking code."""
+
+    def __init__(self, name='sheets-async'):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name=name, daemon=True)
+        self._thread.start()
+
+    def run(self, coroutine):
+        """Run ``coroutine`` on the loop and block until it finishes; not callable from the loop itself."""
+        if threading.current_thread() is self._thread:
+            coroutine.close()
+            raise RuntimeError("EventLoopThread.run would block its own event loop")
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def close(self):
+        """Stop the loop and wait for its thread."""
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+class AsyncSheetsTransport:
+    """An AsyncSheetsClient with its connection pool, served from a background event loop.
+
+    ``run`` drives a coroutine (e.g. an overlapped pipeline using ``client``) to
+    completion from blocking code, and ``service`` returns the blocking wrapper,
+    which every thread may share since all I/O happens on the loop.
+    """
+
+    def __init__(self, token=None, base_url=SHEETS_BASE_URL, max_connections=DEFAULT_MAX_CONNECTIONS,
+                 timeout=DEFAULT_TIMEOUT, execute=None):
+        self.pool = AsyncHTTPPool(max_connections, timeout)
+        self.client = AsyncSheetsClient(self.pool, token, base_url, execute)
+        self._loop_thread = EventLoopThread()
+        self._service = SyncSheetsService(self)
+
+    def run(self, coroutine):
+        return self._loop_thread.run(coroutine)
+
+    def service(self):
+        return self._service
+
+    def close(self):
+        """Close the pooled connections and stop the event loop."""
+        self.run(self.pool.close())
+        self._loop_thread.close()
+        self.client.close()
+
+class SyncRequest:
+    """A deferred blocking call; ``execute()`` makes one unwrapped request on the transport's loop."""
+
+    def __init__(self, transport, method, uri, body=None):
+        self.transport = transport
+        self.method = method
+        self.uri = uri
+        # Serialized up front, like googleapiclient, so callers can measure it
+        self.body = None if body is None else json.dumps(body)
+
+    def execute(self, num_retries=0):
+        body = None if self.body is None else self.body.encode('utf-8')
+        return self.transport.run(self.transport.client.request(self.method, self.uri, body))
+
+class _SyncValues:
+    def __init__(self, transport):
+        self._transport = transport
+
+    def get(self, spreadsheetId, range, majorDimension='ROWS', **kwargs):
+        client = self._transport.client
+        return SyncRequest(self._transport, 'GET', client.url(spreadsheetId, f"/values/{quote(range, safe='')}",
+                                                              {'majorDimension': majorDimension}))
+
+    def batchGet(self, spreadsheetId, ranges, majorDimension='ROWS', **kwargs):
+        ranges = [ranges] if isinstance(ranges, str) else list(ranges)
+        client = self._transport.client
+        return SyncRequest(self._transport, 'GET', client.url(spreadsheetId, '/values:batchGet',
+                                                              {'ranges': ranges, 'majorDimension': majorDimension}))
+
+class _SyncSpreadsheets:
+    def __init__(self, transport):
+        self._transport = transport
+
+    def values(self):
+        return _SyncValues(self._transport)
+
+    def get(self, spreadsheetId, fields=None, **kwargs):
+        client = self._transport.client
+        params = {'fields': fields} if fields else None
+        return SyncRequest(self._transport, 'GET', client.url(spreadsheetId, params=params))
+
+    def batchUpdate(self, spreadsheetId, body, **kwargs):
+        return SyncRequest(self._transport, 'POST', self._transport.client.url(spreadsheetId, ':batchUpdate'), body)
+
+class SyncSheetsService:
+    """Blocking ``service.spreadsheets()...execute()`` interface over an AsyncSheetsTransport."""
+
+    def __init__(self, transport):
+        self._transport = transport
+
+    def spreadsheets(self):
+        return _SyncSpreadsheets(self._transport)
@@ -0,0 +1,158 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+
+import extract_data
+
+"""Batch refresh of many source/target spreadsheet pairs from one manifest.
+
+Fetching and writing are I/O-bound and run on a thread pool sharing the
+process-wide Sheets session and quota scheduler; the CPU-bound scoring and
+serialization of each job is sent to a process pool so it scales with cores.
+"""
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_JOBS = 4
+
+def load_manifest(path):
+    """Load the jobs of a JSON manifest.
+
+    The manifest is a list of jobs, or an object with a ``jobs`` list. Each job
+    needs ``source_spreadsheet_id`` and ``target_spreadsheet_id``, and may set
+    ``name``, ``source_tab`` (default extract_data.SOURCE_TAB), ``pod`` (adds a
+    Pod column) and ``target_sheet_id`` (default 0). Raises ValueError on an
+    invalid manifest.
+    """
+    with open(path, encoding='utf-8') as f:
+        payload = json.load(f)
+    jobs = payload.get('jobs') if isinstance(payload, dict) else payload
+    if not isinstance(jobs, list):
+        raise ValueError(f"Manifest {path} must be a list of jobs or an object with a 'jobs' list")
+    return normalize_jobs(jobs)
+
+def normalize_jobs(jobs):
+    """Return copies of ``jobs`` with defaults filled in, raising ValueError on missing keys or duplicate names."""
+    normalized = []
+    for position, job in enumerate(jobs):
+        missing = [key for key in ('source_spreadsheet_id', 'target_spreadsheet_id') if not job.get(key)]
+        if missing:
+            raise ValueError(f"Job {position} is missing {missing}")
+        job = {'source_tab': extract_data.SOURCE_TAB, 'target_sheet_id': 0, 'pod': None, **job}
+        job.setdefault('name', f"{job['source_spreadsheet_id']}:{job['source_tab']}")
+        normalized.append(job)
+    names = [job['name'] for job in normalized]
+    if len(set(names)) != len(names):
+        raise ValueError("Job names must be unique")
+    return normalized
+
+def score_values(values, pod=None, compact=False):
+    """Score raw source columns and return the target sheet rows (header first).
+
+    Runs in a worker process, so it only takes and returns picklable values.
+    """
+    frame = extract_data.build_compact_frame(values, pod) if compact else extract_data.build_frame(values)
+    if pod is not None and not compact:
+        frame['Pod'] = pod
+    return extract_data.prepare_sheet_values(extract_data.score_ratings(frame))
+
+def run_job(job, score, window_rows=extract_data.DEFAULT_WINDOW_ROWS, compact=False):
+    """Fetch, score (through ``score``, e.g. a process pool) and write one job.
+
+    Returns a result dict with ``name``, ``ok``, ``rows``, ``seconds`` and ``error``.
+    """
+    started = time.perf_counter()
+    result = {'name': job['name'], 'ok': False, 'rows': 0, 'seconds': 0.0, 'error': None}
+    try:
+        service = extract_data.connect_to_sheets()
+        values = extract_data.fetch_source_values(service, window_rows, job['source_spreadsheet_id'],
+                                                  job['source_tab'])
+        if not values:
+            raise ValueError("No data found in the spreadsheet")
+        rows = score(values, job['pod'], compact)
+        extract_data.write_values_to_target(service, rows, job['target_spreadsheet_id'], job['target_sheet_id'])
+        result.update(ok=True, rows=len(rows) - 1)
+    except Exception as e:
+        logger.error(f"Job {job['name']} failed: {str(e)}", exc_info=True)
+        result['error'] = str(e)
+    result['seconds'] = round(time.perf_counter() - started, 3)
+    logger.info(f"Job {job['name']}: {'ok' if result['ok'] else 'FAILED'} "
+                f"({result['rows']} rows in {result['seconds']:.2f}s)")
+    return result
+
+def run_batch(jobs, max_jobs=DEFAULT_MAX_JOBS, processes=None, window_rows=extract_data.DEFAULT_WINDOW_ROWS,
+              compact=False):
+    """Run every job with at most ``max_jobs`` fetching or writing at once.
+
+    Scoring goes to a pool of ``processes`` worker processes (default: one per
+    core); ``processes=0`` scores in the calling thread instead. Jobs are
+    normalized as in load_manifest. Returns the per-job results in manifest order.
+
+    Workers are started by a forkserver (spawn where there is none) rather than
+    forked: they are created on first submit from a job thread, and a fork
+    would copy the Metrics and RequestScheduler locks while other job threads
+    might hold them.
+    """
+    jobs = normalize_jobs(jobs)
+    if not jobs:
+        return []
+    workers = (os.cpu_count() or 1) if processes is None else processes
+    start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    pool = (ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(start_method))
+            if workers else None)
+    score = (lambda *args: pool.submit(score_values, *args).result()) if pool else score_values
+    logger.info(f"Running {len(jobs)} jobs with up to {max_jobs} at once and "
+                f"{workers or 'no'} scoring process(es)")
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_jobs, len(jobs)))) as executor:
+            return list(executor.map(lambda job: run_job(job, score, window_rows, compact), jobs))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+def print_report(results, stream=sys.stdout):
+    """Print one line per job and a summary."""
+    width = max([len(result['name']) for result in results] + [3])
+    print(f"{'job':<{width}} {'status':<7} {'rows':>8} {'seconds':>8}", file=stream)
+    for result in results:
+        status = 'ok' if result['ok'] else 'FAILED'
+        line = f"{result['name']:<{width}} {status:<7} {result['rows']:>8} {result['seconds']:>8.2f}"
+        print(line + (f"  {result['error']}" if result['error'] else ''), file=stream)
+    failed = sum(not result['ok'] for result in results)
+    print(f"{len(results) - failed} of {len(results)} jobs succeeded", file=stream)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh many source/target spreadsheet pairs from a manifest.")
+    parser.add_argument('manifest', help="JSON manifest of source/target jobs (see load_manifest)")
+    parser.add_argument('--max-jobs', type=int, default=DEFAULT_MAX_JOBS,
+                        help="maximum number of jobs fetching or writing at once")
+    parser.add_argument('--processes', type=int, default=None,
+                        help="scoring processes (default: one per core, 0 to score in-process)")
+    parser.add_argument('--window-rows', type=int, default=extract_data.DEFAULT_WINDOW_ROWS,
+                        help="number of source rows fetched per request")
+    parser.add_argument('--compact', action='store_true',
+                        help="score with the compact typed frame")
+    parser.add_argument('--credentials', default=extract_data.CREDENTIALS_PATH,
+                        help="path of the service-account credentials file")
+    parser.add_argument('--token-cache', default=None,
+                        help="file used to keep the access token across runs")
+    parser.add_argument('--requests-per-minute', type=int, default=extract_data.DEFAULT_REQUESTS_PER_MINUTE,
+                        help="Sheets API quota shared by all jobs of this run")
+    parser.add_argument('--report', default=None, metavar='PATH',
+                        help="also write the per-job results to PATH as JSON")
+    args = parser.parse_args()
+    extract_data.configure_logging()
+    extract_data.configure_session(args.credentials, args.token_cache)
+    extract_data.configure_scheduler(args.requests_per_minute)
+
+    results = run_batch(load_manifest(args.manifest), args.max_jobs, args.processes, args.window_rows, args.compact)
+    print_report(results)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    sys.exit(0 if all(result['ok'] for result in results) else 1)
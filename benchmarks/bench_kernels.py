@@ -0,0 +1,78 @@
+"""Micro-benchmark of the scoring and serialization kernels against the per-cell lambdas they replaced.
+
+Builds a synthetic scored frame of ``--rows`` responses, times each kernel next
+to its former Python-level implementation and checks both produce identical
+output.
+
+    python benchmarks/bench_kernels.py --rows 2000000
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import extract_data  # noqa: E402
+
+def synthetic_frame(rows, seed=0):
+    """Return a required-column frame of ``rows`` responses with string ratings and a few blanks."""
+    rng = np.random.default_rng(seed)
+    ratings = {col: rng.integers(1, 6, rows).astype(str).astype(object) for col in extract_data.RATING_COLUMNS}
+    ratings['Context Awareness'][::97] = ''
+    return pd.DataFrame({
+        'Email Address': [f'user{i}@example.com' for i in range(rows)],
+        'Tool being used': rng.choice(['Cursor', 'Copilot', 'Trae'], rows).astype(object),
+        'Feature used': rng.choice(['Chat', 'Completion', 'Agent'], rows).astype(object),
+        **ratings,
+        'Unique ID': [f'ID{i}' for i in range(rows)],
+    }, columns=extract_data.REQUIRED_COLUMNS)
+
+def legacy_result(difference):
+    return difference.apply(lambda x: 'Ok' if -1 <= x <= 1 else 'Not ok')
+
+def legacy_prepare_sheet_values(data):
+    data = data.fillna('')
+    for col in extract_data.NUMERIC_COLUMNS:
+        if col in data.columns:
+            data[col] = data[col].apply(
+                lambda x: round(float(x), 2) if pd.notnull(x) and str(x).strip() != '' else ''
+            )
+    values = [list(data.columns)] + data.values.tolist()
+    return [[str(cell) if cell != '' else '' for cell in row] for row in values]
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2000000)
+    args = parser.parse_args(argv)
+    logging.disable(logging.WARNING)
+
+    scored = extract_data.score_ratings(synthetic_frame(args.rows))
+    rows = []
+
+    legacy, legacy_seconds = timed(legacy_result, scored['Difference'])
+    current, seconds = timed(extract_data.classify_results, scored['Difference'])
+    assert legacy.tolist() == current.tolist(), "classify_results output differs from the legacy lambda"
+    rows.append(('classify_results', legacy_seconds, seconds))
+
+    legacy, legacy_seconds = timed(legacy_prepare_sheet_values, scored)
+    current, seconds = timed(extract_data.prepare_sheet_values, scored)
+    assert legacy == current, "prepare_sheet_values output differs from the legacy implementation"
+    rows.append(('prepare_sheet_values', legacy_seconds, seconds))
+
+    print(f"{args.rows} rows, outputs identical")
+    print(f"{'kernel':<22} {'legacy s':>9} {'current s':>10} {'speedup':>8}")
+    for name, legacy_seconds, seconds in rows:
+        print(f"{name:<22} {legacy_seconds:>9.3f} {seconds:>10.3f} {legacy_seconds / seconds:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""End-to-end pipeline benchmark against the in-process Sheets stand-in.
+
+Runs extract_sheet_data and write_to_target_sheet over synthetic survey tabs of
+increasing size and reports wall time, API calls, bytes moved and peak RSS per
+stage. Each size runs in its own subprocess so peak RSS is not inherited from
+earlier, larger runs.
+
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --sizes 1000,10000 --latency-ms 50 --json
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import extract_data  # noqa: E402
+from fake_sheets import FakeSheetsService  # noqa: E402
+
+DEFAULT_SIZES = (1000, 10000, 100000, 1000000)
+
+# Extra source columns the pipeline has to skip over
+EXTRA_COLUMNS = ['Timestamp', 'Comments']
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def synthetic_rows(rows, seed=0):
+    """Return a source tab (header first) of ``rows`` survey responses."""
+    rng = random.Random(seed)
+    header = EXTRA_COLUMNS[:1] + extract_data.REQUIRED_COLUMNS + EXTRA_COLUMNS[1:]
+    values = [header]
+    for i in range(rows):
+        ratings = [str(rng.randint(1, 5)) for _ in extract_data.RATING_COLUMNS]
+        if i % 97 == 0:
+            ratings[0] = ''  # Sprinkle blanks so the numeric coercion has work to do
+        values.append(['2024-01-01 10:00:00', f'user{i}@example.com', rng.choice(['Cursor', 'Copilot', 'Trae']),
+                       rng.choice(['Chat', 'Completion', 'Agent'])] + ratings + [f'ID{i}', ''])
+    return values
+
+def run_once(rows, window_rows, latency, fail_every, max_payload_bytes, compact=False, validate=False):
+    """Run the pipeline once over ``rows`` responses and return the measurements."""
+    fake = FakeSheetsService(latency=latency, fail_every=fail_every, max_payload_bytes=max_payload_bytes)
+    fake.add_sheet(extract_data.SOURCE_SPREADSHEET_ID, extract_data.SOURCE_TAB, synthetic_rows(rows))
+    fake.add_sheet(extract_data.TARGET_SPREADSHEET_ID, extract_data.TARGET_SHEET, sheet_id=extract_data.TARGET_SHEET_ID)
+    baseline_rss = peak_rss_mb()
+    # Let the fake's quota model, not the client-side limiter, bound throughput
+    extract_data.configure_scheduler(requests_per_minute=10 ** 9)
+    extract_data.get_scheduler().base_delay = 0.01
+    extract_data.configure_quality_gate(enabled=validate)
+
+    result = {'rows': rows, 'baseline_rss_mb': round(baseline_rss, 1), 'stages': {}}
+    with mock.patch.object(extract_data, 'connect_to_sheets', return_value=fake):
+        data = None
+        for stage in ('extract', 'write'):
+            before = dict(fake.stats)
+            started = time.perf_counter()
+            if stage == 'extract':
+                data = extract_data.extract_sheet_data(window_rows, compact)
+                ok = data is not None and len(data) == rows
+            else:
+                ok = extract_data.write_to_target_sheet(fake, data)
+            result['stages'][stage] = {
+                'ok': bool(ok),
+                'seconds': round(time.perf_counter() - started, 3),
+                'calls': fake.stats['calls'] - before.get('calls', 0),
+                'bytes_sent': fake.stats['bytes_sent'] - before.get('bytes_sent', 0),
+                'bytes_received': fake.stats['bytes_received'] - before.get('bytes_received', 0),
+                'peak_rss_mb': round(peak_rss_mb(), 1),
+            }
+    result['quota_errors'] = fake.stats['errors.429']
+    result['target_rows'] = len(fake.values(extract_data.TARGET_SPREADSHEET_ID, extract_data.TARGET_SHEET))
+    return result
+
+def run_in_subprocess(rows, args):
+    command = [sys.executable, os.path.abspath(__file__), '--single', str(rows),
+               '--window-rows', str(args.window_rows), '--latency-ms', str(args.latency_ms)]
+    if args.fail_every:
+        command += ['--fail-every', str(args.fail_every)]
+    if args.max_payload_bytes:
+        command += ['--max-payload-bytes', str(args.max_payload_bytes)]
+    if args.compact:
+        command.append('--compact')
+    if args.validate:
+        command.append('--validate')
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def print_table(results):
+    print(f"{'rows':>9} {'stage':<8} {'seconds':>9} {'calls':>7} {'MB sent':>9} {'MB recv':>9} {'peak RSS MB':>12}")
+    for result in results:
+        for stage, stats in result['stages'].items():
+            print(f"{result['rows']:>9} {stage:<8} {stats['seconds']:>9.3f} {stats['calls']:>7} "
+                  f"{stats['bytes_sent'] / 1e6:>9.2f} {stats['bytes_received'] / 1e6:>9.2f} "
+                  f"{stats['peak_rss_mb']:>12.1f}{'' if stats['ok'] else '  FAILED'}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='Comma-separated row counts to benchmark')
+    parser.add_argument('--window-rows', type=int, default=extract_data.DEFAULT_WINDOW_ROWS)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Simulated latency per API call')
+    parser.add_argument('--fail-every', type=int, help='Answer every Nth call with a 429')
+    parser.add_argument('--max-payload-bytes', type=int, help='Reject request bodies larger than this')
+    parser.add_argument('--compact', action='store_true', help='Extract into the compact typed frame')
+    parser.add_argument('--validate', action='store_true', help='Run the data-quality gate before scoring')
+    parser.add_argument('--json', action='store_true', help='Print one JSON object per size instead of a table')
+    parser.add_argument('--single', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.WARNING)
+    if args.single is not None:
+        print(json.dumps(run_once(args.single, args.window_rows, args.latency_ms / 1000,
+                                  args.fail_every, args.max_payload_bytes, args.compact, args.validate)))
+        return
+
+    results = []
+    for rows in (int(size) for size in args.sizes.split(',')):
+        results.append(run_in_subprocess(rows, args))
+        if args.json:
+            print(json.dumps(results[-1]), flush=True)
+    if not args.json:
+        print_table(results)
+
+if __name__ == '__main__':
+    main()
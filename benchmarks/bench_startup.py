@@ -0,0 +1,75 @@
+"""Startup benchmark: time to import extract_data and to print --help, against a latency budget.
+
+Each command runs ``--repeat`` times in a fresh interpreter. The reported cost is
+the median wall time minus that of a bare ``python -c pass``, so interpreter and
+site start-up are not charged to the module. Exits non-zero when a cost exceeds
+its budget or when a deferred heavy dependency was imported anyway.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 20 --import-budget-ms 80
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budgets above a bare interpreter start
+DEFAULT_IMPORT_BUDGET_MS = 100.0
+DEFAULT_HELP_BUDGET_MS = 120.0
+
+# Modules that must only load on the code paths that use them
+DEFERRED_MODULES = ['pandas', 'numpy', 'googleapiclient.discovery', 'google.oauth2.service_account', 'httplib2', 'httpx']
+
+def median_ms(command, repeat):
+    """Median wall time of ``command`` over ``repeat`` fresh runs, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+def loaded_deferred_modules():
+    """Return the deferred modules that ``import extract_data`` pulls in."""
+    check = ("import sys, extract_data; "
+             f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))")
+    output = subprocess.run([sys.executable, '-c', check], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout.strip()
+    return [name for name in output.split(',') if name]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--import-budget-ms', type=float, default=DEFAULT_IMPORT_BUDGET_MS)
+    parser.add_argument('--help-budget-ms', type=float, default=DEFAULT_HELP_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    baseline = median_ms([sys.executable, '-c', 'pass'], args.repeat)
+    rows = [
+        ('import extract_data', median_ms([sys.executable, '-c', 'import extract_data'], args.repeat),
+         args.import_budget_ms),
+        ('extract_data.py --help', median_ms([sys.executable, 'extract_data.py', '--help'], args.repeat),
+         args.help_budget_ms),
+    ]
+
+    print(f"bare interpreter: {baseline:.1f} ms (median of {args.repeat})")
+    print(f"{'command':<24} {'total ms':>9} {'cost ms':>8} {'budget ms':>10}")
+    failed = False
+    for name, total, budget in rows:
+        cost = total - baseline
+        over = cost > budget
+        failed |= over
+        print(f"{name:<24} {total:>9.1f} {cost:>8.1f} {budget:>10.1f}{'  OVER BUDGET' if over else ''}")
+
+    loaded = loaded_deferred_modules()
+    if loaded:
+        failed = True
+        print(f"import extract_data loaded deferred modules: {', '.join(loaded)}")
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,290 @@
+import argparse
+import logging
+
+from async_pipeline import run_stream_async
+import extract_data
+from local_io import open_sink
+from quality_gate import DEFAULT_MAX_RATING, DEFAULT_MIN_RATING
+from rollup import Rollup
+from rollup_tab import RollupTab, write_rollup_tab, ROLLUP_SHEET, ROLLUP_STATE_PATH
+from sharding import write_sharded, SHARD_INDEX_SHEET, SHARD_PREFIX
+from snapshot_sync import load_snapshot_data, sync_with_snapshot, watch_source, SNAPSHOT_DIR
+from watch import AdaptivePoller, install_stop_handlers, DEFAULT_BACKOFF, DEFAULT_MAX_INTERVAL, DEFAULT_MIN_INTERVAL
+
+"""Command line of the extraction pipeline, run by ``python extract_data.py``."""
+
+logger = logging.getLogger(__name__)
+
+def build_parser():
+    """Return the argument parser of the main program."""
+    parser = argparse.ArgumentParser(description="Extract survey ratings and write scored results to the target sheet.")
+    parser.add_argument('--incremental', action='store_true',
+                        help="only write new or changed rows, keyed on Unique ID")
+    parser.add_argument('--state-file', default=extract_data.SYNC_STATE_PATH,
+                        help="path of the incremental sync state file")
+    parser.add_argument('--stream', action='store_true',
+                        help="fetch, score and write the source one window at a time")
+    parser.add_argument('--window-rows', type=int, default=extract_data.DEFAULT_WINDOW_ROWS,
+                        help="number of source rows fetched per request")
+    parser.add_argument('--source', action='append', type=extract_data.parse_source,
+                        metavar='SPREADSHEET_ID:TAB[:POD]',
+                        help="source tab to extract; repeat to fetch several tabs concurrently")
+    parser.add_argument('--max-workers', type=int, default=extract_data.DEFAULT_MAX_WORKERS,
+                        help="maximum number of sources fetched at once")
+    parser.add_argument('--credentials', default=extract_data.CREDENTIALS_PATH,
+                        help="path of the service-account credentials file")
+    parser.add_argument('--token-cache', default=None,
+                        help="file used to keep the access token across runs")
+    parser.add_argument('--requests-per-minute', type=int, default=extract_data.DEFAULT_REQUESTS_PER_MINUTE,
+                        help="Sheets API quota shared by all requests of this run")
+    parser.add_argument('--compact', action='store_true',
+                        help="hold ratings as Int8 and tool/feature/pod as categoricals to cut peak memory")
+    parser.add_argument('--diff', action='store_true',
+                        help="only rewrite target cells that changed, matching rows on Unique ID")
+    parser.add_argument('--last-write', default=None,
+                        help="local copy of the last written table used by --diff instead of reading the target")
+    parser.add_argument('--snapshot', nargs='?', const=SNAPSHOT_DIR, default=None, metavar='DIR',
+                        help="skip scoring and writing when the source matches the snapshot of the last write")
+    parser.add_argument('--replay', default=None, metavar='PATH',
+                        help="read the source from a local CSV, JSON or Parquet dump instead of the API")
+    parser.add_argument('--sink', action='append', default=[], metavar='PATH',
+                        help="also write scored rows to a .csv, .parquet or .sqlite/.db file; repeatable")
+    parser.add_argument('--no-sheet', action='store_true',
+                        help="write only to the --sink files, leaving the target sheet untouched")
+    parser.add_argument('--rollup', action='store_true',
+                        help=f"also write per Pod/Tool/Feature aggregates to the {ROLLUP_SHEET} tab")
+    parser.add_argument('--rollup-state', default=ROLLUP_STATE_PATH,
+                        help="path of the running rollup totals kept by --incremental --rollup")
+    parser.add_argument('--validate', action='store_true',
+                        help="drop rows with a missing or duplicate Unique ID or a non-numeric or out-of-range rating")
+    parser.add_argument('--min-rating', type=float, default=DEFAULT_MIN_RATING,
+                        help="lowest valid rating (--validate)")
+    parser.add_argument('--max-rating', type=float, default=DEFAULT_MAX_RATING,
+                        help="highest valid rating (--validate)")
+    parser.add_argument('--quarantine', default=None, metavar='PATH',
+                        help="write rows dropped by validation, with reason codes, to a .csv, .parquet or .sqlite/.db "
+                             "file; implies --validate")
+    parser.add_argument('--quarantine-tab', action='store_true',
+                        help=f"write rows dropped by validation to the {extract_data.QUARANTINE_SHEET} tab; "
+                             "implies --validate")
+    parser.add_argument('--shard-rows', type=int, default=None, metavar='N',
+                        help=f"write the output across '{SHARD_PREFIX} <n>' tabs of at most N rows each, "
+                             f"listed in the {SHARD_INDEX_SHEET} tab")
+    parser.add_argument('--shard-by-pod', action='store_true',
+                        help=f"write one '{SHARD_PREFIX} <Pod>' tab per Pod (with --source); "
+                             "combine with --shard-rows to cap each tab")
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help="make Sheets calls over pooled asyncio connections; with --stream, overlap fetching, "
+                             "scoring and writing")
+    parser.add_argument('--watch', action='store_true',
+                        help="keep running and rewrite the target whenever the source changes")
+    parser.add_argument('--min-interval', type=float, default=DEFAULT_MIN_INTERVAL,
+                        help="seconds between polls while the source is changing (--watch)")
+    parser.add_argument('--max-interval', type=float, default=DEFAULT_MAX_INTERVAL,
+                        help="longest wait between polls once the source is idle (--watch)")
+    parser.add_argument('--backoff', type=float, default=DEFAULT_BACKOFF,
+                        help="factor the poll interval grows by after each idle poll (--watch)")
+    parser.add_argument('--from-snapshot', action='store_true',
+                        help="score and write the saved snapshot instead of fetching the source")
+    parser.add_argument('--metrics', default=None, metavar='PATH',
+                        help="write per-stage timings and counters to PATH when the run ends "
+                             "(after every poll with --watch)")
+    parser.add_argument('--metrics-format', choices=['json', 'prometheus'], default='json',
+                        help="format of the --metrics file; prometheus writes a node_exporter textfile")
+    parser.add_argument('--metrics-stats', action='store_true',
+                        help="also compute rating and Result statistics for the --metrics file")
+    return parser
+
+def check_mode_arguments(parser, args):
+    """Reject flag combinations the main program would otherwise silently ignore part of.
+
+    At most one run mode may be given, and only with the output options it
+    honours; calls ``parser.error`` (exiting) otherwise.
+    """
+    modes = [flag for flag, given in (('--watch', args.watch), ('--replay/--sink', args.replay or args.sink),
+                                      ('--source', args.source), ('--stream', args.stream),
+                                      ('--from-snapshot', args.from_snapshot), ('--incremental', args.incremental))
+             if given]
+    if len(modes) > 1:
+        parser.error(f"{modes[0]} cannot be combined with {modes[1]}")
+    options = {'--diff': args.diff, '--shard-rows': args.shard_rows, '--shard-by-pod': args.shard_by_pod,
+               '--snapshot': args.snapshot}
+    unsupported = {
+        '--replay/--sink': ['--diff', '--shard-rows', '--shard-by-pod', '--snapshot'],
+        '--source': ['--snapshot'],
+        '--stream': ['--diff', '--shard-rows', '--shard-by-pod', '--snapshot'],
+        '--incremental': ['--diff', '--shard-rows', '--shard-by-pod', '--snapshot'],
+    }
+    for mode in modes:
+        for option in unsupported.get(mode, []):
+            if options[option]:
+                parser.error(f"{option} is not supported with {mode}")
+    if args.diff and (args.shard_rows or args.shard_by_pod):
+        parser.error("--diff cannot be combined with --shard-rows or --shard-by-pod")
+    if args.no_sheet and not args.sink:
+        parser.error("--no-sheet needs at least one --sink")
+
+class RunOutputs:
+    """Everything a run writes besides extracting and scoring, as chosen on the command line.
+
+    ``write`` sends a scored frame to the target (sharded or diffed when asked)
+    and the summary tab. Streaming modes pass their chunks through ``track``,
+    which folds each one into the rollup as it is scored, and hand the result
+    to ``finish``. ``finish_pass`` flushes quarantined rows and exports metrics
+    after every pass.
+    """
+
+    def __init__(self, args):
+        self.args = args
+        self.rollup = Rollup() if args.rollup else None
+        # Quarantined rows of the last pass, so watch mode only rewrites them when they change
+        self.last_quarantine = None
+
+    def write(self, data):
+        """Write a scored frame; returns True on success."""
+        args = self.args
+        if args.shard_rows or args.shard_by_pod:
+            written = write_sharded(extract_data.connect_to_sheets(), data, args.shard_rows, args.shard_by_pod,
+                                    max_workers=args.max_workers)
+        elif args.diff:
+            written = extract_data.write_diff_to_target_sheet(extract_data.connect_to_sheets(), data, args.last_write)
+        else:
+            written = extract_data.write_to_target_sheet(extract_data.connect_to_sheets(), data)
+        if written and args.rollup:
+            rollup = Rollup()
+            rollup.add(data)
+            written = write_rollup_tab(extract_data.connect_to_sheets(), rollup)
+        return written
+
+    def options(self):
+        """Describe how ``write`` writes the target, for the snapshot hash (see snapshot_sync.snapshot_salt)."""
+        args = self.args
+        return [f'rollup={bool(args.rollup)}', f'shard_rows={args.shard_rows}', f'shard_by_pod={args.shard_by_pod}',
+                f'diff={bool(args.diff)}']
+
+    def track(self, chunks):
+        """Yield streamed chunks unchanged, adding each to the rollup when there is one."""
+        return self.rollup.track(chunks) if self.rollup else chunks
+
+    def finish(self, written):
+        """Write the summary tab of a streamed run that wrote ``written`` rows; returns the run's result."""
+        if written and self.rollup:
+            return write_rollup_tab(extract_data.connect_to_sheets(), self.rollup)
+        return written
+
+    def flush_quarantine(self):
+        """Write the rows quarantined since the last flush, unless they are the ones written last time."""
+        gate = extract_data.get_quality_gate()
+        if gate is None:
+            return
+        values = gate.take()
+        if not (self.args.quarantine or self.args.quarantine_tab) or values == self.last_quarantine:
+            return
+        service = extract_data.connect_to_sheets() if self.args.quarantine_tab else None
+        if extract_data.write_quarantine(values, self.args.quarantine, service):
+            self.last_quarantine = values
+
+    def finish_pass(self):
+        """Flush quarantined rows and export the metrics of the pass that just ended."""
+        self.flush_quarantine()
+        metrics = extract_data.get_metrics()
+        if self.args.metrics:
+            metrics.export(self.args.metrics, self.args.metrics_format, self.args.metrics_stats)
+        metrics.end_pass()
+
+def run(args, outputs):
+    """Run the mode selected by ``args`` once (or until stopped with --watch)."""
+    if args.watch:
+        poller = AdaptivePoller(args.min_interval, args.max_interval, args.backoff)
+        install_stop_handlers(poller.stop)
+        watch_source(poller, args.window_rows, args.compact, outputs.write, args.snapshot, outputs.finish_pass,
+                     outputs.options())
+        logger.info("Watch mode stopped")
+    elif args.replay or args.sink:
+        if args.replay:
+            chunks = extract_data.iter_replay_chunks(args.replay, args.window_rows, args.compact)
+        else:
+            chunks = extract_data.iter_scored_chunks(extract_data.connect_to_sheets(), args.window_rows, args.compact)
+        sinks = [open_sink(path) for path in args.sink]
+        written = extract_data.write_to_sinks(outputs.track(chunks), sinks,
+                                              None if args.no_sheet else extract_data.connect_to_sheets())
+        if not args.no_sheet:
+            written = outputs.finish(written)
+        if written:
+            logger.info("Process completed successfully")
+        else:
+            logger.error("Failed to write scored rows")
+    elif args.source:
+        data = extract_data.extract_multi_source(args.source, args.max_workers, args.window_rows, args.compact)
+        if data is not None and outputs.write(data):
+            logger.info("Process completed successfully")
+        else:
+            logger.error("Failed to extract or write multi-source data")
+    elif args.stream:
+        if args.use_async:
+            written = run_stream_async(extract_data.get_async_transport(), args.window_rows, args.compact,
+                                       outputs.rollup.add if outputs.rollup else None)
+        else:
+            service = extract_data.connect_to_sheets()
+            chunks = extract_data.iter_scored_chunks(service, args.window_rows, args.compact)
+            written = extract_data.write_streaming(service, outputs.track(chunks))
+        if written and not outputs.finish(written):
+            written = None
+        if written is None:
+            logger.error("Failed to stream data to target sheet")
+        elif written == 0:
+            logger.error("Failed to extract data")
+        else:
+            logger.info("Process completed successfully")
+    elif args.from_snapshot:
+        data = load_snapshot_data(args.snapshot or SNAPSHOT_DIR, args.compact)
+        if data is not None and outputs.write(data):
+            logger.info("Process completed successfully")
+        else:
+            logger.error("Failed to write snapshot data")
+    elif args.snapshot:
+        if sync_with_snapshot(args.snapshot, args.window_rows, args.compact, outputs.write, outputs.options()):
+            logger.info("Process completed successfully")
+        else:
+            logger.error("Snapshot sync failed")
+    elif args.incremental:
+        rollup_tab = RollupTab(args.rollup_state) if args.rollup else None
+        if extract_data.sync_incremental(extract_data.connect_to_sheets(), args.state_file, rollup_tab):
+            logger.info("Process completed successfully")
+        else:
+            logger.error("Incremental sync failed")
+    else:
+        data = extract_data.extract_sheet_data(args.window_rows, args.compact)
+        if data is not None:
+            logger.info("Data extraction completed successfully")
+            if outputs.write(data):
+                logger.info("Process completed successfully")
+            else:
+                logger.error("Failed to write to target sheet")
+        else:
+            logger.error("Failed to extract data")
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    check_mode_arguments(parser, args)
+    extract_data.configure_logging()
+    extract_data.configure_session(args.credentials, args.token_cache)
+    extract_data.configure_scheduler(args.requests_per_minute)
+    extract_data.configure_metrics(collect_stats=bool(args.metrics) and args.metrics_stats)
+    if args.use_async:
+        extract_data.configure_async_transport(max_connections=args.max_workers)
+    if args.token_cache:
+        with extract_data.get_metrics().stage('auth'):
+            extract_data.get_session().ensure_token()
+    if args.validate or args.quarantine or args.quarantine_tab:
+        extract_data.configure_quality_gate(args.min_rating, args.max_rating)
+
+    outputs = RunOutputs(args)
+    logger.info("Starting script execution")
+    run(args, outputs)
+    outputs.finish_pass()
+    extract_data.close_async_transport()
+
+if __name__ == "__main__":
+    main()
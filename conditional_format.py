@@ -0,0 +1,97 @@
+import logging
+
+"""Idempotent management of the Result column's conditional-format rules."""
+
+logger = logging.getLogger(__name__)
+
+# Background colours of the Result column
+OK_COLOR = {'red': 0.7176, 'green': 0.8823, 'blue': 0.7176}
+NOT_OK_COLOR = {'red': 0.9568, 'green': 0.7176, 'blue': 0.7176}
+MANAGED_VALUES = ('Ok', 'Not ok')
+
+def result_format_rules(sheet_id, result_col_idx):
+    """Return the desired rules colouring "Ok" green and "Not ok" red in the Result column."""
+    rules = []
+    for value, color in (('Ok', OK_COLOR), ('Not ok', NOT_OK_COLOR)):
+        rules.append({
+            'ranges': [{
+                'sheetId': sheet_id,
+                'startColumnIndex': result_col_idx,
+                'endColumnIndex': result_col_idx + 1,
+                'startRowIndex': 1  # Skip header row
+            }],
+            'booleanRule': {
+                'condition': {
+                    'type': 'TEXT_EQ',
+                    'values': [{'userEnteredValue': value}]
+                },
+                'format': {
+                    'backgroundColor': dict(color)
+                }
+            }
+        })
+    return rules
+
+def _managed_value(rule):
+    """Return "Ok"/"Not ok" if ``rule`` is one of ours, else None."""
+    condition = rule.get('booleanRule', {}).get('condition', {})
+    values = condition.get('values', [])
+    if condition.get('type') == 'TEXT_EQ' and len(values) == 1 and values[0].get('userEnteredValue') in MANAGED_VALUES:
+        return values[0]['userEnteredValue']
+    return None
+
+def _signature(rule):
+    """Comparable form of a rule; the API omits zero-valued fields and may round colours."""
+    ranges = tuple(
+        (r.get('sheetId', 0), r.get('startRowIndex', 0), r.get('endRowIndex'),
+         r.get('startColumnIndex', 0), r.get('endColumnIndex'))
+        for r in rule.get('ranges', [])
+    )
+    color = rule.get('booleanRule', {}).get('format', {}).get('backgroundColor', {})
+    return (_managed_value(rule), ranges,
+            tuple(round(color.get(channel, 0), 3) for channel in ('red', 'green', 'blue')))
+
+def read_sheet_rules(service, spreadsheet_id, sheet_id, execute=None):
+    """Fetch the conditional-format rules currently defined on ``sheet_id``."""
+    execute = execute or (lambda request: request.execute())
+    result = execute(service.spreadsheets().get(
+        spreadsheetId=spreadsheet_id,
+        fields='sheets(properties(sheetId),conditionalFormats)'
+    ))
+    for sheet in result.get('sheets', []):
+        if sheet.get('properties', {}).get('sheetId', 0) == sheet_id:
+            return sheet.get('conditionalFormats', [])
+    return []
+
+def plan_rule_requests(existing, desired, sheet_id):
+    """Return the minimal batchUpdate requests turning ``existing`` rules into ``desired``.
+
+    Only rules matching "Ok"/"Not ok" are managed; everything else is left alone.
+    The first existing rule for each value is kept (or updated in place) and every
+    other copy, e.g. duplicates stacked by earlier runs, is deleted. Updates come
+    first and deletes run from the highest index down so indexes stay valid
+    within the same batch.
+    """
+    desired_by_value = {_managed_value(rule): rule for rule in desired}
+    updates, deletes, kept = [], [], set()
+    for index, rule in enumerate(existing):
+        value = _managed_value(rule)
+        if value is None:
+            continue
+        if value in desired_by_value and value not in kept:
+            kept.add(value)
+            if _signature(rule) != _signature(desired_by_value[value]):
+                updates.append({'updateConditionalFormatRule': {
+                    'index': index, 'sheetId': sheet_id, 'rule': desired_by_value[value]
+                }})
+        else:
+            deletes.append(index)
+
+    requests = updates
+    requests += [{'deleteConditionalFormatRule': {'index': index, 'sheetId': sheet_id}}
+                 for index in sorted(deletes, reverse=True)]
+    requests += [{'addConditionalFormatRule': {'rule': rule, 'index': 0}}
+                 for value, rule in desired_by_value.items() if value not in kept]
+    if deletes:
+        logger.info(f"Removing {len(deletes)} duplicate or stale conditional-format rules")
+    return requests
@@ -1,147 +1,272 @@
-# Remove this line
-# from google.oauth2.credentials import Credentials
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-import pandas as pd
+from googleapiclient.errors import HttpError
+import json
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+from conditional_format import plan_rule_requests, read_sheet_rules, result_format_rules
+from local_io import iter_dump_windows, open_sink
+from metrics import Lazy, Metrics
+from quality_gate import QualityGate, SeenIds, DEFAULT_MAX_RATING, DEFAULT_MIN_RATING
+from request_scheduler import RequestScheduler, DEFAULT_REQUESTS_PER_MINUTE
+from sheets_client import SheetsSession
+from sync_state import SyncState
+from write_engine import SheetWriter, fetch_sheet_ids, keyed_layout
+
+"""Module for handling Google Sheets data extraction and processing.
+
+pandas and numpy are imported inside the functions that need them, and logging
+is configured by configure_logging() when run as a program, so importing this
+module (or running it with --help) stays fast and has no side effects.
+"""
 
-# Configure logging
-log_file_path = os.path.join(os.path.dirname(__file__), 'sheet_extraction.log')
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file_path),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
-# Add module docstring
-"""Module for handling Google Sheets data extraction and processing."""
+CREDENTIALS_PATH = '/Users/surya.sandeep.boda/Desktop/Marscode Zero to One 2/credentials.json'
+SOURCE_SPREADSHEET_ID = '15FMeidgU2Dg7Q4JKPkLAdJmQ3IxWCWJXjhCo9UterCE'
+SOURCE_TAB = 'POD 5'
+DEFAULT_WINDOW_ROWS = 1000
+DEFAULT_MAX_WORKERS = 8
+TARGET_SPREADSHEET_ID = '1FEqiDqqPfb9YHAWBiqVepmmXj22zNqXNNI7NLGCDVak'
+TARGET_SHEET = 'Sheet1'
+TARGET_SHEET_ID = 0
+QUARANTINE_SHEET = 'Quarantine'
+QUARANTINE_SHEET_ID = 2
+LOG_FILE_PATH = os.path.join(os.path.dirname(__file__), 'sheet_extraction.log')
+SYNC_STATE_PATH = os.path.join(os.path.dirname(__file__), 'sync_state.json')
+
+# Shared Sheets session, created on first connect_to_sheets() call
+_session = None
+
+# Shared request scheduler enforcing the Sheets quota across all API calls
+_scheduler = None
+
+# Shared per-stage timings and counters, exported with --metrics
+_metrics = None
+
+# Shared data-quality gate applied to source windows; None leaves them unchecked
+_quality_gate = None
+
+# Shared asyncio transport (see async_sheets); None uses the blocking googleapiclient service
+_async_transport = None
+
+# Header -> column letter index per (spreadsheet ID, tab), resolved once per process
+_header_index_cache = {}
+
+REQUIRED_COLUMNS = [
+    'Email Address', 'Tool being used', 'Feature used',
+    'Context Awareness', 'Autonomy', 'Experience',
+    'Output Quality', 'Overall Rating', 'Unique ID'
+]
+RATING_COLUMNS = ['Context Awareness', 'Autonomy', 'Experience', 'Output Quality', 'Overall Rating']
+METRICS_FOR_MEAN = ['Context Awareness', 'Autonomy', 'Experience', 'Output Quality']
+NUMERIC_COLUMNS = ['Context Awareness', 'Autonomy', 'Experience',
+                   'Output Quality', 'Overall Rating', 'Mean Rating', 'Difference']
+OUTPUT_COLUMNS = REQUIRED_COLUMNS + ['Mean Rating', 'Difference', 'Result']
+# Repeated labels stored as categoricals in compact mode
+CATEGORY_COLUMNS = ['Tool being used', 'Feature used']
+# Shared "Not ok"/"Ok" objects, so classifying a column does not allocate a string per row
+RESULT_LABELS = ('Not ok', 'Ok')
+
+def configure_logging(log_file_path=LOG_FILE_PATH, level=logging.INFO):
+    """Log to ``log_file_path`` and stderr; called when the module runs as a program."""
+    logging.basicConfig(
+        level=level,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_file_path),
+            logging.StreamHandler()
+        ]
+    )
+
+def get_session():
+    """Return the process-wide SheetsSession, creating it on first use."""
+    global _session
+    if _session is None:
+        _session = SheetsSession(CREDENTIALS_PATH)
+    return _session
+
+def configure_session(credentials_path=CREDENTIALS_PATH, token_cache_path=None):
+    """Replace the process-wide SheetsSession, e.g. to enable the on-disk token cache."""
+    global _session
+    _session = SheetsSession(credentials_path, token_cache_path=token_cache_path)
+    return _session
+
+def get_scheduler():
+    """Return the process-wide RequestScheduler, creating it on first use."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = RequestScheduler()
+    return _scheduler
+
+def configure_scheduler(requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, max_retries=5):
+    """Replace the process-wide RequestScheduler, e.g. to match a raised quota."""
+    global _scheduler
+    _scheduler = RequestScheduler(requests_per_minute, max_retries=max_retries)
+    return _scheduler
+
+def get_metrics():
+    """Return the process-wide Metrics, creating it on first use."""
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics()
+    return _metrics
+
+def configure_metrics(collect_stats=False):
+    """Replace the process-wide Metrics; ``collect_stats`` folds rating and Result statistics for export."""
+    global _metrics
+    _metrics = Metrics(collect_stats=collect_stats)
+    return _metrics
+
+def get_quality_gate():
+    """Return the process-wide QualityGate, or None when validation is off."""
+    return _quality_gate
+
+def configure_quality_gate(min_rating=DEFAULT_MIN_RATING, max_rating=DEFAULT_MAX_RATING, enabled=True):
+    """Replace the process-wide QualityGate; ``enabled=False`` turns validation off."""
+    global _quality_gate
+    _quality_gate = (QualityGate(REQUIRED_COLUMNS, RATING_COLUMNS, 'Unique ID', min_rating, max_rating)
+                     if enabled else None)
+    return _quality_gate
+
+def get_async_transport():
+    """Return the process-wide AsyncSheetsTransport, or None when Sheets calls block."""
+    return _async_transport
+
+def configure_async_transport(base_url=None, max_connections=DEFAULT_MAX_WORKERS, authenticate=True):
+    """Replace the process-wide AsyncSheetsTransport, closing the previous one.
+
+    connect_to_sheets() then returns the transport's blocking wrapper, and
+    requests made on the event loop share the RequestScheduler quota and retry
+    policy. ``authenticate=False`` sends no access token, e.g. to a local
+    stand-in server.
+    """
+    global _async_transport
+    from async_sheets import AsyncSheetsTransport, SHEETS_BASE_URL
+    close_async_transport()
+    _async_transport = AsyncSheetsTransport(token=get_session().ensure_token if authenticate else None,
+                                            base_url=base_url or SHEETS_BASE_URL,
+                                            max_connections=max_connections, execute=_execute_async)
+    return _async_transport
+
+def close_async_transport():
+    """Close the process-wide AsyncSheetsTransport, if any, and go back to blocking calls."""
+    global _async_transport
+    if _async_transport is not None:
+        _async_transport.close()
+        _async_transport = None
+
+async def _execute_async(call):
+    get_metrics().count('api_requests')
+    return await get_scheduler().execute_async(call)
+
+def execute_request(request):
+    """Execute a Sheets API request through the shared rate limiter and retry policy."""
+    metrics = get_metrics()
+    metrics.count('api_requests')
+    body, uri = getattr(request, 'body', None), getattr(request, 'uri', None)
+    metrics.count('bytes_sent', (len(body) if isinstance(body, (str, bytes)) else 0)
+                  + (len(uri) if isinstance(uri, str) else 0))
+    return get_scheduler().execute(request)
 
 def connect_to_sheets():
-    """Establish connection to Google Sheets API."""
+    """Establish connection to Google Sheets API.
+
+    Returns the calling thread's service from the shared session, so credentials,
+    access token and HTTP connection are reused across calls, or the blocking
+    wrapper of the async transport when one is configured.
+    """
     logger.info("Initiating connection to Google Sheets")
     try:
-        scopes = ['https://www.googleapis.com/auth/spreadsheets']
-        creds = service_account.Credentials.from_service_account_file(
-            '/Users/surya.sandeep.boda/Desktop/Marscode Zero to One 2/credentials.json', 
-            scopes=scopes
-        )
-        service = build('sheets', 'v4', credentials=creds)
+        with get_metrics().stage('auth'):
+            service = _async_transport.service() if _async_transport else get_session().service()
         logger.info("Successfully connected to Google Sheets API")
         return service
     except Exception as e:
         logger.error(f"Failed to connect to Google Sheets: {str(e)}")
         raise
 
-def write_to_target_sheet(service, data):
+def round_values(values, decimals=2):
+    """Round a float array exactly like the builtin round().
+
+    np.round scales by a power of ten first, which can land on the wrong side of a
+    half (2.675 -> 2.68) or overflow; those few values fall back to round().
+    """
+    import numpy as np
+    values = np.asarray(values, dtype='float64')
+    with np.errstate(over='ignore', invalid='ignore'):
+        scaled = values * 10.0 ** decimals
+        rounded = np.round(scaled) / 10.0 ** decimals
+        distance_from_half = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5)
+        ambiguous = (distance_from_half < 1e-6 + np.abs(scaled) * 1e-15) | (np.isinf(scaled) & np.isfinite(values))
+    for i in np.flatnonzero(ambiguous):
+        rounded[i] = round(float(values[i]), decimals)
+    return rounded
+
+def serialize_column(series, numeric=False):
+    """Return a column's cells as an object array of strings, with missing values as ''.
+
+    Numeric columns are rounded to two decimals and converted with str() once per
+    distinct value, then gathered back, so repeated ratings cost a lookup rather
+    than a conversion each. Text columns pass through unless they hold non-strings.
+    """
+    import numpy as np
+    import pandas as pd
+    if not numeric:
+        cells = series.to_numpy(dtype=object, na_value='')
+        if pd.api.types.infer_dtype(cells, skipna=False) in ('string', 'empty'):
+            return cells
+        return np.array([cell if isinstance(cell, str) else str(cell) for cell in cells], dtype=object)
+
+    rounded = round_values(pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64', na_value=np.nan))
+    # Factorize the bit patterns so -0.0 keeps its own label
+    codes, uniques = pd.factorize(rounded.view('int64'))
+    codes[np.isnan(rounded)] = -1
+    # Code -1 marks missing values and picks the trailing ''
+    labels = np.array([str(value) for value in uniques.view('float64')] + [''], dtype=object)
+    return labels[codes]
+
+def prepare_sheet_values(data):
+    """Convert a scored DataFrame into a header row plus string rows for the Sheets API."""
+    import numpy as np
+    with get_metrics().stage('serialize'):
+        cells = np.empty((len(data), len(data.columns)), dtype=object)
+        for i, col in enumerate(data.columns):
+            cells[:, i] = serialize_column(data[col], numeric=col in NUMERIC_COLUMNS)
+        get_metrics().count('cells_serialized', cells.size)
+        return [[str(col) for col in data.columns]] + cells.tolist()
+
+def target_writer(service, spreadsheet_id=TARGET_SPREADSHEET_ID, sheet_id=TARGET_SHEET_ID):
+    """Return a SheetWriter for the target sheet that executes through the shared scheduler."""
+    return SheetWriter(service, spreadsheet_id, sheet_id,
+                       execute=execute_request, service_factory=connect_to_sheets)
+
+def write_values_to_target(service, values, spreadsheet_id=TARGET_SPREADSHEET_ID, sheet_id=TARGET_SHEET_ID):
+    """Replace a target sheet with prepared string rows (header first) and its Result colouring.
+
+    Raises on failure; write_to_target_sheet is the logging, bool-returning wrapper.
+    """
+    headers = values[0]
+
+    # Find the Result column index (0-based)
+    result_col_idx = headers.index('Result')
+
+    # Bring the Result colouring to exactly one rule per value, however many runs came before
+    with get_metrics().stage('format'):
+        desired_rules = result_format_rules(sheet_id, result_col_idx)
+        existing_rules = read_sheet_rules(service, spreadsheet_id, sheet_id, execute_request)
+        requests = plan_rule_requests(existing_rules, desired_rules, sheet_id)
+
+    # Clear, write and format in as few batchUpdate calls as the payload size allows
+    logger.info("Writing data to target sheet")
+    with get_metrics().stage('write'):
+        target_writer(service, spreadsheet_id, sheet_id).replace(values, requests)
+    get_metrics().count('rows_written', len(values) - 1)
+
+def write_to_target_sheet(service, data, spreadsheet_id=TARGET_SPREADSHEET_ID, sheet_id=TARGET_SHEET_ID):
     """Write processed data to target Google Sheet with formatting."""
     try:
-        target_spreadsheet_id = '1FEqiDqqPfb9YHAWBiqVepmmXj22zNqXNNI7NLGCDVak'
-        
-        # Clear existing data
-        logger.info("Clearing existing data from target sheet")
-        service.spreadsheets().values().clear(
-            spreadsheetId=TARGET_SPREADSHEET_ID,
-            range='Sheet1!A:Z'
-        ).execute()
-
-        # Clean and prepare data for writing
-        data = data.fillna('')
-        numeric_columns = ['Context Awareness', 'Autonomy', 'Experience', 
-                         'Output Quality', 'Overall Rating', 'Mean Rating', 'Difference']
-        
-        # Safely convert numeric columns
-        for col in numeric_columns:
-            if col in data.columns:
-                data[col] = data[col].apply(
-                    lambda x: round(float(x), 2) if pd.notnull(x) and str(x).strip() != '' else ''
-                )
-
-        # Convert DataFrame to list of lists
-        headers = list(data.columns)
-        values = [headers] + data.values.tolist()
-        
-        # Convert all values to strings, handling empty values
-        values = [[str(cell) if cell != '' else '' for cell in row] for row in values]
-        
-        logger.info("Writing data to target sheet")
-        # Write the data
-        service.spreadsheets().values().update(
-            spreadsheetId=TARGET_SPREADSHEET_ID,
-            range='Sheet1!A1',
-            valueInputOption='RAW',
-            body={'values': values}
-        ).execute()
-
-        # Get the last column letter for the range
-        last_column = chr(ord('A') + len(headers) - 1)
-        
-        # Find the Result column index (0-based)
-        result_col_idx = headers.index('Result')
-        result_col_letter = chr(ord('A') + result_col_idx)
-        
-        # Apply conditional formatting
-        requests = [{
-            'addConditionalFormatRule': {
-                'rule': {
-                    'ranges': [{
-                        'sheetId': 0,
-                        'startColumnIndex': result_col_idx,
-                        'endColumnIndex': result_col_idx + 1,
-                        'startRowIndex': 1  # Skip header row
-                    }],
-                    'booleanRule': {
-                        'condition': {
-                            'type': 'TEXT_EQ',
-                            'values': [{'userEnteredValue': 'Ok'}]
-                        },
-                        'format': {
-                            'backgroundColor': {
-                                'red': 0.7176,
-                                'green': 0.8823,
-                                'blue': 0.7176
-                            }
-                        }
-                    }
-                }
-            }
-        },
-        {
-            'addConditionalFormatRule': {
-                'rule': {
-                    'ranges': [{
-                        'sheetId': 0,
-                        'startColumnIndex': result_col_idx,
-                        'endColumnIndex': result_col_idx + 1,
-                        'startRowIndex': 1  # Skip header row
-                    }],
-                    'booleanRule': {
-                        'condition': {
-                            'type': 'TEXT_EQ',
-                            'values': [{'userEnteredValue': 'Not ok'}]
-                        },
-                        'format': {
-                            'backgroundColor': {
-                                'red': 0.9568,
-                                'green': 0.7176,
-                                'blue': 0.7176
-                            }
-                        }
-                    }
-                }
-            }
-        }]
-
-        # Apply the formatting
-        service.spreadsheets().batchUpdate(
-            spreadsheetId=TARGET_SPREADSHEET_ID,
-            body={'requests': requests}
-        ).execute()
-        
+        write_values_to_target(service, prepare_sheet_values(data), spreadsheet_id, sheet_id)
         logger.info("Successfully wrote data and applied formatting to target sheet")
         return True
         
@@ -149,93 +274,645 @@ def write_to_target_sheet(service, data):
         logger.error(f"Failed to write to target sheet: {str(e)}")
         return False
 
-def extract_sheet_data():
-    """Extract and process data from source Google Sheet."""
+def write_tab(service, values, title, sheet_id, spreadsheet_id=TARGET_SPREADSHEET_ID):
+    """Replace the tab titled ``title`` of the target spreadsheet with string rows, adding it when missing.
+
+    A missing tab is added with ``sheet_id``, or the next free ID when another
+    tab already has that one, in the same batchUpdate that writes it, so a small
+    table costs one metadata read and one write. Returns the tab's sheet ID;
+    raises on failure.
+    """
+    existing = fetch_sheet_ids(service, spreadsheet_id, execute_request)
+    before = []
+    if title in existing:
+        sheet_id = existing[title]
+    else:
+        if sheet_id in existing.values():
+            sheet_id = max(existing.values()) + 1
+        before.append({'addSheet': {'properties': {'sheetId': sheet_id, 'title': title}}})
+    with get_metrics().stage('write'):
+        target_writer(service, spreadsheet_id, sheet_id).replace(values, before_requests=before)
+    return sheet_id
+
+def write_quarantine(values, path=None, service=None, sheet_id=QUARANTINE_SHEET_ID, title=QUARANTINE_SHEET):
+    """Write quarantined rows (header first, see QualityGate.take) to a local file and/or a tab.
+
+    ``path`` is any file type accepted by local_io.open_sink; with ``service``
+    the rows replace the quarantine tab of the target spreadsheet. Returns True on success.
+    """
+    import pandas as pd
     try:
-        logger.info("Starting data extraction process")
-        service = connect_to_sheets()
-        
-        SPREADSHEET_ID = '15FMeidgU2Dg7Q4JKPkLAdJmQ3IxWCWJXjhCo9UterCE'
-        RANGE_NAME = 'POD 5!A1:CE1000'
-        
-        logger.info(f"Fetching data from spreadsheet ID: {SPREADSHEET_ID}")
-        sheet = service.spreadsheets()
-        result = sheet.values().get(
-            spreadsheetId=SPREADSHEET_ID,
-            range=RANGE_NAME
-        ).execute()
-        
-        values = result.get('values', [])
-        
-        if not values:
-            logger.warning("No data found in the spreadsheet")
+        if path:
+            sink = open_sink(path)
+            try:
+                sink.write(pd.DataFrame(values[1:], columns=values[0], dtype=object))
+            finally:
+                sink.close()
+        if service is not None:
+            write_tab(service, values, title, sheet_id)
+        logger.info(f"Wrote {len(values) - 1} quarantined rows")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to write quarantined rows: {str(e)}")
+        return False
+
+def read_target_values(service):
+    """Read the current contents of the target sheet as string rows, header first."""
+    result = execute_request(service.spreadsheets().values().get(
+        spreadsheetId=TARGET_SPREADSHEET_ID,
+        range=TARGET_SHEET
+    ))
+    return result.get('values', [])
+
+def _load_last_write(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable last-write copy {path}: {str(e)}")
+        return None
+
+def _save_last_write(path, values):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(values, f)
+    os.replace(tmp_path, path)
+
+def write_diff_to_target_sheet(service, data, last_write_path=None):
+    """Write only the cells that changed since the target was last written.
+
+    The previous contents come from ``last_write_path`` when that local copy exists,
+    otherwise from reading the target sheet. Rows are matched on Unique ID, so
+    existing records keep their row; inserted rows take the slots of deleted ones
+    or go at the end. Falls back to write_to_target_sheet when the header differs
+    or Unique IDs are not unique.
+    """
+    try:
+        new_values = prepare_sheet_values(data)
+        headers = new_values[0]
+        old_values = None
+        if last_write_path and os.path.exists(last_write_path):
+            old_values = _load_last_write(last_write_path)
+        if old_values is None:
+            old_values = read_target_values(service)
+
+        layout = None
+        if old_values and old_values[0] == headers and 'Unique ID' in headers:
+            key = headers.index('Unique ID')
+            old_keys = [row[key] if key < len(row) else '' for row in old_values[1:]]
+            try:
+                layout = keyed_layout(old_keys, [row[key] for row in new_values[1:]])
+            except ValueError as e:
+                logger.warning(f"Cannot diff target sheet: {str(e)}")
+
+        if layout is None:
+            logger.info("Target sheet layout differs, performing full write")
+            if not write_to_target_sheet(service, data):
+                return False
+        else:
+            new_values = [headers] + [new_values[1 + index] for index in layout]
+            with get_metrics().stage('write'):
+                changed_cells, _ = target_writer(service).apply_diff(old_values, new_values)
+            get_metrics().count('cells_written', changed_cells)
+            logger.info(f"Updated {changed_cells} changed cells in target sheet")
+
+        if last_write_path:
+            _save_last_write(last_write_path, new_values)
+        return True
+
+    except Exception as e:
+        logger.error(f"Failed to write diff to target sheet: {str(e)}", exc_info=True)
+        return False
+
+def column_letter(index):
+    """Convert a 0-based column index to its A1 column letter (0 -> A, 26 -> AA)."""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+def clear_header_index_cache():
+    """Forget every cached header index so the next fetch re-reads the header rows."""
+    _header_index_cache.clear()
+
+def fetch_header(service, spreadsheet_id=SOURCE_SPREADSHEET_ID, tab=SOURCE_TAB):
+    """Fetch the header row of a source tab."""
+    with get_metrics().stage('fetch'):
+        result = execute_request(service.spreadsheets().values().get(
+            spreadsheetId=spreadsheet_id,
+            range=f'{tab}!1:1'
+        ))
+    values = result.get('values', [])
+    return values[0] if values else []
+
+def resolve_header_index(service, spreadsheet_id=SOURCE_SPREADSHEET_ID, tab=SOURCE_TAB, refresh=False):
+    """Return the cached header -> column letter index of a source tab.
+
+    The header row is fetched on first use (or when ``refresh`` is set). Returns
+    None when the tab has no header row and raises ValueError when any of the
+    required columns is missing.
+    """
+    key = (spreadsheet_id, tab)
+    if refresh or key not in _header_index_cache:
+        header = fetch_header(service, spreadsheet_id, tab)
+        if not header:
             return None
-            
-        logger.info(f"Successfully retrieved {len(values)} rows of data")
-        
-        df = pd.DataFrame(values[1:], columns=values[0])
-        logger.info(f"Created DataFrame with shape: {df.shape}")
-        logger.info(f"Available columns in DataFrame: {list(df.columns)}")
-        
-        required_columns = [
-            'Email Address', 'Tool being used', 'Feature used',
-            'Context Awareness', 'Autonomy', 'Experience',
-            'Output Quality', 'Overall Rating', 'Unique ID'
-        ]
-        
+        logger.info(f"Available columns in source: {header}")
+        index = {}
+        for position, name in enumerate(header):
+            index.setdefault(name, column_letter(position))
+
         # Verify all required columns exist
-        missing_columns = [col for col in required_columns if col not in df.columns]
+        missing_columns = [col for col in REQUIRED_COLUMNS if col not in index]
         if missing_columns:
             logger.error(f"Missing required columns: {missing_columns}")
             raise ValueError(f"Missing required columns: {missing_columns}")
-        
-        # Create a copy of the filtered DataFrame to avoid SettingWithCopyWarning
-        filtered_df = df[required_columns].copy()
-        logger.info(f"Filtered DataFrame created with {len(filtered_df)} rows and {len(required_columns)} columns")
-        
-        # Convert rating columns to numeric using .loc
-        rating_columns = ['Context Awareness', 'Autonomy', 'Experience', 'Output Quality', 'Overall Rating']
-        for col in rating_columns:
-            filtered_df.loc[:, col] = pd.to_numeric(filtered_df[col], errors='coerce')
+        _header_index_cache[key] = index
+    return _header_index_cache[key]
+
+def iter_source_windows(service, window_rows=DEFAULT_WINDOW_ROWS,
+                        spreadsheet_id=SOURCE_SPREADSHEET_ID, tab=SOURCE_TAB):
+    """Yield the required source columns one window of ``window_rows`` data rows at a time.
+
+    Each window is a dict mapping column name to an equal-length list of raw cell
+    values, fetched with a single batchGet of per-column ranges so only the
+    required columns cross the wire. Windows are requested until the API returns
+    an empty page.
+    """
+    index = resolve_header_index(service, spreadsheet_id, tab)
+    if index is None:
+        return
+    sheet = service.spreadsheets()
+    start = 2  # Row 1 holds the header
+    while True:
+        end = start + window_rows - 1
+        logger.info(f"Fetching rows {start}-{end} from spreadsheet ID: {spreadsheet_id}")
+        try:
+            with get_metrics().stage('fetch'):
+                result = execute_request(sheet.values().batchGet(
+                    spreadsheetId=spreadsheet_id,
+                    ranges=window_ranges(index, tab, start, end),
+                    majorDimension='COLUMNS'
+                ))
+        except HttpError as e:
+            if past_last_row(e):
+                return
+            raise
+        window = window_from_result(result)
+        if window is None:
+            return
+        yield window
+        start = end + 1
+
+def window_ranges(index, tab, start, end):
+    return [f'{tab}!{index[col]}{start}:{index[col]}{end}' for col in REQUIRED_COLUMNS]
+
+def past_last_row(error):
+    # A window starting past the last grid row is rejected rather than returned empty
+    return error.resp.status == 400 and 'exceeds grid limits' in str(error)
+
+def window_from_result(result):
+    """Return the window held by a per-column batchGet response, or None when it has no rows."""
+    columns = [(value_range.get('values') or [[]])[0] for value_range in result.get('valueRanges', [])]
+    length = max((len(column) for column in columns), default=0)
+    if not length:
+        return None
+    get_metrics().count('rows_fetched', length)
+    get_metrics().count('cells_fetched', sum(len(column) for column in columns))
+    # Trailing empty cells are omitted by the API, so pad every column to the window length
+    return {col: column + [''] * (length - len(column)) for col, column in zip(REQUIRED_COLUMNS, columns)}
+
+def window_validator(source='', first_row=2, seen=None):
+    """Return a function passing one raw window at a time through the shared QualityGate.
+
+    The function returns the window's clean rows, or None when none are left.
+    Duplicate Unique IDs are looked up in ``seen`` (a SeenIds), by default one
+    per validator, i.e. per pass over a source; pass one SeenIds to the
+    validators of every source of a multi-source pass so an ID repeated across
+    sources is caught too. Returns None when validation is off.
+    """
+    gate = get_quality_gate()
+    if gate is None:
+        return None
+    seen = seen or SeenIds()
+    position = {'row': first_row}
+
+    def validate(window):
+        length = len(window['Unique ID'])
+        with get_metrics().stage('validate'), seen.lock:
+            clean = gate.check(window, seen.ids, source, position['row'])
+        get_metrics().count('rows_quarantined', length - len(clean['Unique ID']))
+        position['row'] += length
+        return clean if clean['Unique ID'] else None
+    return validate
+
+def validate_windows(windows, source='', first_row=2, seen=None):
+    """Pass raw windows through the shared QualityGate, if validation is on, skipping emptied ones."""
+    validate = window_validator(source, first_row, seen)
+    if validate is None:
+        yield from windows
+        return
+    for window in windows:
+        clean = validate(window)
+        if clean is not None:
+            yield clean
+
+def iter_valid_windows(service, window_rows=DEFAULT_WINDOW_ROWS,
+                       spreadsheet_id=SOURCE_SPREADSHEET_ID, tab=SOURCE_TAB, seen=None):
+    """Yield the source windows of iter_source_windows that pass the quality gate."""
+    return validate_windows(iter_source_windows(service, window_rows, spreadsheet_id, tab),
+                            f'{spreadsheet_id}:{tab}', seen=seen)
+
+def fetch_source_values(service, window_rows=DEFAULT_WINDOW_ROWS,
+                        spreadsheet_id=SOURCE_SPREADSHEET_ID, tab=SOURCE_TAB, seen=None):
+    """Fetch the required source columns as a dict of column name -> list of values.
+
+    Returns None when the source tab is empty.
+    """
+    values = None
+    for window in iter_valid_windows(service, window_rows, spreadsheet_id, tab, seen):
+        if values is None:
+            values = {col: [] for col in REQUIRED_COLUMNS}
+        for col in REQUIRED_COLUMNS:
+            values[col].extend(window[col])
+    return values
+
+def build_frame(columns):
+    """Build the required-column DataFrame directly from a dict of column values."""
+    import pandas as pd
+    with get_metrics().stage('parse'):
+        filtered_df = pd.DataFrame(columns, columns=REQUIRED_COLUMNS)
+    logger.info(f"Filtered DataFrame created with {len(filtered_df)} rows and {len(REQUIRED_COLUMNS)} columns")
+    return filtered_df
+
+def compact_ratings(values):
+    """Parse raw rating cells into an Int8 array whose mask marks missing or non-numeric ratings.
+
+    Fractional or out-of-range ratings do not fit Int8 and give a Float64 array instead.
+    """
+    import numpy as np
+    import pandas as pd
+    numbers = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype='float64',
+                                                                                       na_value=np.nan)
+    missing = np.isnan(numbers)
+    filled = np.where(missing, 0, numbers)
+    if np.all((filled == np.round(filled)) & (filled >= -128) & (filled <= 127)):
+        return pd.arrays.IntegerArray(filled.astype('int8'), missing)
+    return pd.arrays.FloatingArray(filled, missing)
+
+def build_compact_frame(columns, pod=None):
+    """Build the required-column DataFrame with compact dtypes from a dict of raw column values.
+
+    Ratings become nullable Int8, tool and feature become categoricals and, when
+    given, ``pod`` fills a categorical Pod column. Raw cells are converted column
+    by column, so no all-object copy of the table is made.
+    """
+    import numpy as np
+    import pandas as pd
+    with get_metrics().stage('parse'):
+        frame = pd.DataFrame({
+            col: compact_ratings(columns[col]) if col in RATING_COLUMNS
+            else pd.Categorical(columns[col]) if col in CATEGORY_COLUMNS
+            else pd.Series(columns[col], dtype=object)
+            for col in REQUIRED_COLUMNS
+        })
+        if pod is not None:
+            frame['Pod'] = pd.Categorical.from_codes(np.zeros(len(frame), dtype='int8'), [pod])
+        return frame
+
+def concat_frames(frames):
+    """Concatenate frames, keeping categorical columns categorical across differing categories."""
+    import pandas as pd
+    from pandas.api.types import union_categoricals
+    categorical = [col for col, dtype in frames[0].dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+    combined = pd.concat([frame.drop(columns=categorical) for frame in frames], ignore_index=True)
+    for col in categorical:
+        combined[col] = union_categoricals([frame[col] for frame in frames])
+    return combined[list(frames[0].columns)]
+
+def fetch_compact_frame(service, window_rows=DEFAULT_WINDOW_ROWS,
+                        spreadsheet_id=SOURCE_SPREADSHEET_ID, tab=SOURCE_TAB, pod=None, seen=None):
+    """Fetch the source as a compact frame, converting each window as it arrives.
+
+    Returns None when the source tab is empty.
+    """
+    frames = [build_compact_frame(window, pod)
+              for window in iter_valid_windows(service, window_rows, spreadsheet_id, tab, seen)]
+    if not frames:
+        return None
+    frame = concat_frames(frames)
+    logger.info(f"Compact DataFrame created with {len(frame)} rows using "
+                f"{frame.memory_usage(deep=True).sum() / 1e6:.1f} MB")
+    return frame
+
+def classify_results(difference):
+    """Return "Ok" where the difference is within one point, else "Not ok" (including missing)."""
+    import numpy as np
+    import pandas as pd
+    difference = pd.to_numeric(difference, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    within = (difference >= -1) & (difference <= 1)
+    labels = np.array(RESULT_LABELS, dtype=object)
+    return np.where(within, labels[1], labels[0])
+
+def score_ratings(filtered_df):
+    """Add Mean Rating, Difference and Result columns to a required-column DataFrame.
+
+    Column statistics are only logged when DEBUG logging is on, and only
+    folded into running summaries (see Metrics.summarize) when the metrics
+    export asks for them, so chunked runs are described as a whole.
+    """
+    import pandas as pd
+    metrics = get_metrics()
+    with metrics.stage('score'):
+        # Convert rating columns to numeric; assigning whole columns gives float64 rather than object
+        for col in RATING_COLUMNS:
+            filtered_df[col] = pd.to_numeric(filtered_df[col], errors='coerce')
             logger.info(f"Converted {col} to numeric values")
-            logger.debug(f"{col} values: {filtered_df[col].describe()}")
+            logger.debug("%s values: %s", col, Lazy(filtered_df[col].describe))
 
         # Calculate Mean Rating using .loc
-        metrics_for_mean = ['Context Awareness', 'Autonomy', 'Experience', 'Output Quality']
-        logger.info(f"Calculating mean rating using metrics: {metrics_for_mean}")
-        
-        filtered_df.loc[:, 'Mean Rating'] = filtered_df[metrics_for_mean].mean(axis=1)
-        logger.info(f"Mean Rating statistics: \n{filtered_df['Mean Rating'].describe()}")
-        
+        logger.info(f"Calculating mean rating using metrics: {METRICS_FOR_MEAN}")
+
+        filtered_df.loc[:, 'Mean Rating'] = filtered_df[METRICS_FOR_MEAN].mean(axis=1)
+        logger.debug("Mean Rating statistics: \n%s", Lazy(filtered_df['Mean Rating'].describe))
+
         # Calculate difference using .loc
         filtered_df.loc[:, 'Difference'] = filtered_df['Mean Rating'] - filtered_df['Overall Rating']
-        logger.info(f"Difference statistics: \n{filtered_df['Difference'].describe()}")
-        
+        logger.debug("Difference statistics: \n%s", Lazy(filtered_df['Difference'].describe))
+
         # Determine Result status before trying to count it
-        filtered_df.loc[:, 'Result'] = filtered_df['Difference'].apply(
-            lambda x: 'Ok' if -1 <= x <= 1 else 'Not ok'
-        )
+        filtered_df.loc[:, 'Result'] = classify_results(filtered_df['Difference'])
         logger.info("Added Result status based on difference criteria")
+
+        # Counting Results is deferred like the other statistics
+        logger.debug("Result distribution: \n%s", Lazy(filtered_df['Result'].value_counts))
+
+    metrics.count('rows_scored', len(filtered_df))
+    if metrics.collect_stats:
+        metrics.summarize('mean_rating', filtered_df['Mean Rating'])
+        metrics.summarize('difference', filtered_df['Difference'])
+        ok = int((filtered_df['Result'] == RESULT_LABELS[1]).sum())
+        metrics.tally('result_counts', {RESULT_LABELS[1]: ok, RESULT_LABELS[0]: len(filtered_df) - ok})
+    return filtered_df
+
+def extract_sheet_data(window_rows=DEFAULT_WINDOW_ROWS, compact=False):
+    """Extract and process data from source Google Sheet.
+
+    With ``compact`` the frame uses Int8 ratings and categorical labels (see
+    build_compact_frame), cutting peak memory on large sources.
+    """
+    try:
+        logger.info("Starting data extraction process")
+        service = connect_to_sheets()
+
+        if compact:
+            frame = fetch_compact_frame(service, window_rows)
+            if frame is None:
+                logger.warning("No data found in the spreadsheet")
+                return None
+            logger.info(f"Successfully retrieved {len(frame)} rows of data")
+            return score_ratings(frame)
+
+        values = fetch_source_values(service, window_rows)
         
-        # Now we can safely count Results
-        result_counts = filtered_df['Result'].value_counts()
-        logger.info(f"Result distribution: \n{result_counts}")
-        
-        return filtered_df
-        
+        if not values:
+            logger.warning("No data found in the spreadsheet")
+            return None
+            
+        logger.info(f"Successfully retrieved {len(values['Unique ID'])} rows of data")
+
+        return score_ratings(build_frame(values))
+
+    except ValueError:
+        # Missing required columns are a configuration error the caller must see
+        raise
     except Exception as e:
         logger.error(f"Error during data extraction: {str(e)}", exc_info=True)
         return None
 
-# Update main execution
+def iter_scored_chunks(service, window_rows=DEFAULT_WINDOW_ROWS, compact=False):
+    """Yield scored DataFrames one source window at a time.
+
+    Only one window of raw values and its scored frame are held in memory at once,
+    regardless of how many responses the source sheet contains.
+    """
+    for window in iter_valid_windows(service, window_rows):
+        yield score_ratings(build_compact_frame(window) if compact else build_frame(window))
+
+def write_streaming(service, chunks):
+    """Write scored chunks to the target sheet as they arrive.
+
+    The first chunk goes through write_to_target_sheet (clear, header, formatting);
+    later chunks are written at the rows following it. Returns the number of rows written,
+    or None on failure.
+    """
+    written = 0
+    try:
+        for chunk in chunks:
+            if not write_chunk(service, chunk, written):
+                return None
+            written += len(chunk)
+            logger.info(f"Streamed {written} rows to target sheet")
+        return written
+    except Exception as e:
+        logger.error(f"Failed to stream to target sheet: {str(e)}", exc_info=True)
+        return None
+
+def write_chunk(service, chunk, written):
+    if not written:
+        return write_to_target_sheet(service, chunk)
+    rows = prepare_sheet_values(chunk)[1:]
+    with get_metrics().stage('write'):
+        # Below the header and the rows written so far, so a retried request cannot duplicate rows
+        target_writer(service).write_rows(written + 1, rows)
+    get_metrics().count('rows_written', len(rows))
+    return True
+
+def iter_replay_chunks(path, window_rows=DEFAULT_WINDOW_ROWS, compact=False):
+    """Yield scored DataFrames from a local dump of the source tab, one window at a time.
+
+    Accepts the CSV, JSON and Parquet dumps read by local_io.iter_dump_windows, so
+    backfills run at disk speed without calling the API.
+    """
+    for window in validate_windows(iter_dump_windows(path, REQUIRED_COLUMNS, window_rows), path):
+        get_metrics().count('rows_replayed', len(window['Unique ID']))
+        yield score_ratings(build_compact_frame(window) if compact else build_frame(window))
+
+def write_to_sinks(chunks, sinks, service=None):
+    """Write scored chunks to every local sink and, when ``service`` is given, to the target sheet.
+
+    Each chunk goes to the sinks before the sheet writer sees it, so the sinks
+    run alongside write_streaming. Sinks are closed even when a write fails.
+    Returns the number of rows written, or None on failure.
+    """
+    def tee():
+        for chunk in chunks:
+            with get_metrics().stage('sink'):
+                for sink in sinks:
+                    sink.write(chunk)
+            yield chunk
+
+    try:
+        if service is not None:
+            return write_streaming(service, tee())
+        written = 0
+        for chunk in tee():
+            written += len(chunk)
+        logger.info(f"Wrote {written} rows to {len(sinks)} local sink(s)")
+        return written
+    except Exception as e:
+        logger.error(f"Failed to write to local sinks: {str(e)}", exc_info=True)
+        return None
+    finally:
+        for sink in sinks:
+            sink.close()
+
+def parse_source(spec):
+    """Parse a ``SPREADSHEET_ID:TAB[:POD]`` source spec; the Pod defaults to the tab name."""
+    parts = spec.split(':')
+    if len(parts) not in (2, 3) or not all(parts):
+        raise ValueError(f"Invalid source '{spec}', expected SPREADSHEET_ID:TAB[:POD]")
+    return tuple(parts) if len(parts) == 3 else (parts[0], parts[1], parts[1])
+
+def extract_multi_source(sources, max_workers=DEFAULT_MAX_WORKERS, window_rows=DEFAULT_WINDOW_ROWS,
+                         compact=False):
+    """Extract several (spreadsheet ID, tab[, pod]) sources concurrently and score them together.
+
+    Sources are fetched on a bounded thread pool; connect_to_sheets gives each
+    worker thread its own service since the client is not thread-safe. Every row is tagged with
+    its Pod (the tab name unless given) before the combined frame is scored. ``compact``
+    builds each source's frame as in extract_sheet_data, with Pod as a categorical.
+    With validation on, a Unique ID repeated in another source is quarantined
+    like one repeated within a source.
+    """
+    try:
+        seen = SeenIds()
+        logger.info(f"Starting extraction of {len(sources)} sources with up to {max_workers} workers")
+
+        def fetch(source):
+            spreadsheet_id, tab = source[0], source[1]
+            pod = source[2] if len(source) > 2 else tab
+            if compact:
+                frame = fetch_compact_frame(connect_to_sheets(), window_rows, spreadsheet_id, tab, pod, seen)
+                if frame is None:
+                    frame = build_compact_frame({col: [] for col in REQUIRED_COLUMNS}, pod)
+                logger.info(f"Fetched {len(frame)} rows for Pod {pod}")
+                return frame
+            values = fetch_source_values(connect_to_sheets(), window_rows, spreadsheet_id, tab, seen)
+            frame = build_frame(values or {col: [] for col in REQUIRED_COLUMNS})
+            frame['Pod'] = pod
+            logger.info(f"Fetched {len(frame)} rows for Pod {pod}")
+            return frame
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(sources)))) as executor:
+            frames = list(executor.map(fetch, sources))
+
+        combined = concat_frames(frames) if frames else None
+        if combined is None or combined.empty:
+            logger.warning("No data found in any source")
+            return None
+        return score_ratings(combined)
+
+    except ValueError:
+        raise
+    except Exception as e:
+        logger.error(f"Error during multi-source extraction: {str(e)}", exc_info=True)
+        return None
+
+def sync_incremental(service, state_path=SYNC_STATE_PATH, rollup_tab=None):
+    """Write only new or changed source rows to the target sheet, keyed on Unique ID.
+
+    Falls back to a full rebuild via write_to_target_sheet when there is no usable
+    state, the source header or output schema changed, or rows were removed.
+    With ``rollup_tab`` (a rollup_tab.RollupTab) its per-group totals are updated
+    with the new rows and written to the summary tab; changed rows, or totals
+    that do not match the synced rows, rebuild them from all rows instead. The
+    sync state is saved as soon as the target is written, so a failed summary
+    write only leaves the totals to be rebuilt by the next sync.
+    """
+    try:
+        # Always re-read the header so schema changes are noticed by long-lived processes
+        index = resolve_header_index(service, refresh=True)
+        if index is None:
+            logger.warning("No data found in the spreadsheet")
+            return False
+        values = fetch_source_values(service) or {col: [] for col in REQUIRED_COLUMNS}
+
+        state = SyncState.load(state_path)
+        schema_hash = SyncState.fingerprint([f'{name}={letter}' for name, letter in index.items()]
+                                            + ['|'] + OUTPUT_COLUMNS)
+        filtered_df = build_frame(values)
+        unique_ids = filtered_df['Unique ID'].fillna('').astype(str).tolist()
+        row_hashes = [SyncState.fingerprint(row) for row in filtered_df.fillna('').astype(str).values.tolist()]
+
+        reason = None
+        if state.schema_hash is None:
+            reason = "no previous sync state"
+        elif state.schema_hash != schema_hash:
+            reason = "source header or output schema changed"
+        elif len(set(unique_ids)) != len(unique_ids) or '' in unique_ids:
+            reason = "Unique ID values are missing or duplicated"
+        elif not set(state.rows).issubset(unique_ids):
+            reason = "rows were removed from the source"
+
+        if reason:
+            logger.info(f"Performing full rebuild: {reason}")
+            scored_df = score_ratings(filtered_df)
+            if not write_to_target_sheet(service, scored_df):
+                return False
+            state.reset(schema_hash)
+            for offset, (unique_id, row_hash) in enumerate(zip(unique_ids, row_hashes)):
+                state.record(unique_id, row_hash, offset + 2)  # Row 1 holds the header
+            state.save(state_path)
+            if rollup_tab and not rollup_tab.update(service, scored_df, rebuild=True):
+                rollup_tab.mark_stale()
+                return False
+            return True
+
+        pending = [i for i, (unique_id, row_hash) in enumerate(zip(unique_ids, row_hashes))
+                   if state.rows.get(unique_id, [None])[0] != row_hash]
+        # Totals that do not match the synced rows (e.g. a failed summary write) are rebuilt
+        rollup_stale = rollup_tab is not None and rollup_tab.is_stale(len(state.rows))
+        if not pending and not rollup_stale:
+            logger.info("No new or changed rows since last sync")
+            return True
+
+        logger.info(f"Syncing {len(pending)} new or changed rows")
+        delta_df = score_ratings(filtered_df.iloc[pending].copy())
+        rows = prepare_sheet_values(delta_df)[1:]
+        changed_rows = any(unique_ids[i] in state.rows for i in pending)
+
+        updates = []
+        for i, row in zip(pending, rows):
+            target_row = state.target_row(unique_ids[i])
+            updates.append((target_row - 1, row))
+            state.record(unique_ids[i], row_hashes[i], target_row)
+
+        # Changed rows are patched in place and new rows written at the rows assigned to them,
+        # with the grid sized to the synced rows, so a re-sent or re-run write cannot duplicate them
+        if rows:
+            with get_metrics().stage('write'):
+                target_writer(service).patch(updates, row_count=max(row for _, row in state.rows.values()))
+            get_metrics().count('rows_written', len(rows))
+            state.save(state_path)
+        if rollup_tab:
+            # The previous values of changed rows are not kept, so those rebuild the totals from every row
+            rebuild = changed_rows or rollup_stale
+            scored_df = score_ratings(filtered_df.copy()) if rebuild else delta_df
+            if not rollup_tab.update(service, scored_df, rebuild):
+                rollup_tab.mark_stale()
+                return False
+        logger.info("Incremental sync completed successfully")
+        return True
+
+    except Exception as e:
+        logger.error(f"Failed to sync incrementally: {str(e)}", exc_info=True)
+        return False
+
 if __name__ == "__main__":
-    logger.info("Starting script execution")
-    data = extract_sheet_data()
-    if data is not None:
-        logger.info("Data extraction completed successfully")
-        if write_to_target_sheet(connect_to_sheets(), data):
-            logger.info("Process completed successfully")
-        else:
-            logger.error("Failed to write to target sheet")
-    else:
-        logger.error("Failed to extract data")
\ No newline at end of file
+    # The command line lives in cli.py; run it as ``python -m cli`` would, against the importable
+    # extract_data module, so it shares the session, scheduler and metrics of the helper modules
+    import runpy
+    runpy.run_module('cli', run_name='__main__')
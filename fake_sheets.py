@@ -0,0 +1,506 @@
+from googleapiclient.errors import HttpError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+import collections
+import copy
+import httplib2
+import json
+import threading
+import time
+
+"""In-process stand-in for the parts of the Google Sheets v4 API this project uses.
+
+FakeSheetsService mimics the ``service.spreadsheets()...execute()`` call chain of
+googleapiclient, keeps spreadsheets in memory and can inject latency, quota
+errors and payload-size limits. It also counts calls and bytes so benchmarks can
+measure what a pipeline run would cost against the real API. FakeSheetsHTTPServer
+serves it over local HTTP for testing REST transports.
+"""
+
+DEFAULT_ROW_COUNT = 1000
+DEFAULT_COLUMN_COUNT = 26
+
+def column_index(letters):
+    """Convert an A1 column letter to its 0-based index (A -> 0, AA -> 26)."""
+    index = 0
+    for letter in letters.upper():
+        index = index * 26 + ord(letter) - ord('A') + 1
+    return index - 1
+
+def _split_cell(cell):
+    letters = cell.rstrip('0123456789')
+    digits = cell[len(letters):]
+    return (column_index(letters) if letters else None), (int(digits) - 1 if digits else None)
+
+def parse_a1(range_name):
+    """Split an A1 range into (tab, start_row, end_row, start_col, end_col).
+
+    Indexes are 0-based with exclusive ends; None marks an open bound.
+    """
+    tab, _, a1 = range_name.partition('!')
+    if len(tab) > 1 and tab[0] == tab[-1] == "'":
+        tab = tab[1:-1].replace("''", "'")
+    if not a1:
+        return tab, 0, None, 0, None
+    start, _, end = a1.partition(':')
+    start_col, start_row = _split_cell(start)
+    end_col, end_row = _split_cell(end or start)
+    return (tab, start_row or 0, None if end_row is None else end_row + 1,
+            start_col or 0, None if end_col is None else end_col + 1)
+
+def _trim(rows):
+    """Drop trailing empty cells and rows like the API does."""
+    rows = [list(row) for row in rows]
+    for row in rows:
+        while row and row[-1] == '':
+            row.pop()
+    while rows and not rows[-1]:
+        rows.pop()
+    return rows
+
+def _cell_value(cell_data):
+    value = cell_data.get('userEnteredValue', {})
+    for key in ('stringValue', 'numberValue', 'boolValue', 'formulaValue'):
+        if key in value:
+            return value[key] if key == 'stringValue' else str(value[key])
+    return ''
+
+class FakeSheet:
+    """One tab: its properties, cell strings and conditional-format rules."""
+
+    def __init__(self, title, sheet_id, row_count=DEFAULT_ROW_COUNT, column_count=DEFAULT_COLUMN_COUNT):
+        self.title = title
+        self.sheet_id = sheet_id
+        self.row_count = row_count
+        self.column_count = column_count
+        self.rows = []
+        self.conditional_formats = []
+
+    def properties(self):
+        return {'sheetId': self.sheet_id, 'title': self.title,
+                'gridProperties': {'rowCount': self.row_count, 'columnCount': self.column_count}}
+
+    def check_grid(self, range_name, start_row, start_col, end_row=None, end_col=None):
+        if start_row >= self.row_count or start_col >= self.column_count or \
+                (end_row is not None and end_row > self.row_count) or \
+                (end_col is not None and end_col > self.column_count):
+            raise FakeSheetsService.error(
+                400, f"Range ({range_name}) exceeds grid limits. Max rows: {self.row_count}, "
+                     f"max columns: {self.column_count}")
+
+    def read(self, start_row, end_row, start_col, end_col):
+        end_row = self.row_count if end_row is None else min(end_row, self.row_count)
+        end_col = self.column_count if end_col is None else min(end_col, self.column_count)
+        return [row[start_col:end_col] for row in self.rows[start_row:end_row]]
+
+    def write(self, start_row, start_col, values):
+        for offset, new_row in enumerate(values):
+            row_index = start_row + offset
+            while len(self.rows) <= row_index:
+                self.rows.append([])
+            row = self.rows[row_index]
+            if len(row) < start_col + len(new_row):
+                row.extend([''] * (start_col + len(new_row) - len(row)))
+            row[start_col:start_col + len(new_row)] = new_row
+
+    def clear(self, start_row, end_row, start_col, end_col):
+        for row in self.rows[start_row:end_row]:
+            stop = len(row) if end_col is None else min(end_col, len(row))
+            for col in range(start_col, stop):
+                row[col] = ''
+        self.rows = _trim(self.rows)
+
+class FakeRequest:
+    """Deferred call returned by the fake resources; ``execute()`` runs it."""
+
+    def __init__(self, backend, name, method, uri, body, handler):
+        self.backend = backend
+        self.name = name
+        self.method = method
+        self.uri = uri
+        self.body = body
+        self._handler = handler
+
+    def execute(self, num_retries=0):
+        return self.backend.dispatch(self)
+
+class _Values:
+    def __init__(self, backend):
+        self._backend = backend
+
+    def get(self, spreadsheetId, range, majorDimension='ROWS', **kwargs):
+        return self._backend.request('values.get', 'GET', spreadsheetId, f'values/{range}', None,
+                                     lambda: self._backend.get_values(spreadsheetId, range, majorDimension))
+
+    def batchGet(self, spreadsheetId, ranges, majorDimension='ROWS', **kwargs):
+        ranges = [ranges] if isinstance(ranges, str) else list(ranges)
+        return self._backend.request(
+            'values.batchGet', 'GET', spreadsheetId, 'values:batchGet?ranges=' + '&ranges='.join(ranges), None,
+            lambda: {'spreadsheetId': spreadsheetId,
+                     'valueRanges': [self._backend.get_values(spreadsheetId, r, majorDimension) for r in ranges]})
+
+    def update(self, spreadsheetId, range, body, valueInputOption='RAW', **kwargs):
+        return self._backend.request('values.update', 'PUT', spreadsheetId, f'values/{range}', body,
+                                     lambda: self._backend.update_values(spreadsheetId, range, body['values']))
+
+    def clear(self, spreadsheetId, range, body=None, **kwargs):
+        return self._backend.request('values.clear', 'POST', spreadsheetId, f'values/{range}:clear', body or {},
+                                     lambda: self._backend.clear_values(spreadsheetId, range))
+
+    def batchUpdate(self, spreadsheetId, body, **kwargs):
+        def run():
+            responses = [self._backend.update_values(spreadsheetId, data['range'], data['values'])
+                         for data in body.get('data', [])]
+            return {'spreadsheetId': spreadsheetId, 'responses': responses,
+                    'totalUpdatedCells': sum(r['updatedCells'] for r in responses)}
+        return self._backend.request('values.batchUpdate', 'POST', spreadsheetId, 'values:batchUpdate', body, run)
+
+class _Spreadsheets:
+    def __init__(self, backend):
+        self._backend = backend
+
+    def values(self):
+        return _Values(self._backend)
+
+    def get(self, spreadsheetId, fields=None, ranges=None, includeGridData=False, **kwargs):
+        return self._backend.request('get', 'GET', spreadsheetId, f'?fields={fields}', None,
+                                     lambda: self._backend.get_spreadsheet(spreadsheetId))
+
+    def batchUpdate(self, spreadsheetId, body, **kwargs):
+        return self._backend.request('batchUpdate', 'POST', spreadsheetId, ':batchUpdate', body,
+                                     lambda: self._backend.batch_update(spreadsheetId, body['requests']))
+
+class FakeSheetsService:
+    """In-memory Sheets v4 backend exposing the googleapiclient resource interface.
+
+    ``latency`` seconds are slept per call (outside the lock, so concurrent
+    callers overlap). ``requests_per_minute`` enables a sliding-window quota that
+    answers 429 when exceeded, ``fail_every`` turns every Nth call into a 429 and
+    ``max_payload_bytes`` rejects larger request bodies with 400, as the real API
+    does. ``stats`` counts calls per method and the JSON bytes sent and received.
+    """
+
+    def __init__(self, latency=0.0, requests_per_minute=None, fail_every=None, max_payload_bytes=None,
+                 measure_bytes=True, clock=time.monotonic, sleep=time.sleep):
+        self.latency = latency
+        self.requests_per_minute = requests_per_minute
+        self.fail_every = fail_every
+        self.max_payload_bytes = max_payload_bytes
+        self.measure_bytes = measure_bytes
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.RLock()
+        self._recent_calls = collections.deque()
+        self.spreadsheets_by_id = {}
+        self.stats = collections.Counter()
+
+    @staticmethod
+    def error(status, message):
+        content = json.dumps({'error': {'code': status, 'message': message}}).encode('utf-8')
+        return HttpError(httplib2.Response({'status': status}), content)
+
+    # Setup helpers
+
+    def add_sheet(self, spreadsheet_id, title, values=None, sheet_id=None,
+                  row_count=None, column_count=None):
+        """Create a tab, optionally pre-filled with ``values``, sized to fit them by default."""
+        with self._lock:
+            sheets = self.spreadsheets_by_id.setdefault(spreadsheet_id, {})
+            if sheet_id is None:
+                sheet_id = 0 if not sheets else max(s.sheet_id for s in sheets.values()) + 1
+            values = [[str(cell) for cell in row] for row in (values or [])]
+            sheet = FakeSheet(title, sheet_id,
+                              row_count or max(DEFAULT_ROW_COUNT, len(values)),
+                              column_count or max([DEFAULT_COLUMN_COUNT] + [len(row) for row in values]))
+            sheet.rows = values
+            sheets[title] = sheet
+            return sheet
+
+    def sheet(self, spreadsheet_id, title=None, sheet_id=None):
+        """Return a tab by title or sheet ID."""
+        sheets = self.spreadsheets_by_id.get(spreadsheet_id)
+        if sheets is None:
+            raise self.error(404, f"Requested entity was not found: {spreadsheet_id}")
+        for sheet in sheets.values():
+            if sheet.title == title or (title is None and sheet.sheet_id == sheet_id):
+                return sheet
+        raise self.error(400, f"Unable to parse range: {title if title is not None else sheet_id}")
+
+    def values(self, spreadsheet_id, title):
+        """Return a tab's contents with trailing empty cells and rows trimmed."""
+        return _trim(self.sheet(spreadsheet_id, title).rows)
+
+    # googleapiclient interface
+
+    def spreadsheets(self):
+        return _Spreadsheets(self)
+
+    def request(self, name, method, spreadsheet_id, path, body, handler):
+        uri = f'https://sheets.googleapis.com/v4/spreadsheets/{spreadsheet_id}/{path}'
+        return FakeRequest(self, name, method, uri, body, handler)
+
+    def dispatch(self, request):
+        request_bytes = len(json.dumps(request.body)) if self.measure_bytes and request.body is not None else 0
+        with self._lock:
+            self.stats['calls'] += 1
+            self.stats[f'calls.{request.name}'] += 1
+            self.stats['bytes_sent'] += request_bytes + len(request.uri)
+            self._check_quota(request_bytes)
+        if self.latency:
+            self._sleep(self.latency)
+        with self._lock:
+            response = request._handler()
+            if self.measure_bytes:
+                self.stats['bytes_received'] += len(json.dumps(response))
+            return response
+
+    def _check_quota(self, request_bytes):
+        if self.fail_every and self.stats['calls'] % self.fail_every == 0:
+            self.stats['errors.429'] += 1
+            raise self.error(429, "Quota exceeded (injected)")
+        if self.requests_per_minute:
+            now = self._clock()
+            while self._recent_calls and self._recent_calls[0] <= now - 60:
+                self._recent_calls.popleft()
+            if len(self._recent_calls) >= self.requests_per_minute:
+                self.stats['errors.429'] += 1
+                raise self.error(429, "Quota exceeded for quota metric 'Read requests' and limit per minute")
+            self._recent_calls.append(now)
+        if self.max_payload_bytes and request_bytes > self.max_payload_bytes:
+            self.stats['errors.400'] += 1
+            raise self.error(400, f"Request payload size exceeds the limit: {self.max_payload_bytes} bytes.")
+
+    # Values resource
+
+    def get_values(self, spreadsheet_id, range_name, major_dimension='ROWS'):
+        tab, start_row, end_row, start_col, end_col = parse_a1(range_name)
+        sheet = self.sheet(spreadsheet_id, tab)
+        sheet.check_grid(range_name, start_row, start_col)
+        rows = _trim(sheet.read(start_row, end_row, start_col, end_col))
+        result = {'range': range_name, 'majorDimension': major_dimension}
+        if major_dimension == 'COLUMNS' and rows:
+            width = max(len(row) for row in rows)
+            rows = _trim([[row[col] if col < len(row) else '' for row in rows] for col in range(width)])
+        if rows:
+            result['values'] = rows
+        return result
+
+    def update_values(self, spreadsheet_id, range_name, values):
+        tab, start_row, _, start_col, _ = parse_a1(range_name)
+        sheet = self.sheet(spreadsheet_id, tab)
+        values = [['' if cell is None else str(cell) for cell in row] for row in values]
+        width = max((len(row) for row in values), default=0)
+        sheet.check_grid(range_name, start_row, start_col, start_row + len(values), start_col + width)
+        sheet.write(start_row, start_col, values)
+        return {'updatedRange': range_name, 'updatedRows': len(values),
+                'updatedCells': sum(len(row) for row in values)}
+
+    def clear_values(self, spreadsheet_id, range_name):
+        tab, start_row, end_row, start_col, end_col = parse_a1(range_name)
+        self.sheet(spreadsheet_id, tab).clear(start_row, end_row, start_col, end_col)
+        return {'spreadsheetId': spreadsheet_id, 'clearedRange': range_name}
+
+    # Spreadsheet resource
+
+    def get_spreadsheet(self, spreadsheet_id):
+        sheets = self.spreadsheets_by_id.get(spreadsheet_id)
+        if sheets is None:
+            raise self.error(404, f"Requested entity was not found: {spreadsheet_id}")
+        return {'spreadsheetId': spreadsheet_id, 'sheets': [
+            {'properties': sheet.properties(), 'conditionalFormats': copy.deepcopy(sheet.conditional_formats)}
+            for sheet in sorted(sheets.values(), key=lambda s: s.sheet_id)
+        ]}
+
+    def batch_update(self, spreadsheet_id, requests):
+        """Apply batchUpdate requests in order.
+
+        Unlike the real API a failing request does not roll back the ones before it;
+        copying large sheets for every call would dominate benchmark timings.
+        """
+        return {'spreadsheetId': spreadsheet_id,
+                'replies': [self._apply(spreadsheet_id, request) for request in requests]}
+
+    def _apply(self, spreadsheet_id, request):
+        (kind, payload), = request.items()
+        if kind == 'addSheet':
+            properties = payload.get('properties', {})
+            grid = properties.get('gridProperties', {})
+            sheets = self.spreadsheets_by_id.get(spreadsheet_id, {})
+            if properties['title'] in sheets:
+                raise self.error(400, f"A sheet with the name \"{properties['title']}\" already exists")
+            if properties.get('sheetId') in {sheet.sheet_id for sheet in sheets.values()}:
+                raise self.error(400, f"Sheet with id {properties['sheetId']} already exists")
+            sheet = self.add_sheet(spreadsheet_id, properties['title'], sheet_id=properties.get('sheetId'),
+                                   row_count=grid.get('rowCount'), column_count=grid.get('columnCount'))
+            return {'addSheet': {'properties': sheet.properties()}}
+        if kind == 'deleteSheet':
+            sheet = self.sheet(spreadsheet_id, sheet_id=payload['sheetId'])
+            del self.spreadsheets_by_id[spreadsheet_id][sheet.title]
+            return {}
+
+        sheet_id = payload.get('sheetId', payload.get('range', payload.get('start', {})).get('sheetId', 0))
+        if kind == 'updateSheetProperties':
+            sheet_id = payload['properties'].get('sheetId', 0)
+        elif kind in ('appendDimension',):
+            sheet_id = payload.get('sheetId', 0)
+        elif kind == 'deleteDimension':
+            sheet_id = payload['range'].get('sheetId', 0)
+        elif kind == 'addConditionalFormatRule':
+            sheet_id = payload['rule']['ranges'][0].get('sheetId', 0)
+        sheet = self.sheet(spreadsheet_id, sheet_id=sheet_id)
+
+        if kind == 'updateCells':
+            self._update_cells(sheet, payload)
+        elif kind == 'appendCells':
+            rows = [[_cell_value(cell) for cell in row.get('values', [])] for row in payload.get('rows', [])]
+            start = len(_trim(sheet.rows))
+            if start + len(rows) > sheet.row_count:
+                sheet.row_count = start + len(rows)
+            sheet.column_count = max([sheet.column_count] + [len(row) for row in rows])
+            sheet.write(start, 0, rows)
+        elif kind == 'appendDimension':
+            if payload.get('dimension', 'ROWS') == 'ROWS':
+                sheet.row_count += payload['length']
+            else:
+                sheet.column_count += payload['length']
+        elif kind == 'deleteDimension':
+            grid_range = payload['range']
+            start, end = grid_range.get('startIndex', 0), grid_range['endIndex']
+            if grid_range.get('dimension', 'ROWS') != 'ROWS':
+                raise self.error(400, "Only ROWS deletion is supported by the fake")
+            del sheet.rows[start:end]
+            sheet.row_count -= min(end, sheet.row_count) - start
+        elif kind == 'updateSheetProperties':
+            grid = payload['properties'].get('gridProperties', {})
+            if 'title' in payload['properties'] and 'title' in payload.get('fields', ''):
+                sheets = self.spreadsheets_by_id[spreadsheet_id]
+                del sheets[sheet.title]
+                sheet.title = payload['properties']['title']
+                sheets[sheet.title] = sheet
+            sheet.row_count = grid.get('rowCount', sheet.row_count)
+            sheet.column_count = grid.get('columnCount', sheet.column_count)
+            del sheet.rows[sheet.row_count:]
+            sheet.rows = [row[:sheet.column_count] for row in sheet.rows]
+        elif kind == 'addConditionalFormatRule':
+            sheet.conditional_formats.insert(payload.get('index', 0), copy.deepcopy(payload['rule']))
+        elif kind == 'updateConditionalFormatRule':
+            self._rule_index(sheet, payload['index'])
+            sheet.conditional_formats[payload['index']] = copy.deepcopy(payload['rule'])
+        elif kind == 'deleteConditionalFormatRule':
+            self._rule_index(sheet, payload['index'])
+            del sheet.conditional_formats[payload['index']]
+        else:
+            raise self.error(400, f"Unsupported request in fake backend: {kind}")
+        return {}
+
+    def _rule_index(self, sheet, index):
+        if not 0 <= index < len(sheet.conditional_formats):
+            raise self.error(400, f"No conditional format on sheet {sheet.sheet_id} at index {index}")
+
+    def _update_cells(self, sheet, payload):
+        rows = [[_cell_value(cell) for cell in row.get('values', [])] for row in payload.get('rows', [])]
+        if 'start' in payload:
+            start_row = payload['start'].get('rowIndex', 0)
+            start_col = payload['start'].get('columnIndex', 0)
+            end_row = start_row + len(rows)
+            end_col = start_col + max((len(row) for row in rows), default=0)
+        else:
+            grid_range = payload['range']
+            start_row, start_col = grid_range.get('startRowIndex', 0), grid_range.get('startColumnIndex', 0)
+            end_row = grid_range.get('endRowIndex', sheet.row_count)
+            end_col = grid_range.get('endColumnIndex', sheet.column_count)
+        sheet.check_grid(f"{sheet.title}", start_row if rows else 0, start_col if rows else 0,
+                         end_row, end_col)
+        if 'range' in payload:
+            # Cells in the range but not in ``rows`` are cleared
+            sheet.clear(start_row, end_row, start_col, end_col)
+        sheet.write(start_row, start_col, rows)
+
+class _FakeSheetsHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    prefix = '/v4/spreadsheets/'
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _route(self, method):
+        parts = urlsplit(self.path)
+        params = parse_qs(parts.query)
+        if not parts.path.startswith(self.prefix):
+            raise FakeSheetsService.error(404, f"Unknown path {parts.path}")
+        rest = parts.path[len(self.prefix):]
+        spreadsheets = self.server.backend.spreadsheets()
+        if method == 'POST' and rest.endswith(':batchUpdate'):
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length)) if length else {}
+            return spreadsheets.batchUpdate(spreadsheetId=unquote(rest[:-len(':batchUpdate')]), body=body)
+        major_dimension = params.get('majorDimension', ['ROWS'])[0]
+        if method == 'GET' and rest.endswith('/values:batchGet'):
+            return spreadsheets.values().batchGet(spreadsheetId=unquote(rest[:-len('/values:batchGet')]),
+                                                  ranges=params.get('ranges', []), majorDimension=major_dimension)
+        if method == 'GET' and '/values/' in rest:
+            spreadsheet_id, _, range_name = rest.partition('/values/')
+            return spreadsheets.values().get(spreadsheetId=unquote(spreadsheet_id), range=unquote(range_name),
+                                             majorDimension=major_dimension)
+        if method == 'GET' and '/' not in rest:
+            return spreadsheets.get(spreadsheetId=unquote(rest), fields=params.get('fields', [None])[0])
+        raise FakeSheetsService.error(404, f"Unknown path {parts.path}")
+
+    def _respond(self, method):
+        try:
+            status, content = 200, json.dumps(self._route(method).execute()).encode('utf-8')
+        except HttpError as e:
+            status, content = e.resp.status, e.content
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        self._respond('GET')
+
+    def do_POST(self):
+        self._respond('POST')
+
+class FakeSheetsHTTPServer:
+    """Serves a FakeSheetsService over HTTP/1.1 on localhost, for testing REST transports.
+
+    The Sheets v4 REST paths of values.get, values.batchGet, get and batchUpdate
+    are routed to the fake, so its stats, latency and injected errors apply, and
+    HttpErrors are answered with their status and JSON error body. Use as a
+    context manager; point a client at ``base_url``. ``connections`` counts the
+    TCP connections accepted.
+    """
+
+    def __init__(self, backend, host='127.0.0.1', port=0):
+        self._server = ThreadingHTTPServer((host, port), _FakeSheetsHandler)
+        self._server.daemon_threads = True
+        self._server.backend = backend
+        self._server.connections = 0
+        self._server.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def connections(self):
+        return self._server.connections
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
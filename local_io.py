@@ -0,0 +1,206 @@
+import csv
+import json
+import logging
+import os
+
+"""Local replay sources and bulk sinks for the scoring pipeline.
+
+Replay reads a local dump of a source tab (header row first) in the same
+column windows that iter_source_windows fetches from the API. Sinks take scored
+frames one chunk at a time and append them to a CSV file, a Parquet file or a
+SQLite table. pandas, sqlite3 and pyarrow are imported on first use; Parquet
+needs the optional pyarrow package.
+"""
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SQLITE_TABLE = 'scored_responses'
+DEFAULT_SQLITE_BATCH_ROWS = 5000
+
+def _require_pyarrow(purpose):
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(f"{purpose} needs the optional pyarrow package (pip install pyarrow)") from e
+    return pyarrow
+
+def _project(header, required_columns):
+    """Return the position of every required column in ``header``, raising ValueError if any is missing."""
+    index = {}
+    for position, name in enumerate(header):
+        index.setdefault(name, position)
+    missing_columns = [col for col in required_columns if col not in index]
+    if missing_columns:
+        raise ValueError(f"Missing required columns: {missing_columns}")
+    return [index[col] for col in required_columns]
+
+def _row_windows(rows, required_columns, window_rows):
+    """Group an iterator of rows (header first) into column windows of the required columns."""
+    rows = iter(rows)
+    header = next(rows, None)
+    if not header:
+        return
+    positions = _project([str(name) for name in header], required_columns)
+    window = []
+    for row in rows:
+        window.append(row)
+        if len(window) == window_rows:
+            yield _columns(window, required_columns, positions)
+            window = []
+    if window:
+        yield _columns(window, required_columns, positions)
+
+def _columns(rows, required_columns, positions):
+    # Short rows are padded with '' like the API's omitted trailing cells
+    return {col: [row[position] if position < len(row) else '' for row in rows]
+            for col, position in zip(required_columns, positions)}
+
+def _iter_csv_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        yield from csv.reader(f)
+
+def _load_json_rows(path):
+    with open(path, encoding='utf-8') as f:
+        payload = json.load(f)
+    # Either a saved values().get response or a bare list of rows
+    rows = payload.get('values', []) if isinstance(payload, dict) else payload
+    return [['' if cell is None else str(cell) for cell in row] for row in rows]
+
+def _iter_parquet_windows(path, required_columns, window_rows):
+    pyarrow = _require_pyarrow("Replaying a Parquet dump")
+    parquet_file = pyarrow.parquet.ParquetFile(path)
+    _project(parquet_file.schema_arrow.names, required_columns)
+    for batch in parquet_file.iter_batches(batch_size=window_rows, columns=list(required_columns)):
+        yield {col: ['' if cell is None else str(cell) for cell in batch.column(col).to_pylist()]
+               for col in required_columns}
+
+def iter_dump_windows(path, required_columns, window_rows):
+    """Yield the required columns of a local source dump one window of ``window_rows`` rows at a time.
+
+    ``path`` is a CSV file (header row first), a JSON file holding a saved
+    ``values().get`` response or a list of rows, or a Parquet file whose column
+    names are the source header. Windows are dicts of column name -> list of
+    strings, as yielded by iter_source_windows. Raises ValueError when a required
+    column is missing or the format is not recognised.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        yield from _row_windows(_iter_csv_rows(path), required_columns, window_rows)
+    elif extension == '.json':
+        yield from _row_windows(_load_json_rows(path), required_columns, window_rows)
+    elif extension in ('.parquet', '.pq'):
+        yield from _iter_parquet_windows(path, required_columns, window_rows)
+    else:
+        raise ValueError(f"Unsupported replay file '{path}', expected .csv, .json or .parquet")
+
+def normalize_frame(frame):
+    """Return ``frame`` with numeric columns as float64 (NaN when missing) and the rest as str or None.
+
+    Compact and default frames, and chunks whose ratings parsed to different
+    dtypes, all normalize to the same schema.
+    """
+    import numpy as np
+    import pandas as pd
+    columns = {}
+    for col in frame.columns:
+        series = frame[col]
+        if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            columns[col] = series.to_numpy(dtype='float64', na_value=np.nan)
+        else:
+            columns[col] = series.astype(object).where(series.notna(), None).to_numpy()
+    return pd.DataFrame(columns, index=range(len(frame)))
+
+class CsvSink:
+    """Appends scored chunks to a CSV file, writing the header with the first chunk."""
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._header_written = False
+
+    def write(self, frame):
+        normalize_frame(frame).to_csv(self._file, index=False, header=not self._header_written, na_rep='')
+        self._header_written = True
+        self.rows += len(frame)
+
+    def close(self):
+        self._file.close()
+
+class ParquetSink:
+    """Streams scored chunks into one Parquet file, a row group per chunk (needs pyarrow)."""
+
+    def __init__(self, path):
+        self.pyarrow = _require_pyarrow("Writing Parquet")
+        self.path = path
+        self.rows = 0
+        self._writer = None
+
+    def write(self, frame):
+        table = self.pyarrow.Table.from_pandas(normalize_frame(frame), preserve_index=False)
+        if self._writer is None:
+            self._writer = self.pyarrow.parquet.ParquetWriter(self.path, table.schema)
+        else:
+            table = table.cast(self._writer.schema)
+        self._writer.write_table(table)
+        self.rows += len(frame)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+class SqliteSink:
+    """Replaces ``table`` in a SQLite database and fills it with batched inserts.
+
+    Numeric columns are REAL and the rest TEXT; each chunk is inserted with
+    executemany in batches of ``batch_rows`` inside one transaction.
+    """
+
+    def __init__(self, path, table=DEFAULT_SQLITE_TABLE, batch_rows=DEFAULT_SQLITE_BATCH_ROWS):
+        import sqlite3
+        self.path = path
+        self.table = table
+        self.batch_rows = batch_rows
+        self.rows = 0
+        self._connection = sqlite3.connect(path)
+        self._insert = None
+
+    @staticmethod
+    def _quote(name):
+        return '"' + str(name).replace('"', '""') + '"'
+
+    def _create_table(self, frame):
+        import pandas as pd
+        columns = ', '.join(f"{self._quote(col)} {'REAL' if pd.api.types.is_float_dtype(frame[col].dtype) else 'TEXT'}"
+                            for col in frame.columns)
+        with self._connection:
+            self._connection.execute(f"DROP TABLE IF EXISTS {self._quote(self.table)}")
+            self._connection.execute(f"CREATE TABLE {self._quote(self.table)} ({columns})")
+        placeholders = ', '.join('?' for _ in frame.columns)
+        self._insert = f"INSERT INTO {self._quote(self.table)} VALUES ({placeholders})"
+
+    def write(self, frame):
+        frame = normalize_frame(frame)
+        if self._insert is None:
+            self._create_table(frame)
+        # NaN is stored as NULL, like the empty cells of the sheet
+        columns = [[None if value != value else value for value in frame[col].tolist()] for col in frame.columns]
+        rows = list(zip(*columns))
+        with self._connection:
+            for start in range(0, len(rows), self.batch_rows):
+                self._connection.executemany(self._insert, rows[start:start + self.batch_rows])
+        self.rows += len(rows)
+
+    def close(self):
+        self._connection.close()
+
+SINK_TYPES = {'.csv': CsvSink, '.parquet': ParquetSink, '.pq': ParquetSink,
+              '.sqlite': SqliteSink, '.sqlite3': SqliteSink, '.db': SqliteSink}
+
+def open_sink(path):
+    """Open the sink matching the extension of ``path`` (.csv, .parquet or .sqlite/.db)."""
+    sink_type = SINK_TYPES.get(os.path.splitext(path)[1].lower())
+    if sink_type is None:
+        raise ValueError(f"Unsupported sink '{path}', expected .csv, .parquet, .sqlite or .db")
+    return sink_type(path)
@@ -0,0 +1,168 @@
+from contextlib import contextmanager
+import collections
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+"""Per-stage timings, counters and lazily computed statistics of pipeline runs."""
+
+logger = logging.getLogger(__name__)
+
+class Lazy:
+    """Defers ``compute()`` until the value is formatted, e.g. as a logging argument.
+
+    ``logger.debug("%s", Lazy(series.describe))`` only runs describe() when the
+    record is actually emitted.
+    """
+
+    def __init__(self, compute):
+        self.compute = compute
+
+    def __str__(self):
+        return str(self.compute())
+
+def _number(value):
+    value = float(value)
+    return None if math.isnan(value) else value
+
+class Metrics:
+    """Collects stage timings and counters, and exports them as JSON or a Prometheus textfile.
+
+    ``stage(name)`` times a block, accumulating seconds and calls per stage;
+    ``count(name, n)`` adds to a counter. ``summarize`` and ``tally`` fold the
+    values of one chunk at a time into running statistics of the current pass,
+    so chunked runs describe every row without keeping the chunks; after
+    ``end_pass`` the next fold starts a new pass. Folding costs a pass over the
+    values, so callers only fold when ``collect_stats`` is set, i.e. when an
+    export will include statistics. All methods are thread-safe.
+    """
+
+    def __init__(self, clock=time.perf_counter, collect_stats=False):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.collect_stats = collect_stats
+        self.reset()
+
+    def reset(self):
+        """Forget all recorded timings, counters and statistics."""
+        with self._lock:
+            self.stages = collections.OrderedDict()
+            self.counters = collections.Counter()
+            self._folds = collections.OrderedDict()
+            self._pass_ended = False
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as one call of stage ``name``."""
+        started = self._clock()
+        try:
+            yield
+        finally:
+            elapsed = self._clock() - started
+            with self._lock:
+                stage = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0})
+                stage['seconds'] += elapsed
+                stage['calls'] += 1
+
+    def count(self, name, n=1):
+        """Add ``n`` to counter ``name``."""
+        with self._lock:
+            self.counters[name] += n
+
+    def _fold(self, name, empty, merge):
+        with self._lock:
+            if self._pass_ended:
+                self._folds.clear()
+                self._pass_ended = False
+            merge(self._folds.setdefault(name, empty))
+
+    def summarize(self, name, values):
+        """Fold the numbers in ``values`` (NaNs skipped) into summary statistic ``name`` of this pass."""
+        import numpy as np
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        part = {'count': len(values), 'sum': float(values.sum()), 'sum_sq': float(np.square(values).sum()),
+                'min': float(values.min()), 'max': float(values.max())}
+
+        def merge(total):
+            for key in ('count', 'sum', 'sum_sq'):
+                total[key] = total.get(key, 0) + part[key]
+            total['min'] = min(total.get('min', part['min']), part['min'])
+            total['max'] = max(total.get('max', part['max']), part['max'])
+        self._fold(name, {}, merge)
+
+    def tally(self, name, counts):
+        """Add a mapping of labels to counts to statistic ``name`` of this pass."""
+        self._fold(name, collections.Counter(), lambda total: total.update(counts))
+
+    def end_pass(self):
+        """Keep the folded statistics until the next fold, which starts them afresh."""
+        with self._lock:
+            self._pass_ended = True
+
+    @staticmethod
+    def _describe(total):
+        count = total['count']
+        mean = total['sum'] / count
+        variance = (total['sum_sq'] - count * mean * mean) / (count - 1) if count > 1 else math.nan
+        return {'count': count, 'mean': mean, 'std': math.sqrt(max(variance, 0.0)) if count > 1 else math.nan,
+                'min': total['min'], 'max': total['max']}
+
+    def compute_stats(self):
+        """Describe every folded statistic of the pass as a mapping of labels to numbers."""
+        with self._lock:
+            folds = [(name, total.copy()) for name, total in self._folds.items()]
+        computed = {}
+        for name, total in folds:
+            # Tallies are already label -> count; summaries are described here
+            values = total if isinstance(total, collections.Counter) else self._describe(total)
+            computed[name] = {str(label): _number(v) for label, v in values.items()}
+        return computed
+
+    def as_dict(self, include_stats=False):
+        """Return the metrics as a JSON-serializable dict."""
+        with self._lock:
+            result = {
+                'stages': {name: {'seconds': round(stage['seconds'], 6), 'calls': stage['calls']}
+                           for name, stage in self.stages.items()},
+                'counters': dict(self.counters),
+            }
+        if include_stats:
+            result['stats'] = self.compute_stats()
+        return result
+
+    def to_json(self, include_stats=False):
+        """Return the metrics as a JSON document."""
+        return json.dumps(self.as_dict(include_stats), indent=2, sort_keys=True)
+
+    def to_prometheus(self, prefix='sheet_pipeline', include_stats=False):
+        """Return the metrics in the Prometheus text exposition format."""
+        data = self.as_dict(include_stats)
+        lines = [f'# TYPE {prefix}_stage_seconds counter', f'# TYPE {prefix}_stage_calls counter']
+        for name, stage in data['stages'].items():
+            lines.append(f'{prefix}_stage_seconds{{stage="{name}"}} {stage["seconds"]}')
+            lines.append(f'{prefix}_stage_calls{{stage="{name}"}} {stage["calls"]}')
+        for name, value in sorted(data['counters'].items()):
+            lines.append(f'# TYPE {prefix}_{name} counter')
+            lines.append(f'{prefix}_{name} {value}')
+        if include_stats:
+            lines.append(f'# TYPE {prefix}_stat gauge')
+            for name, values in data['stats'].items():
+                for label, number in values.items():
+                    if number is not None:
+                        label = label.replace('\\', '\\\\').replace('"', '\\"')
+                        lines.append(f'{prefix}_stat{{name="{name}",field="{label}"}} {number}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path, fmt='json', include_stats=False):
+        """Atomically write the metrics to ``path`` as ``json`` or ``prometheus``."""
+        text = self.to_prometheus(include_stats=include_stats) if fmt == 'prometheus' else self.to_json(include_stats)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
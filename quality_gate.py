@@ -0,0 +1,135 @@
+from itertools import compress
+import logging
+import threading
+
+"""Vectorized data-quality checks that split raw source windows into clean and quarantined rows."""
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_RATING = 1
+DEFAULT_MAX_RATING = 5
+
+# Reason codes, in the order they are listed for a row failing several checks
+MISSING_ID = 'missing_unique_id'
+DUPLICATE_ID = 'duplicate_unique_id'
+NON_NUMERIC_RATING = 'non_numeric_rating'
+RATING_OUT_OF_RANGE = 'rating_out_of_range'
+REASONS = [MISSING_ID, DUPLICATE_ID, NON_NUMERIC_RATING, RATING_OUT_OF_RANGE]
+
+class SeenIds:
+    """The IDs seen so far in one pass, shareable by the windows of several sources.
+
+    Hold ``lock`` around QualityGate.check when sources are validated on
+    several threads, so an ID is only let through once.
+    """
+
+    def __init__(self):
+        self.ids = set()
+        self.lock = threading.Lock()
+
+class QualityGate:
+    """Checks raw windows (``columns`` name -> list of cells) before they are scored.
+
+    Ratings must be blank or numbers within ``[min_rating, max_rating]``, and
+    ``id_column`` must be set and not repeat an ID seen earlier in the same pass
+    (a set shared by the windows of one source). A window passes on set
+    operations alone when every rating is blank or a whole number in range and
+    its IDs are new and distinct; only columns that fail those are checked row
+    by row with pandas. Failing rows are recorded with their source, sheet row
+    and reason codes, and are dropped from the window. ``check`` may be called
+    from several threads.
+    """
+
+    def __init__(self, columns, rating_columns, id_column='Unique ID', min_rating=DEFAULT_MIN_RATING,
+                 max_rating=DEFAULT_MAX_RATING):
+        self.columns = list(columns)
+        self.rating_columns = list(rating_columns)
+        self.id_column = id_column
+        self.min_rating = min_rating
+        self.max_rating = max_rating
+        self.valid_cells = {''} | {str(rating) for rating in range(int(min_rating), int(max_rating) + 1)
+                                   if min_rating <= rating <= max_rating}
+        self.rows = []
+        self.counts = dict.fromkeys(REASONS, 0)
+        self._lock = threading.Lock()
+
+    def _rating_masks(self, values):
+        import numpy as np
+        import pandas as pd
+        cells = pd.Series(values, dtype=object)
+        suspect = ~cells.isin(list(self.valid_cells)).to_numpy()
+        non_numeric = np.zeros(len(cells), dtype=bool)
+        out_of_range = np.zeros(len(cells), dtype=bool)
+        if suspect.any():
+            numbers = pd.to_numeric(cells[suspect], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+            non_numeric[suspect] = np.isnan(numbers)
+            out_of_range[suspect] = (numbers < self.min_rating) | (numbers > self.max_rating)
+        return non_numeric, out_of_range
+
+    def _id_masks(self, ids, seen):
+        import numpy as np
+        import pandas as pd
+        series = pd.Series(ids, dtype=object)
+        missing = series.isna().to_numpy() | (series == '').to_numpy()
+        duplicate = series.duplicated().to_numpy()
+        if seen:
+            duplicate = duplicate | np.fromiter(map(seen.__contains__, ids), dtype=bool, count=len(ids))
+        return missing, duplicate & ~missing
+
+    def check(self, window, seen, source='', first_row=2):
+        """Return ``window`` without the rows that fail a check.
+
+        ``seen`` is the set of IDs of earlier windows of the same pass and is
+        updated with this window's IDs; ``first_row`` is the sheet row of the
+        window's first row. The window is returned unchanged when every row passes.
+        """
+        ids = window[self.id_column]
+        distinct_ids = set(ids)
+        ids_ok = (len(distinct_ids) == len(ids) and '' not in distinct_ids and None not in distinct_ids
+                  and seen.isdisjoint(distinct_ids))
+        suspect_columns = [col for col in self.rating_columns if not self.valid_cells.issuperset(window[col])]
+        if ids_ok and not suspect_columns:
+            seen.update(distinct_ids)
+            return window
+
+        import numpy as np
+        length = len(ids)
+        masks = dict(zip((MISSING_ID, DUPLICATE_ID), self._id_masks(ids, seen)))
+        seen.update(distinct_ids)
+        masks[NON_NUMERIC_RATING] = np.zeros(length, dtype=bool)
+        masks[RATING_OUT_OF_RANGE] = np.zeros(length, dtype=bool)
+        for col in suspect_columns:
+            non_numeric, out_of_range = self._rating_masks(window[col])
+            masks[NON_NUMERIC_RATING] |= non_numeric
+            masks[RATING_OUT_OF_RANGE] |= out_of_range
+        bad = np.logical_or.reduce(list(masks.values()))
+        if not bad.any():
+            # e.g. only fractional or zero-padded ratings such as '4.5' or '04'
+            return window
+
+        rows = []
+        for position in np.flatnonzero(bad).tolist():
+            reasons = ';'.join(reason for reason in REASONS if masks[reason][position])
+            rows.append([source, str(first_row + position), reasons] + [window[col][position] for col in self.columns])
+        with self._lock:
+            self.rows.extend(rows)
+            for reason in REASONS:
+                self.counts[reason] += int(masks[reason].sum())
+        logger.warning(f"Quarantined {len(rows)} of {length} rows from {source} rows "
+                       f"{first_row}-{first_row + length - 1}")
+        keep = (~bad).tolist()
+        return {col: list(compress(values, keep)) for col, values in window.items()}
+
+    def header(self):
+        """Return the header of the quarantined rows."""
+        return ['Source', 'Row', 'Reason'] + self.columns
+
+    def take(self):
+        """Return the quarantined rows recorded so far (header first) and forget them."""
+        with self._lock:
+            rows, self.rows = self.rows, []
+            counts, self.counts = self.counts, dict.fromkeys(REASONS, 0)
+        if rows:
+            reasons = ', '.join(f"{reason}={count}" for reason, count in counts.items() if count)
+            logger.warning(f"{len(rows)} rows quarantined: {reasons}")
+        return [self.header()] + rows
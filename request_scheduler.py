@@ -0,0 +1,167 @@
+from concurrent.futures import Future
+from googleapiclient.errors import HttpError
+import logging
+import random
+import threading
+import time
+
+"""Quota-aware scheduling, retry and coalescing of Google Sheets API requests."""
+
+logger = logging.getLogger(__name__)
+
+# Sheets API default quota: 60 requests per minute per user per project
+DEFAULT_REQUESTS_PER_MINUTE = 60
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``rate_per_minute``.
+
+    The bucket starts full, so up to ``capacity`` requests may burst before the
+    limiter starts spacing them out.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = float(self.capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _take(self):
+        """Take one token if available and return 0, else return the seconds until one is."""
+        with self._lock:
+            now = self._clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        """Take one token, sleeping until one is available."""
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            self._sleep(wait)
+
+    async def acquire_async(self):
+        """Take one token, awaiting (without blocking the event loop) until one is available."""
+        import asyncio
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+class RequestScheduler:
+    """Executes API requests through a rate limiter with exponential backoff.
+
+    Requests failing with 429/5xx (or a dropped connection) are retried with
+    full-jitter exponential backoff, honouring ``Retry-After`` when the server
+    sends one. Identical GET requests issued while one is already in flight share
+    its result instead of spending quota twice. ``execute_async`` applies the same
+    limit and retries to coroutine calls, sharing the bucket with ``execute``.
+    """
+
+    def __init__(self, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, max_retries=5,
+                 base_delay=1.0, max_delay=64.0, clock=time.monotonic, sleep=time.sleep):
+        self.bucket = TokenBucket(requests_per_minute, clock=clock, sleep=sleep)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self.calls = 0
+        self.retries = 0
+
+    @staticmethod
+    def _coalesce_key(request):
+        if getattr(request, 'method', None) != 'GET' or not isinstance(getattr(request, 'uri', None), str):
+            return None
+        return request.uri
+
+    def execute(self, request):
+        """Execute ``request`` (anything with ``.execute()``) and return its response."""
+        key = self._coalesce_key(request)
+        if key is None:
+            return self._execute_with_retry(request)
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+        if not owner:
+            logger.debug(f"Coalescing duplicate request {key}")
+            return future.result()
+
+        try:
+            result = self._execute_with_retry(request)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def _retry_delay(self, attempt, error):
+        retry_after = None
+        if isinstance(error, HttpError):
+            retry_after = error.resp.get('retry-after')
+        if retry_after is not None:
+            try:
+                return min(self.max_delay, float(retry_after))
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _next_retry(self, attempt, error):
+        """Return the delay before retrying after ``error``, or None when it must be raised."""
+        retryable = not isinstance(error, HttpError) or error.resp.status in RETRYABLE_STATUSES
+        if not retryable or attempt >= self.max_retries:
+            return None
+        delay = self._retry_delay(attempt, error)
+        with self._lock:
+            self.retries += 1
+        logger.warning(f"Retrying request in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries}): {str(error)}")
+        return delay
+
+    def _execute_with_retry(self, request):
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            with self._lock:
+                self.calls += 1
+            try:
+                return request.execute()
+            except (HttpError, ConnectionError, TimeoutError) as e:
+                delay = self._next_retry(attempt, e)
+                if delay is None:
+                    raise
+                attempt += 1
+                self._sleep(delay)
+
+    async def execute_async(self, call):
+        """Await ``call()`` (a coroutine function making one API request) and return its response."""
+        import asyncio
+        attempt = 0
+        while True:
+            await self.bucket.acquire_async()
+            with self._lock:
+                self.calls += 1
+            try:
+                return await call()
+            except (HttpError, ConnectionError, TimeoutError) as e:
+                delay = self._next_retry(attempt, e)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
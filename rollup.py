@@ -0,0 +1,120 @@
+import json
+import logging
+import os
+
+"""Running per-group aggregates (per Pod, Tool and Feature) of scored responses."""
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = ['Pod', 'Tool being used', 'Feature used']
+RATING_COLUMNS = ['Context Awareness', 'Autonomy', 'Experience', 'Output Quality', 'Overall Rating']
+# Difference histogram edges; bins are (-inf, -2], (-2, -1], (-1, 0], (0, 1], (1, 2], (2, inf)
+DIFFERENCE_EDGES = [-2, -1, 0, 1, 2]
+DIFFERENCE_LABELS = ['≤ -2', '-2 to -1', '-1 to 0', '0 to 1', '1 to 2', '> 2', 'missing']
+FIELDS = (['responses', 'ok', 'not_ok']
+          + [f'sum:{col}' for col in RATING_COLUMNS] + [f'n:{col}' for col in RATING_COLUMNS]
+          + [f'diff:{label}' for label in DIFFERENCE_LABELS])
+SUMMARY_HEADER = (['Dimension', 'Group', 'Responses', 'Ok', 'Not ok', 'Ok ratio']
+                  + [f'Mean {col}' for col in RATING_COLUMNS]
+                  + [f'Difference {label}' for label in DIFFERENCE_LABELS])
+
+class Rollup:
+    """Running sums, counts and Difference histograms per group of each dimension.
+
+    ``add`` folds a scored frame into the totals with one vectorized groupby per
+    dimension, so updates cost the size of the new rows, not of the history.
+    Dimensions missing from a frame (e.g. Pod for a single-tab run) are
+    skipped. ``save``/``load`` keep the totals between runs.
+    """
+
+    VERSION = 1
+
+    def __init__(self, totals=None):
+        # dimension -> {group: [value per FIELDS]}
+        self.totals = totals or {}
+
+    def _group_sums(self, frame):
+        import numpy as np
+        import pandas as pd
+        difference = pd.to_numeric(frame['Difference'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        bins = np.searchsorted(DIFFERENCE_EDGES, difference, side='left')
+        bins[np.isnan(difference)] = len(DIFFERENCE_LABELS) - 1
+        result = frame['Result'].astype(object).to_numpy()
+        columns = {'responses': np.ones(len(frame)), 'ok': result == 'Ok', 'not_ok': result == 'Not ok'}
+        ratings = {col: pd.to_numeric(frame[col], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+                   for col in RATING_COLUMNS}
+        columns.update({f'sum:{col}': np.nan_to_num(values) for col, values in ratings.items()})
+        columns.update({f'n:{col}': ~np.isnan(values) for col, values in ratings.items()})
+        one_hot = np.eye(len(DIFFERENCE_LABELS))[bins]
+        columns.update({f'diff:{label}': one_hot[:, i] for i, label in enumerate(DIFFERENCE_LABELS)})
+        values = pd.DataFrame(columns, columns=FIELDS).astype('float64')
+        for dimension in DIMENSIONS:
+            if dimension in frame.columns:
+                groups = frame[dimension].astype(object).where(frame[dimension].notna(), '').astype(str).to_numpy()
+                yield dimension, values.groupby(groups, sort=False).sum()
+
+    def add(self, frame):
+        """Fold the rows of a scored frame into the totals."""
+        if not len(frame):
+            return
+        for dimension, sums in self._group_sums(frame):
+            totals = self.totals.setdefault(dimension, {})
+            for group, row in zip(sums.index, sums.to_numpy().tolist()):
+                current = totals.get(group, [0.0] * len(FIELDS))
+                totals[group] = [total + value for total, value in zip(current, row)]
+
+    def track(self, chunks):
+        """Yield ``chunks`` unchanged, adding each to the totals on the way through."""
+        for chunk in chunks:
+            self.add(chunk)
+            yield chunk
+
+    def total_responses(self):
+        """Return the number of responses in the totals (counted over the first tracked dimension)."""
+        for dimension in DIMENSIONS:
+            if dimension in self.totals:
+                return int(sum(values[0] for values in self.totals[dimension].values()))
+        return 0
+
+    def summary_rows(self):
+        """Return the summary table as string rows, header first."""
+        rows = [list(SUMMARY_HEADER)]
+        index = {field: i for i, field in enumerate(FIELDS)}
+        for dimension in DIMENSIONS:
+            for group, values in sorted(self.totals.get(dimension, {}).items()):
+                responses = values[index['responses']]
+                means = []
+                for col in RATING_COLUMNS:
+                    count = values[index[f'n:{col}']]
+                    means.append(str(round(values[index[f'sum:{col}']] / count, 2)) if count else '')
+                rows.append([dimension, group, str(int(responses)), str(int(values[index['ok']])),
+                             str(int(values[index['not_ok']])), str(round(values[index['ok']] / responses, 4))]
+                            + means + [str(int(values[index[f'diff:{label}']])) for label in DIFFERENCE_LABELS])
+        return rows
+
+    @classmethod
+    def load(cls, path):
+        """Load totals from ``path``; a missing, unreadable or outdated file yields empty totals."""
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, encoding='utf-8') as f:
+                payload = json.load(f)
+            if payload.get('version') != cls.VERSION or payload.get('fields') != FIELDS:
+                logger.warning(f"Ignoring rollup state with unsupported layout in {path}")
+                return cls()
+            return cls(payload.get('totals'))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable rollup state {path}: {str(e)}")
+            return cls()
+
+    def save(self, path):
+        """Atomically write the totals to ``path``."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.VERSION, 'fields': FIELDS, 'totals': self.totals}, f)
+        os.replace(tmp_path, path)
+
+    def reset(self):
+        """Forget all totals."""
+        self.totals = {}
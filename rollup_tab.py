@@ -0,0 +1,59 @@
+import logging
+import os
+
+import extract_data
+from rollup import Rollup
+
+"""The summary tab of per Pod/Tool/Feature rollup totals next to the target sheet."""
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_SHEET = 'Summary'
+ROLLUP_SHEET_ID = 1
+ROLLUP_STATE_PATH = os.path.join(os.path.dirname(__file__), 'rollup_state.json')
+
+def write_rollup_tab(service, rollup, spreadsheet_id=extract_data.TARGET_SPREADSHEET_ID, sheet_id=ROLLUP_SHEET_ID,
+                     title=ROLLUP_SHEET):
+    """Replace the summary tab next to the target sheet with the rollup table. Returns True on success."""
+    try:
+        values = rollup.summary_rows()
+        extract_data.write_tab(service, values, title, sheet_id, spreadsheet_id)
+        logger.info(f"Wrote {len(values) - 1} rollup groups to {title}")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to write rollup tab: {str(e)}")
+        return False
+
+class RollupTab:
+    """The summary tab as kept up to date by extract_data.sync_incremental.
+
+    The running totals are saved in ``state_path`` between runs. ``update``
+    folds newly synced rows into them (or rebuilds them from every row) and
+    rewrites the tab; after a failed write ``mark_stale`` drops them, so
+    ``is_stale`` tells the next sync to rebuild them.
+    """
+
+    def __init__(self, state_path=ROLLUP_STATE_PATH):
+        self.state_path = state_path
+
+    def is_stale(self, synced_rows):
+        """Return True when the saved totals do not count exactly ``synced_rows`` responses."""
+        return Rollup.load(self.state_path).total_responses() != synced_rows
+
+    def update(self, service, scored_df, rebuild=False):
+        """Add a scored frame to the saved totals, or start them afresh from it, and write the tab.
+
+        The totals are only saved once the tab is written. Returns True on success.
+        """
+        rollup = Rollup() if rebuild else Rollup.load(self.state_path)
+        rollup.add(scored_df)
+        if not write_rollup_tab(service, rollup):
+            return False
+        rollup.save(self.state_path)
+        return True
+
+    def mark_stale(self):
+        """Drop the saved totals so the next sync finds them out of step with the synced rows and rebuilds them."""
+        logger.warning("Summary tab not updated; its totals will be rebuilt on the next sync")
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
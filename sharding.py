@@ -0,0 +1,91 @@
+from concurrent.futures import ThreadPoolExecutor
+import logging
+
+import extract_data
+from write_engine import fetch_sheet_ids, split_rows
+
+"""Sharded output: the scored table split across tabs of the target spreadsheet, listed in an index tab."""
+
+logger = logging.getLogger(__name__)
+
+SHARD_PREFIX = 'Results'
+SHARD_INDEX_SHEET = 'Shard Index'
+SHARD_INDEX_SHEET_ID = 3
+# Shard tabs get sheet IDs from here up, clear of the fixed target, summary and quarantine tabs
+FIRST_SHARD_SHEET_ID = 100
+SHARD_INDEX_COLUMNS = ['Tab', 'Pod', 'Rows', 'First row', 'Last row']
+
+def shard_title(key, part, prefix=SHARD_PREFIX):
+    """Return the tab title of shard ``part`` (from 1) of ``key`` (a Pod, or None when splitting by row count)."""
+    if key is None:
+        return f"{prefix} {part}"
+    return f"{prefix} {key}" + (f" ({part})" if part > 1 else '')
+
+def read_shard_titles(service, spreadsheet_id=extract_data.TARGET_SPREADSHEET_ID, existing=None):
+    """Return the shard tab titles listed in the index tab by the last write_sharded, or [] without one."""
+    if existing is not None and SHARD_INDEX_SHEET not in existing:
+        return []
+    result = extract_data.execute_request(service.spreadsheets().values().get(
+        spreadsheetId=spreadsheet_id,
+        range=f"'{SHARD_INDEX_SHEET}'!A2:A"
+    ))
+    return [row[0] for row in result.get('values', []) if row and row[0]]
+
+def write_sharded(service, data, shard_rows=None, by_pod=False, spreadsheet_id=extract_data.TARGET_SPREADSHEET_ID,
+                  max_workers=extract_data.DEFAULT_MAX_WORKERS, prefix=SHARD_PREFIX):
+    """Write processed data across tabs of the target spreadsheet, one per Pod and/or ``shard_rows`` rows.
+
+    Missing shard tabs are added, and tabs listed in the index tab by an earlier
+    run but no longer part of the output are deleted, in a single batchUpdate;
+    no other tab is ever deleted. The shards are then written concurrently, each
+    sized to its rows and given the Result colouring. The index tab lists every
+    shard with its rows' positions in the combined output. Returns True on success.
+    """
+    try:
+        values = extract_data.prepare_sheet_values(data)
+        header = values[0]
+        if by_pod and 'Pod' not in header:
+            raise ValueError("Sharding by Pod needs a Pod column; extract with --source")
+        shards = split_rows(values[1:], shard_rows, header.index('Pod') if by_pod else None)
+
+        existing = fetch_sheet_ids(service, spreadsheet_id, extract_data.execute_request)
+        next_sheet_id = max([FIRST_SHARD_SHEET_ID - 1] + list(existing.values())) + 1
+        plan, requests = [], []
+        for key, part, offset, rows in shards:
+            title = shard_title(key, part, prefix)
+            sheet_id = existing.get(title)
+            if sheet_id is None:
+                sheet_id, next_sheet_id = next_sheet_id, next_sheet_id + 1
+                requests.append({'addSheet': {'properties': {'sheetId': sheet_id, 'title': title}}})
+            plan.append((title, sheet_id, key, offset, rows))
+        titles = {shard[0] for shard in plan}
+        stale = set(read_shard_titles(service, spreadsheet_id, existing)) - titles
+        requests += [{'deleteSheet': {'sheetId': existing[title]}} for title in sorted(stale) if title in existing]
+        if requests:
+            extract_data.execute_request(service.spreadsheets().batchUpdate(
+                spreadsheetId=spreadsheet_id,
+                body={'requests': requests}
+            ))
+
+        logger.info(f"Writing {len(values) - 1} rows across {len(plan)} shard tabs")
+        def write_shard(shard):
+            _, sheet_id, _, _, rows = shard
+            # Each worker thread gets its own service
+            extract_data.write_values_to_target(extract_data.connect_to_sheets(), [header] + rows, spreadsheet_id,
+                                                sheet_id)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(plan)))) as executor:
+            # list() re-raises the first failure
+            list(executor.map(write_shard, plan))
+        extract_data.get_metrics().count('shards_written', len(plan))
+
+        index = [SHARD_INDEX_COLUMNS] + [
+            [title, '' if key is None else str(key), str(len(rows)), str(offset + 1), str(offset + len(rows))]
+            for title, _, key, offset, rows in plan
+        ]
+        extract_data.write_tab(service, index, SHARD_INDEX_SHEET, SHARD_INDEX_SHEET_ID, spreadsheet_id)
+        logger.info(f"Successfully wrote {len(plan)} shards and the {SHARD_INDEX_SHEET} tab")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to write sharded output: {str(e)}", exc_info=True)
+        return False
@@ -0,0 +1,49 @@
+from unittest.mock import Mock
+from fake_sheets import parse_a1
+
+"""Mock Sheets services shared by the unit tests."""
+
+def mock_source_service(values):
+    """Return a Mock Sheets service that serves ``values`` (header row first) from any tab.
+
+    Header reads (``Tab!1:1``) go through ``values().get`` and column reads through
+    ``values().batchGet`` with ``majorDimension='COLUMNS'``, mirroring the real API
+    by omitting trailing empty cells. Every requested range is appended to
+    ``service.requested_ranges``.
+    """
+    return mock_multi_source_service(lambda spreadsheet_id, tab: values)
+
+def mock_multi_source_service(lookup):
+    """Like mock_source_service, but ``lookup(spreadsheet_id, tab)`` picks the values per tab.
+
+    ``lookup`` may also be a dict keyed by ``(spreadsheet_id, tab)``.
+    """
+    if isinstance(lookup, dict):
+        lookup = lambda spreadsheet_id, tab, sources=lookup: sources[(spreadsheet_id, tab)]
+    service = Mock()
+    service.requested_ranges = []
+    sheet_values = service.spreadsheets.return_value.values.return_value
+
+    def get(spreadsheetId, range):
+        service.requested_ranges.append(range)
+        values = lookup(spreadsheetId, range.split('!')[0])
+        return Mock(execute=Mock(return_value={'values': values[:1]} if values else {}))
+
+    def batch_get(spreadsheetId, ranges, majorDimension='ROWS'):
+        service.requested_ranges.append(list(ranges))
+        value_ranges = []
+        for range_name in ranges:
+            tab, start, end, col, _ = parse_a1(range_name)
+            values = lookup(spreadsheetId, tab)
+            column = [row[col] if col < len(row) else '' for row in values[start:end]]
+            while column and column[-1] == '':
+                column.pop()
+            value_range = {'range': range_name, 'majorDimension': majorDimension}
+            if column:
+                value_range['values'] = [column]
+            value_ranges.append(value_range)
+        return Mock(execute=Mock(return_value={'valueRanges': value_ranges}))
+
+    sheet_values.get.side_effect = get
+    sheet_values.batchGet.side_effect = batch_get
+    return service
@@ -0,0 +1,113 @@
+import datetime
+import importlib
+import json
+import logging
+import os
+import threading
+
+"""Reusable, token-cached Google Sheets API session."""
+
+logger = logging.getLogger(__name__)
+
+SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+
+# Google client modules are imported on first use so importing this module stays cheap
+_LAZY_IMPORTS = {
+    'service_account': ('google.oauth2.service_account', None),
+    'build': ('googleapiclient.discovery', 'build'),
+    'google_auth_httplib2': ('google_auth_httplib2', None),
+    'httplib2': ('httplib2', None),
+}
+
+def __getattr__(name):
+    """Import one of the deferred Google client modules on first access."""
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _LAZY_IMPORTS[name]
+    value = importlib.import_module(module_name)
+    if attribute:
+        value = getattr(value, attribute)
+    globals()[name] = value
+    return value
+
+def _lazy(name):
+    # Module globals win, so patched attributes are honoured
+    return globals()[name] if name in globals() else __getattr__(name)
+
+class SheetsSession:
+    """Loads service-account credentials once and hands out reusable Sheets services.
+
+    Each thread gets its own service (the underlying httplib2 connection is not
+    thread-safe), built once from the bundled static discovery document so no
+    discovery round-trip is made. Access tokens are reused until they expire and,
+    when ``token_cache_path`` is set, persisted across runs.
+    """
+
+    def __init__(self, credentials_path, scopes=None, token_cache_path=None):
+        self.credentials_path = credentials_path
+        self.scopes = scopes or SCOPES
+        self.token_cache_path = token_cache_path
+        self._credentials = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def credentials(self):
+        """Service-account credentials, loaded on first use."""
+        with self._lock:
+            if self._credentials is None:
+                self._credentials = _lazy('service_account').Credentials.from_service_account_file(
+                    self.credentials_path,
+                    scopes=self.scopes
+                )
+                self._load_cached_token(self._credentials)
+            return self._credentials
+
+    def service(self):
+        """Return this thread's Sheets service, building it on first use."""
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            build = _lazy('build')
+            service = build('sheets', 'v4', credentials=self.credentials,
+                            static_discovery=True, cache_discovery=False)
+            self._local.service = service
+        return service
+
+    def ensure_token(self):
+        """Refresh the access token if it is missing or expired, then persist it."""
+        credentials = self.credentials
+        with self._lock:
+            if not credentials.valid:
+                logger.info("Fetching a new access token")
+                credentials.refresh(_lazy('google_auth_httplib2').Request(_lazy('httplib2').Http()))
+                self._save_cached_token(credentials)
+        return credentials.token
+
+    def _cache_key(self, credentials):
+        return {'service_account': getattr(credentials, 'service_account_email', None),
+                'scopes': sorted(self.scopes)}
+
+    def _load_cached_token(self, credentials):
+        if not self.token_cache_path or not os.path.exists(self.token_cache_path):
+            return
+        try:
+            with open(self.token_cache_path, encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('key') != self._cache_key(credentials):
+                return
+            credentials.token = cached['token']
+            credentials.expiry = datetime.datetime.fromisoformat(cached['expiry'])
+            logger.info("Loaded cached access token")
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable token cache {self.token_cache_path}: {str(e)}")
+
+    def _save_cached_token(self, credentials):
+        if not self.token_cache_path or not credentials.token or credentials.expiry is None:
+            return
+        tmp_path = f"{self.token_cache_path}.tmp"
+        # The token grants access to the sheets, so keep it private to the current user
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'key': self._cache_key(credentials), 'token': credentials.token,
+                       'expiry': credentials.expiry.isoformat()}, f)
+        os.replace(tmp_path, self.token_cache_path)
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import logging
+import os
+
+"""Local columnar snapshot of the fetched source values (numpy is imported on first use)."""
+
+logger = logging.getLogger(__name__)
+
+class SourceSnapshot:
+    """Fetched source columns plus a content hash, kept as memory-mapped NumPy files.
+
+    A snapshot directory holds ``manifest.json`` (version, content hash, column
+    names and row count) and one fixed-width unicode ``.npy`` file per column, so a
+    reload maps the files instead of parsing them. The manifest is written last and
+    marks the snapshot complete.
+    """
+
+    VERSION = 1
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, columns, salt='', content_hash=None):
+        import numpy as np
+        self.columns = {name: np.asarray(values, dtype=str) for name, values in columns.items()}
+        self.content_hash = content_hash or self.hash_columns(self.columns, salt)
+
+    @staticmethod
+    def hash_columns(columns, salt=''):
+        """Return a SHA-256 of the column names and contents, prefixed by ``salt``."""
+        import numpy as np
+        digest = hashlib.sha256(salt.encode('utf-8'))
+        for name, values in columns.items():
+            values = np.ascontiguousarray(values, dtype=str)
+            digest.update(f'\x1e{name}\x1f{values.dtype.str}\x1f{len(values)}\x1f'.encode('utf-8'))
+            digest.update(values.tobytes())
+        return digest.hexdigest()
+
+    @classmethod
+    def read_manifest(cls, path):
+        """Return the manifest of the snapshot in ``path``, or None when there is no usable one."""
+        manifest_path = os.path.join(path, cls.MANIFEST)
+        if not os.path.exists(manifest_path):
+            return None
+        try:
+            with open(manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable snapshot manifest {manifest_path}: {str(e)}")
+            return None
+        if manifest.get('version') != cls.VERSION:
+            logger.warning(f"Ignoring snapshot with unsupported version in {path}")
+            return None
+        return manifest
+
+    @classmethod
+    def load(cls, path):
+        """Map the snapshot in ``path`` read-only; returns None when it is missing or unreadable."""
+        import numpy as np
+        manifest = cls.read_manifest(path)
+        if manifest is None:
+            return None
+        try:
+            columns = {name: np.load(os.path.join(path, f'{i}.npy'), mmap_mode='r')
+                       for i, name in enumerate(manifest['columns'])}
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable snapshot {path}: {str(e)}")
+            return None
+        snapshot = cls.__new__(cls)
+        snapshot.columns = columns
+        snapshot.content_hash = manifest['content_hash']
+        return snapshot
+
+    def save(self, path):
+        """Write the snapshot to ``path``, replacing any previous one."""
+        import numpy as np
+        os.makedirs(path, exist_ok=True)
+        manifest_path = os.path.join(path, self.MANIFEST)
+        # Drop the old manifest first so a crash mid-write leaves no snapshot rather than a mixed one
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+        for i, values in enumerate(self.columns.values()):
+            np.save(os.path.join(path, f'{i}.npy'), values)
+        tmp_path = f"{manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.VERSION, 'content_hash': self.content_hash,
+                       'columns': list(self.columns), 'rows': len(self)}, f)
+        os.replace(tmp_path, manifest_path)
+
+    def to_values(self):
+        """Return the columns as a dict of column name -> list of strings."""
+        return {name: values.tolist() for name, values in self.columns.items()}
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()), ()))
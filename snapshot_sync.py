@@ -0,0 +1,119 @@
+import logging
+import os
+
+import extract_data
+from snapshot_cache import SourceSnapshot
+from sync_state import SyncState
+
+"""Rewriting the target only when the source changed: --snapshot, --offline and --watch."""
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(__file__), 'source_snapshot')
+
+def snapshot_salt(spreadsheet_id=extract_data.SOURCE_SPREADSHEET_ID, tab=extract_data.SOURCE_TAB, output_options=()):
+    """Return the part of a snapshot's content hash that ties it to the source, target and output schema.
+
+    ``output_options`` are strings naming how the target is written (e.g.
+    ``'diff=True'``), so a run writing it another way does not skip an
+    unchanged source.
+    """
+    target = [extract_data.TARGET_SPREADSHEET_ID, extract_data.TARGET_SHEET]
+    return SyncState.fingerprint([spreadsheet_id, tab, '|'] + target + ['|'] + list(output_options) + ['|']
+                                 + extract_data.OUTPUT_COLUMNS)
+
+def load_snapshot_data(snapshot_dir=SNAPSHOT_DIR, compact=False):
+    """Score the source values saved in ``snapshot_dir`` without calling the API.
+
+    Returns None when there is no usable snapshot.
+    """
+    snapshot = SourceSnapshot.load(snapshot_dir)
+    if snapshot is None:
+        logger.warning(f"No source snapshot found in {snapshot_dir}")
+        return None
+    logger.info(f"Loaded {len(snapshot)} rows from source snapshot {snapshot_dir}")
+    values = snapshot.to_values()
+    return _score(values, compact)
+
+def _score(values, compact):
+    return extract_data.score_ratings(
+        extract_data.build_compact_frame(values) if compact else extract_data.build_frame(values))
+
+def _write_to_target(data):
+    return extract_data.write_to_target_sheet(extract_data.connect_to_sheets(), data)
+
+def sync_if_changed(last_hash, window_rows=extract_data.DEFAULT_WINDOW_ROWS, compact=False, write=None,
+                    snapshot_dir=None, output_options=()):
+    """Extract, score and write the source unless its content hash equals ``last_hash``.
+
+    ``write`` takes the scored frame and returns True on success (default:
+    write_to_target_sheet). After a successful write the values are saved to
+    ``snapshot_dir`` when given. ``output_options`` describe ``write`` as in
+    snapshot_salt. Returns the content hash the target now reflects, which is
+    ``last_hash`` when nothing changed. Raises on failure.
+    """
+    if write is None:
+        write = _write_to_target
+    values = extract_data.fetch_source_values(extract_data.connect_to_sheets(), window_rows)
+    if not values:
+        raise RuntimeError("No data found in the spreadsheet")
+
+    snapshot = SourceSnapshot(values, snapshot_salt(output_options=output_options))
+    if snapshot.content_hash == last_hash:
+        logger.info(f"Source unchanged since last write ({last_hash[:12]}), skipping")
+        return last_hash
+
+    logger.info(f"Source content changed, processing {len(snapshot)} rows")
+    data = _score(values, compact)
+    if not write(data):
+        raise RuntimeError("Failed to write to target sheet")
+    if snapshot_dir:
+        snapshot.save(snapshot_dir)
+    return snapshot.content_hash
+
+def sync_with_snapshot(snapshot_dir=SNAPSHOT_DIR, window_rows=extract_data.DEFAULT_WINDOW_ROWS, compact=False,
+                       write=None, output_options=()):
+    """Extract, score and write the source unless it is unchanged since the last successful write.
+
+    The fetched values are hashed and compared with the snapshot in ``snapshot_dir``;
+    on a match nothing is scored and the target is not touched. After a successful
+    write the values become the new snapshot. Returns True when the target is up to date.
+    """
+    try:
+        manifest = SourceSnapshot.read_manifest(snapshot_dir)
+        last_hash = manifest['content_hash'] if manifest else None
+        sync_if_changed(last_hash, window_rows, compact, write, snapshot_dir, output_options)
+        return True
+
+    except ValueError:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to sync with snapshot: {str(e)}", exc_info=True)
+        return False
+
+def watch_source(poller, window_rows=extract_data.DEFAULT_WINDOW_ROWS, compact=False, write=None,
+                 snapshot_dir=None, after_tick=None, output_options=()):
+    """Keep the target in step with the source until ``poller`` is stopped.
+
+    Every tick re-reads the source header, so schema changes are picked up, and
+    runs sync_if_changed with the hash of the last write, held in memory and
+    seeded from ``snapshot_dir`` when given. The session, scheduler and header
+    cache stay warm between ticks. ``after_tick``, when given, is called after
+    every tick, failed or not (e.g. to export metrics). Returns the number of ticks run.
+    """
+    manifest = SourceSnapshot.read_manifest(snapshot_dir) if snapshot_dir else None
+    state = {'hash': manifest['content_hash'] if manifest else None}
+
+    def tick():
+        try:
+            extract_data.resolve_header_index(extract_data.connect_to_sheets(), refresh=True)
+            content_hash = sync_if_changed(state['hash'], window_rows, compact, write, snapshot_dir, output_options)
+            changed = content_hash != state['hash']
+            state['hash'] = content_hash
+            return changed
+        finally:
+            if after_tick:
+                after_tick()
+
+    logger.info(f"Watching source every {poller.min_interval:g}-{poller.max_interval:g}s")
+    return poller.run(tick)
@@ -0,0 +1,67 @@
+import hashlib
+import json
+import logging
+import os
+
+"""Local watermark of source rows already written to the target sheet."""
+
+logger = logging.getLogger(__name__)
+
+class SyncState:
+    """Tracks the schema fingerprint and per-Unique ID row hashes of the last sync.
+
+    ``rows`` maps each Unique ID to ``[row_hash, target_row]`` where ``target_row``
+    is the 1-based row number the record occupies in the target sheet.
+    """
+
+    VERSION = 1
+
+    def __init__(self, schema_hash=None, rows=None):
+        self.schema_hash = schema_hash
+        self.rows = rows or {}
+        self._next_row = max((row for _, row in self.rows.values()), default=1) + 1
+
+    @staticmethod
+    def fingerprint(values):
+        """Return a stable hash of a sequence of cell values."""
+        return hashlib.sha1('\x1f'.join(str(v) for v in values).encode('utf-8')).hexdigest()
+
+    @classmethod
+    def load(cls, path):
+        """Load state from ``path``; a missing or unreadable file yields an empty state."""
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, encoding='utf-8') as f:
+                payload = json.load(f)
+            if payload.get('version') != cls.VERSION:
+                logger.warning(f"Ignoring sync state with unsupported version in {path}")
+                return cls()
+            return cls(payload.get('schema_hash'), payload.get('rows'))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable sync state {path}: {str(e)}")
+            return cls()
+
+    def save(self, path):
+        """Atomically write the state to ``path``."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.VERSION, 'schema_hash': self.schema_hash, 'rows': self.rows}, f)
+        os.replace(tmp_path, path)
+
+    def reset(self, schema_hash):
+        """Forget all rows and start tracking a new schema."""
+        self.schema_hash = schema_hash
+        self.rows = {}
+        self._next_row = 2
+
+    def record(self, unique_id, row_hash, target_row):
+        """Remember that ``unique_id`` with ``row_hash`` was written to ``target_row``."""
+        self.rows[unique_id] = [row_hash, target_row]
+        self._next_row = max(self._next_row, target_row + 1)
+
+    def target_row(self, unique_id):
+        """Return the target row for ``unique_id``, allocating the next free row if it is new."""
+        if unique_id in self.rows:
+            return self.rows[unique_id][1]
+        return self._next_row
@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+import extract_data
+from batch_runner import load_manifest, run_batch, score_values
+from extract_data import configure_scheduler, clear_header_index_cache
+from fake_sheets import FakeSheetsService
+
+"""Unit tests for the manifest-driven batch runner."""
+
+class TestBatchRunner(unittest.TestCase):
+    """Test cases for load_manifest and run_batch."""
+
+    def setUp(self):
+        configure_scheduler()
+        clear_header_index_cache()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.fake = FakeSheetsService()
+        header = extract_data.REQUIRED_COLUMNS
+        for cohort, overall in (('cohortA', '4'), ('cohortB', '1')):
+            rows = [[f'u{i}@x.com', 'Tool', 'Chat', '4', '4', '4', '4', overall, f'{cohort}-{i}'] for i in range(5)]
+            self.fake.add_sheet(cohort, 'Responses', [header] + rows)
+            self.fake.add_sheet(f'{cohort}-out', 'Sheet1', sheet_id=7)
+        patcher = patch('extract_data.connect_to_sheets', return_value=self.fake)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.jobs = [
+            {'name': cohort, 'source_spreadsheet_id': cohort, 'source_tab': 'Responses',
+             'target_spreadsheet_id': f'{cohort}-out', 'target_sheet_id': 7}
+            for cohort in ('cohortA', 'cohortB')
+        ]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_manifest(self, payload):
+        path = os.path.join(self.tmp_dir.name, 'manifest.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+        return path
+
+    def test_load_manifest_fills_defaults_and_validates(self):
+        manifest = {'jobs': [{'source_spreadsheet_id': 's', 'target_spreadsheet_id': 't'}]}
+        jobs = load_manifest(self.write_manifest(manifest))
+
+        self.assertEqual(jobs, [{'source_spreadsheet_id': 's', 'target_spreadsheet_id': 't', 'name': 's:POD 5',
+                                 'source_tab': 'POD 5', 'target_sheet_id': 0, 'pod': None}])
+        with self.assertRaises(ValueError):
+            load_manifest(self.write_manifest([{'source_spreadsheet_id': 's'}]))
+
+    def test_jobs_are_scored_in_worker_processes_and_written_to_their_targets(self):
+        results = run_batch(self.jobs, max_jobs=2, processes=2)
+
+        self.assertEqual([(r['name'], r['ok'], r['rows']) for r in results],
+                         [('cohortA', True, 5), ('cohortB', True, 5)])
+        for cohort, label in (('cohortA', 'Ok'), ('cohortB', 'Not ok')):
+            written = self.fake.values(f'{cohort}-out', 'Sheet1')
+            self.assertEqual(written[0], extract_data.OUTPUT_COLUMNS)
+            self.assertEqual({row[-1] for row in written[1:]}, {label})
+
+    def test_worker_processes_are_not_forked(self):
+        with patch('batch_runner.ProcessPoolExecutor', wraps=ProcessPoolExecutor) as pool:
+            run_batch(self.jobs[:1], processes=1)
+
+        self.assertNotEqual(pool.call_args.kwargs['mp_context'].get_start_method(), 'fork')
+
+    def test_failed_job_is_reported_without_stopping_the_batch(self):
+        jobs = [{**self.jobs[0], 'source_spreadsheet_id': 'missing', 'name': 'broken'}, self.jobs[1]]
+
+        results = run_batch(jobs, processes=0)
+
+        self.assertFalse(results[0]['ok'])
+        self.assertTrue(results[0]['error'])
+        self.assertTrue(results[1]['ok'])
+
+    def test_score_values_adds_pod(self):
+        values = {col: ['4'] for col in extract_data.REQUIRED_COLUMNS}
+
+        for compact in (False, True):
+            header, row = score_values(values, 'POD 9', compact)
+            self.assertEqual(header, extract_data.REQUIRED_COLUMNS + ['Pod', 'Mean Rating', 'Difference', 'Result'])
+            self.assertEqual(row[header.index('Pod')], 'POD 9')
+
+if __name__ == '__main__':
+    unittest.main()
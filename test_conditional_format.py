@@ -0,0 +1,61 @@
+import unittest
+from unittest.mock import Mock
+from conditional_format import plan_rule_requests, read_sheet_rules, result_format_rules
+
+"""Unit tests for the conditional-format rule manager."""
+
+class TestPlanRuleRequests(unittest.TestCase):
+    """Test cases for plan_rule_requests and read_sheet_rules."""
+
+    def setUp(self):
+        self.desired = result_format_rules(0, 11)
+        self.other_rule = {
+            'ranges': [{'startColumnIndex': 0, 'endColumnIndex': 1}],
+            'booleanRule': {'condition': {'type': 'NOT_BLANK'}, 'format': {'textFormat': {'bold': True}}}
+        }
+
+    def test_empty_sheet_gets_both_rules(self):
+        requests = plan_rule_requests([], self.desired, 0)
+
+        self.assertEqual([list(request)[0] for request in requests], ['addConditionalFormatRule'] * 2)
+
+    def test_matching_rules_need_no_requests(self):
+        # The API omits zero-valued fields such as sheetId 0 and rounds colours
+        existing = result_format_rules(0, 11)
+        for rule in existing:
+            del rule['ranges'][0]['sheetId']
+            rule['booleanRule']['format']['backgroundColor']['red'] += 0.00004
+
+        self.assertEqual(plan_rule_requests(existing, self.desired, 0), [])
+
+    def test_stacked_duplicates_are_deleted_from_the_end(self):
+        existing = [self.other_rule] + self.desired * 500
+
+        requests = plan_rule_requests(existing, self.desired, 0)
+
+        self.assertEqual(len(requests), 998)
+        indexes = [request['deleteConditionalFormatRule']['index'] for request in requests]
+        self.assertEqual(indexes, list(range(1000, 2, -1)))
+
+    def test_moved_result_column_is_updated_in_place(self):
+        existing = [self.other_rule] + result_format_rules(0, 25)
+        desired = result_format_rules(0, 30)  # Past column Z
+
+        requests = plan_rule_requests(existing, desired, 0)
+
+        self.assertEqual([request['updateConditionalFormatRule']['index'] for request in requests], [1, 2])
+        self.assertEqual(requests[0]['updateConditionalFormatRule']['rule']['ranges'][0]['startColumnIndex'], 30)
+
+    def test_read_sheet_rules_picks_the_sheet(self):
+        service = Mock()
+        service.spreadsheets.return_value.get.return_value.execute.return_value = {'sheets': [
+            {'properties': {}, 'conditionalFormats': [self.other_rule]},
+            {'properties': {'sheetId': 42}, 'conditionalFormats': self.desired},
+        ]}
+
+        self.assertEqual(read_sheet_rules(service, 'target', 42), self.desired)
+        self.assertEqual(read_sheet_rules(service, 'target', 0), [self.other_rule])
+        self.assertEqual(read_sheet_rules(service, 'target', 7), [])
+
+if __name__ == '__main__':
+    unittest.main()
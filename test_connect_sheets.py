@@ -2,7 +2,7 @@ import unittest
 from unittest.mock import patch, MagicMock
 import logging
 from google.oauth2 import service_account
-from extract_data import connect_to_sheets
+from extract_data import connect_to_sheets, configure_session
 
 """Unit tests for Google Sheets connection functionality."""
 
@@ -15,9 +15,10 @@ class TestConnectToSheets(unittest.TestCase):
         logging.basicConfig(level=logging.INFO)
         self.credentials_path = '/Users/surya.sandeep.boda/Desktop/Marscode Zero to One 2/credentials.json'
         self.scopes = ['https://www.googleapis.com/auth/spreadsheets']
+        configure_session(self.credentials_path)
 
-    @patch('extract_data.service_account.Credentials')
-    @patch('extract_data.build')
+    @patch('sheets_client.service_account.Credentials')
+    @patch('sheets_client.build')
     def test_successful_connection(self, mock_build, mock_credentials):
         # Arrange
         mock_service = MagicMock()
@@ -33,10 +34,23 @@ class TestConnectToSheets(unittest.TestCase):
             self.credentials_path,
             scopes=self.scopes
         )
-        mock_build.assert_called_once_with('sheets', 'v4', credentials=mock_creds)
+        mock_build.assert_called_once_with('sheets', 'v4', credentials=mock_creds,
+                                           static_discovery=True, cache_discovery=False)
         self.assertEqual(result, mock_service)
 
-    @patch('extract_data.service_account.Credentials')
+    @patch('sheets_client.service_account.Credentials')
+    @patch('sheets_client.build')
+    def test_service_is_reused(self, mock_build, mock_credentials):
+        # Act
+        first = connect_to_sheets()
+        second = connect_to_sheets()
+
+        # Assert
+        self.assertIs(first, second)
+        mock_credentials.from_service_account_file.assert_called_once()
+        mock_build.assert_called_once()
+
+    @patch('sheets_client.service_account.Credentials')
     def test_credentials_file_error(self, mock_credentials):
         # Arrange
         mock_credentials.from_service_account_file.side_effect = FileNotFoundError("Credentials file not found")
@@ -48,8 +62,8 @@ class TestConnectToSheets(unittest.TestCase):
         self.assertEqual(str(context.exception), "Credentials file not found")
         mock_credentials.from_service_account_file.assert_called_once()
 
-    @patch('extract_data.service_account.Credentials')
-    @patch('extract_data.build')
+    @patch('sheets_client.service_account.Credentials')
+    @patch('sheets_client.build')
     def test_build_service_error(self, mock_build, mock_credentials):
         # Arrange
         mock_credentials.from_service_account_file.return_value = MagicMock()
@@ -63,7 +77,7 @@ class TestConnectToSheets(unittest.TestCase):
         mock_credentials.from_service_account_file.assert_called_once()
         mock_build.assert_called_once()
 
-    @patch('extract_data.service_account.Credentials')
+    @patch('sheets_client.service_account.Credentials')
     def test_invalid_credentials(self, mock_credentials):
         # Arrange
         mock_credentials.from_service_account_file.side_effect = ValueError("Invalid credentials format")
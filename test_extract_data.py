@@ -1,11 +1,15 @@
 import unittest
-from unittest.mock import Mock, patch
+from unittest.mock import patch
 import pandas as pd
 import numpy as np
-from extract_data import extract_sheet_data
+from extract_data import (extract_sheet_data, clear_header_index_cache, configure_scheduler, compact_ratings,
+                          prepare_sheet_values)
+from sheet_fixtures import mock_source_service
 
 class TestExtractSheetData(unittest.TestCase):
     def setUp(self):
+        clear_header_index_cache()
+        configure_scheduler()
         self.sample_data = [
             ['Email Address', 'Tool being used', 'Feature used', 'Context Awareness', 'Autonomy', 'Experience', 'Output Quality', 'Overall Rating', 'Unique ID'],
             ['test@email.com', 'Tool1', 'Feature1', '4', '3', '5', '4', '4', 'ID1'],
@@ -15,13 +19,7 @@ class TestExtractSheetData(unittest.TestCase):
     @patch('extract_data.connect_to_sheets')
     def test_successful_data_extraction(self, mock_connect):
         # Mock the Google Sheets service and response
-        mock_service = Mock()
-        mock_sheet = Mock()
-        mock_values = Mock()
-        
-        mock_connect.return_value = mock_service
-        mock_service.spreadsheets.return_value = mock_sheet
-        mock_sheet.values.return_value.get.return_value.execute.return_value = {'values': self.sample_data}
+        mock_connect.return_value = mock_source_service(self.sample_data)
         
         # Execute function
         result = extract_sheet_data()
@@ -37,13 +35,7 @@ class TestExtractSheetData(unittest.TestCase):
     @patch('extract_data.connect_to_sheets')
     def test_empty_sheet(self, mock_connect):
         # Mock empty response
-        mock_service = Mock()
-        mock_sheet = Mock()
-        mock_values = Mock()
-        
-        mock_connect.return_value = mock_service
-        mock_service.spreadsheets.return_value = mock_sheet
-        mock_sheet.values.return_value.get.return_value.execute.return_value = {'values': []}
+        mock_connect.return_value = mock_source_service([])
         
         # Execute function
         result = extract_sheet_data()
@@ -59,13 +51,7 @@ class TestExtractSheetData(unittest.TestCase):
             ['test@email.com', 'Tool1', 'Feature1']
         ]
         
-        mock_service = Mock()
-        mock_sheet = Mock()
-        mock_values = Mock()
-        
-        mock_connect.return_value = mock_service
-        mock_service.spreadsheets.return_value = mock_sheet
-        mock_sheet.values.return_value.get.return_value.execute.return_value = {'values': incomplete_data}
+        mock_connect.return_value = mock_source_service(incomplete_data)
         
         # Execute function and expect ValueError
         with self.assertRaises(ValueError):
@@ -80,13 +66,7 @@ class TestExtractSheetData(unittest.TestCase):
             ['test2@email.com', 'Tool2', 'Feature2', '5', '5', '5', '5', '2', 'ID2']  # Mean=5, Diff=3, Result=Not ok
         ]
         
-        mock_service = Mock()
-        mock_sheet = Mock()
-        mock_values = Mock()
-        
-        mock_connect.return_value = mock_service
-        mock_service.spreadsheets.return_value = mock_sheet
-        mock_sheet.values.return_value.get.return_value.execute.return_value = {'values': test_data}
+        mock_connect.return_value = mock_source_service(test_data)
         
         # Execute function
         result = extract_sheet_data()
@@ -98,6 +78,29 @@ class TestExtractSheetData(unittest.TestCase):
         self.assertEqual(result.iloc[0]['Mean Rating'], 5.0)
         self.assertEqual(result.iloc[0]['Difference'], 1.0)
 
+    @patch('extract_data.connect_to_sheets')
+    def test_fetches_only_required_columns(self, mock_connect):
+        # Interleave unused columns so the required ones are spread past column Z
+        header = []
+        for name in self.sample_data[0]:
+            header += [f'Unused {len(header) + i}' for i in range(4)] + [name]
+        wide_data = [header] + [
+            [value for name in row for value in ['x'] * 4 + [name]] for row in self.sample_data[1:]
+        ]
+        mock_service = mock_source_service(wide_data)
+        mock_connect.return_value = mock_service
+
+        result = extract_sheet_data()
+        extract_sheet_data()
+
+        self.assertEqual(list(result['Unique ID']), ['ID1', 'ID2'])
+        self.assertEqual(result.iloc[0]['Autonomy'], 3.0)
+        header_reads = [r for r in mock_service.requested_ranges if r == 'POD 5!1:1']
+        self.assertEqual(len(header_reads), 1)  # Header index is cached
+        ranges = mock_service.requested_ranges[1]
+        self.assertEqual(len(ranges), 9)
+        self.assertEqual(ranges[-1], 'POD 5!AS2:AS1001')
+
     @patch('extract_data.connect_to_sheets')
     def test_api_error_handling(self, mock_connect):
         # Mock API error
@@ -109,5 +112,40 @@ class TestExtractSheetData(unittest.TestCase):
         # Assertions
         self.assertIsNone(result)
 
+class TestCompactSchema(unittest.TestCase):
+    """Test cases for the compact in-memory representation."""
+
+    def setUp(self):
+        clear_header_index_cache()
+        configure_scheduler()
+        header = ['Email Address', 'Tool being used', 'Feature used', 'Context Awareness', 'Autonomy',
+                  'Experience', 'Output Quality', 'Overall Rating', 'Unique ID']
+        self.sample_data = [header] + [
+            [f'user{i}@email.com', f'Tool{i % 2}', f'Feature{i % 3}', '4', '' if i == 2 else '3', '5', 'x',
+             str(i % 5 + 1), f'ID{i}']
+            for i in range(7)
+        ]
+
+    def test_compact_ratings(self):
+        ratings = compact_ratings(['4', '', 'x', '5'])
+
+        self.assertEqual(str(ratings.dtype), 'Int8')
+        self.assertEqual(ratings.isna().tolist(), [False, True, True, False])
+        self.assertEqual(str(compact_ratings(['4', '4.5']).dtype), 'Float64')
+
+    @patch('extract_data.connect_to_sheets')
+    def test_compact_frame_matches_default_output(self, mock_connect):
+        mock_connect.return_value = mock_source_service(self.sample_data)
+
+        # Small windows so categories differ between the concatenated pieces
+        compact = extract_sheet_data(window_rows=3, compact=True)
+        default = extract_sheet_data(window_rows=3)
+
+        self.assertEqual(str(compact['Autonomy'].dtype), 'Int8')
+        self.assertEqual(str(compact['Feature used'].dtype), 'category')
+        self.assertEqual(list(compact['Feature used'].cat.categories), ['Feature0', 'Feature1', 'Feature2'])
+        self.assertEqual(prepare_sheet_values(compact), prepare_sheet_values(default))
+        self.assertLess(compact.memory_usage(deep=True).sum(), default.memory_usage(deep=True).sum())
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
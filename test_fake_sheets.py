@@ -0,0 +1,103 @@
+import unittest
+from unittest.mock import patch
+from googleapiclient.errors import HttpError
+import extract_data
+from extract_data import configure_scheduler, clear_header_index_cache, extract_sheet_data, write_to_target_sheet
+from fake_sheets import FakeSheetsService, parse_a1
+from request_scheduler import RequestScheduler
+from write_engine import SheetWriter
+
+"""Unit tests for the in-process Sheets API stand-in."""
+
+class TestFakeSheetsService(unittest.TestCase):
+    """Test cases for FakeSheetsService."""
+
+    def setUp(self):
+        self.fake = FakeSheetsService()
+        self.fake.add_sheet('source', 'POD 5', [['a', 'b', 'c'], ['1', '', '3'], ['4', '5', '']], row_count=5)
+
+    def test_parse_a1(self):
+        self.assertEqual(parse_a1("'POD 5'!B2:B11"), ('POD 5', 1, 11, 1, 2))
+        self.assertEqual(parse_a1('Sheet1!1:1'), ('Sheet1', 0, 1, 0, None))
+        self.assertEqual(parse_a1('Sheet1'), ('Sheet1', 0, None, 0, None))
+
+    def test_column_reads_trim_trailing_cells(self):
+        result = self.fake.spreadsheets().values().batchGet(
+            spreadsheetId='source', ranges=['POD 5!B2:B4', 'POD 5!C2:C4'], majorDimension='COLUMNS'
+        ).execute()
+
+        self.assertEqual([r['values'] for r in result['valueRanges']], [[['', '5']], [['3']]])
+
+    def test_reads_past_the_grid_are_rejected(self):
+        request = self.fake.spreadsheets().values().get(spreadsheetId='source', range='POD 5!A6:A10')
+
+        with self.assertRaises(HttpError) as context:
+            request.execute()
+        self.assertEqual(context.exception.resp.status, 400)
+        self.assertIn('exceeds grid limits', str(context.exception))
+
+    def test_sheet_writer_round_trip(self):
+        self.fake.add_sheet('target', 'Sheet1', [['stale'] * 4] * 20)
+        values = [['h1', 'h2']] + [[f'r{i}', ''] for i in range(30)]
+
+        SheetWriter(self.fake, 'target', max_request_bytes=200).replace(values)
+        SheetWriter(self.fake, 'target').apply_diff(values, values[:10] + [['new', 'x']])
+
+        self.assertEqual(self.fake.values('target', 'Sheet1'),
+                         [['h1', 'h2']] + [[f'r{i}'] for i in range(9)] + [['new', 'x']])
+        grid = self.fake.sheet('target', 'Sheet1').properties()['gridProperties']
+        self.assertEqual(grid, {'rowCount': 31, 'columnCount': 2})
+
+    def test_injected_quota_errors_are_retried_by_the_scheduler(self):
+        fake = FakeSheetsService(fail_every=2)
+        fake.add_sheet('source', 'Sheet1', [['a']])
+        scheduler = RequestScheduler(requests_per_minute=10 ** 6, sleep=lambda seconds: None)
+
+        for i in range(3):
+            # Distinct ranges so GET coalescing does not hide the calls
+            scheduler.execute(fake.spreadsheets().values().get(spreadsheetId='source', range=f'Sheet1!A1:A{i + 1}'))
+
+        self.assertEqual(fake.stats['errors.429'], 2)
+        self.assertEqual(scheduler.retries, 2)
+
+    def test_oversized_payload_is_rejected(self):
+        fake = FakeSheetsService(max_payload_bytes=1000)
+        fake.add_sheet('target', 'Sheet1')
+        writer = SheetWriter(fake, 'target')
+
+        with self.assertRaises(HttpError):
+            writer.replace([['x' * 2000]])
+        SheetWriter(fake, 'target', max_request_bytes=600).replace([['x' * 100]] * 20)
+        self.assertEqual(fake.stats['errors.400'], 1)
+
+class TestPipelineAgainstFake(unittest.TestCase):
+    """End-to-end extract and write through the fake backend."""
+
+    def setUp(self):
+        configure_scheduler()
+        clear_header_index_cache()
+        self.fake = FakeSheetsService()
+        header = ['Timestamp'] + extract_data.REQUIRED_COLUMNS
+        rows = [['t', f'u{i}@x.com', 'Tool', 'Chat', '4', '4', '4', '4', str(1 + i % 5), f'ID{i}'] for i in range(25)]
+        self.fake.add_sheet(extract_data.SOURCE_SPREADSHEET_ID, extract_data.SOURCE_TAB, [header] + rows)
+        self.fake.add_sheet(extract_data.TARGET_SPREADSHEET_ID, extract_data.TARGET_SHEET)
+        patcher = patch('extract_data.connect_to_sheets', return_value=self.fake)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_extract_and_write(self):
+        data = extract_sheet_data(window_rows=10)
+
+        self.assertEqual(len(data), 25)
+        self.assertTrue(write_to_target_sheet(self.fake, data))
+        self.assertTrue(write_to_target_sheet(self.fake, data))  # Reruns must not stack rules
+
+        written = self.fake.values(extract_data.TARGET_SPREADSHEET_ID, extract_data.TARGET_SHEET)
+        self.assertEqual(written[0], extract_data.OUTPUT_COLUMNS)
+        self.assertEqual(len(written), 26)
+        self.assertEqual(written[1][-1], 'Not ok')  # Overall 1 against a mean of 4
+        sheet = self.fake.sheet(extract_data.TARGET_SPREADSHEET_ID, extract_data.TARGET_SHEET)
+        self.assertEqual(len(sheet.conditional_formats), 2)
+
+if __name__ == '__main__':
+    unittest.main()
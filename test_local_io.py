@@ -0,0 +1,108 @@
+import csv
+import importlib.util
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+import extract_data
+from extract_data import (iter_replay_chunks, write_to_sinks, prepare_sheet_values, configure_scheduler,
+                          clear_header_index_cache)
+from fake_sheets import FakeSheetsService
+from local_io import CsvSink, ParquetSink, SqliteSink, iter_dump_windows, open_sink
+
+HAVE_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+"""Unit tests for local replay sources and bulk sinks."""
+
+HEADER = ['Timestamp'] + extract_data.REQUIRED_COLUMNS
+
+class TestLocalIO(unittest.TestCase):
+    """Test cases for iter_dump_windows, the sinks and write_to_sinks."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.rows = [['t', f'u{i}@x.com', 'Tool', 'Chat', '4', '4', '' if i == 3 else '4', '4', str(1 + i % 5),
+                      f'ID{i}'] for i in range(7)]
+        configure_scheduler()
+        clear_header_index_cache()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp_dir.name, name)
+
+    def dump_csv(self, rows):
+        path = self.path('dump.csv')
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerows(rows)
+        return path
+
+    def test_csv_and_json_dumps_replay_in_windows(self):
+        csv_path = self.dump_csv([HEADER] + self.rows)
+        json_path = self.path('dump.json')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({'range': 'POD 5!A1:J8', 'values': [HEADER] + self.rows}, f)
+
+        for path in (csv_path, json_path):
+            windows = list(iter_dump_windows(path, extract_data.REQUIRED_COLUMNS, 3))
+            self.assertEqual([len(window['Unique ID']) for window in windows], [3, 3, 1])
+            self.assertEqual(windows[1]['Experience'], ['', '4', '4'])
+
+    def test_missing_columns_and_unknown_formats_are_rejected(self):
+        path = self.dump_csv([HEADER[:-1]] + [row[:-1] for row in self.rows])
+
+        with self.assertRaises(ValueError):
+            list(iter_dump_windows(path, extract_data.REQUIRED_COLUMNS, 3))
+        with self.assertRaises(ValueError):
+            open_sink(self.path('out.xlsx'))
+
+    def test_replay_to_csv_and_sqlite_sinks(self):
+        replay = self.dump_csv([HEADER] + self.rows)
+        expected = extract_data.score_ratings(extract_data.build_frame(
+            {col: [row[HEADER.index(col)] for row in self.rows] for col in extract_data.REQUIRED_COLUMNS}))
+
+        sinks = [CsvSink(self.path('out.csv')), SqliteSink(self.path('out.db'), batch_rows=2)]
+        self.assertEqual(write_to_sinks(iter_replay_chunks(replay, window_rows=3), sinks), 7)
+
+        with open(self.path('out.csv'), newline='', encoding='utf-8') as f:
+            written = list(csv.reader(f))
+        self.assertEqual(written[0], extract_data.OUTPUT_COLUMNS)
+        self.assertEqual([row[-1] for row in written[1:]], list(expected['Result']))
+        with sqlite3.connect(self.path('out.db')) as connection:
+            records = connection.execute(
+                'SELECT "Unique ID", "Experience", "Mean Rating" FROM scored_responses').fetchall()
+        self.assertEqual(len(records), 7)
+        self.assertEqual(records[3], ('ID3', None, 4.0))
+
+    def test_sinks_run_alongside_the_sheet_writer(self):
+        replay = self.dump_csv([HEADER] + self.rows)
+        fake = FakeSheetsService()
+        fake.add_sheet(extract_data.TARGET_SPREADSHEET_ID, extract_data.TARGET_SHEET)
+        sink = CsvSink(self.path('out.csv'))
+
+        with patch('extract_data.connect_to_sheets', return_value=fake):
+            self.assertEqual(write_to_sinks(iter_replay_chunks(replay, window_rows=3), [sink], fake), 7)
+
+        target = fake.values(extract_data.TARGET_SPREADSHEET_ID, extract_data.TARGET_SHEET)
+        self.assertEqual(len(target), 8)
+        self.assertEqual(sink.rows, 7)
+        self.assertEqual(target[1:], prepare_sheet_values(
+            extract_data.score_ratings(extract_data.build_frame(next(iter_dump_windows(
+                replay, extract_data.REQUIRED_COLUMNS, 10))))
+        )[1:])
+
+    @unittest.skipUnless(HAVE_PYARROW, "pyarrow is not installed")
+    def test_parquet_round_trip(self):
+        replay = self.dump_csv([HEADER] + self.rows)
+        write_to_sinks(iter_replay_chunks(replay, window_rows=3, compact=True), [ParquetSink(self.path('out.parquet'))])
+
+        import pandas as pd
+        written = pd.read_parquet(self.path('out.parquet'))
+        self.assertEqual(list(written.columns), extract_data.OUTPUT_COLUMNS)
+        self.assertEqual(len(written), 7)
+
+if __name__ == '__main__':
+    unittest.main()
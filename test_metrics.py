@@ -0,0 +1,125 @@
+import json
+import logging
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+import extract_data
+from extract_data import (configure_metrics, configure_scheduler, clear_header_index_cache, extract_sheet_data,
+                          get_metrics, write_to_target_sheet)
+from fake_sheets import FakeSheetsService
+from metrics import Lazy, Metrics
+
+"""Unit tests for pipeline instrumentation."""
+
+class TestMetrics(unittest.TestCase):
+    """Test cases for Metrics and Lazy."""
+
+    def setUp(self):
+        self.now = [0.0]
+        self.metrics = Metrics(clock=lambda: self.now[0])
+
+    def test_stages_accumulate_time_and_calls(self):
+        for seconds in (1.5, 0.5):
+            with self.metrics.stage('fetch'):
+                self.now[0] += seconds
+        self.metrics.count('rows_fetched', 10)
+        self.metrics.count('rows_fetched', 5)
+
+        self.assertEqual(self.metrics.as_dict(), {'stages': {'fetch': {'seconds': 2.0, 'calls': 2}},
+                                                  'counters': {'rows_fetched': 15}})
+
+    def test_stats_are_exported_only_on_request(self):
+        self.metrics.tally('result_counts', {'Ok': 3})
+        self.metrics.summarize('difference', [float('nan')])
+
+        self.assertNotIn('stats', self.metrics.as_dict())
+        self.assertEqual(self.metrics.as_dict(include_stats=True)['stats'], {'result_counts': {'Ok': 3.0}})
+
+    def test_folded_stats_describe_every_chunk_of_the_pass(self):
+        for chunk in ([1.0, 2.0], [3.0, float('nan'), 6.0]):
+            self.metrics.summarize('mean_rating', chunk)
+            self.metrics.tally('result_counts', {'Ok': len(chunk) - 1, 'Not ok': 1})
+
+        stats = self.metrics.compute_stats()
+
+        self.assertEqual(stats['result_counts'], {'Ok': 3.0, 'Not ok': 2.0})
+        summary = stats['mean_rating']
+        self.assertEqual((summary['count'], summary['mean'], summary['min'], summary['max']), (4, 3.0, 1.0, 6.0))
+        self.assertAlmostEqual(summary['std'], 2.160246899)
+
+    def test_end_pass_keeps_stats_until_the_next_fold(self):
+        self.metrics.tally('result_counts', {'Ok': 5})
+        self.metrics.end_pass()
+        self.assertEqual(self.metrics.compute_stats(), {'result_counts': {'Ok': 5.0}})
+
+        self.metrics.tally('result_counts', {'Ok': 1})
+        self.assertEqual(self.metrics.compute_stats(), {'result_counts': {'Ok': 1.0}})
+
+    def test_prometheus_export(self):
+        with self.metrics.stage('write'):
+            self.now[0] += 0.25
+        self.metrics.count('api_requests', 3)
+        self.metrics.tally('result_counts', {'Ok': 2})
+
+        text = self.metrics.to_prometheus(include_stats=True)
+
+        self.assertIn('sheet_pipeline_stage_seconds{stage="write"} 0.25\n', text)
+        self.assertIn('sheet_pipeline_api_requests 3\n', text)
+        self.assertIn('sheet_pipeline_stat{name="result_counts",field="Ok"} 2.0\n', text)
+
+    def test_lazy_is_not_computed_for_disabled_levels(self):
+        compute = Mock(return_value='stats')
+        logger = logging.getLogger('test_metrics.lazy')
+        logger.setLevel(logging.INFO)
+
+        logger.debug("%s", Lazy(compute))
+
+        compute.assert_not_called()
+        self.assertEqual(str(Lazy(compute)), 'stats')
+
+class TestPipelineMetrics(unittest.TestCase):
+    """Stage and counter coverage of an extract and write against the fake backend."""
+
+    def setUp(self):
+        configure_scheduler()
+        clear_header_index_cache()
+        configure_metrics(collect_stats=True)
+        self.addCleanup(configure_metrics)
+        self.fake = FakeSheetsService()
+        header = extract_data.REQUIRED_COLUMNS
+        rows = [[f'u{i}@x.com', 'Tool', 'Chat', '4', '4', '4', '4', str(1 + i % 5), f'ID{i}'] for i in range(25)]
+        self.fake.add_sheet(extract_data.SOURCE_SPREADSHEET_ID, extract_data.SOURCE_TAB, [header] + rows)
+        self.fake.add_sheet(extract_data.TARGET_SPREADSHEET_ID, extract_data.TARGET_SHEET)
+        patcher = patch('extract_data.connect_to_sheets', return_value=self.fake)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_records_every_stage_and_exports_json(self):
+        self.assertTrue(write_to_target_sheet(self.fake, extract_sheet_data(window_rows=10)))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'metrics.json')
+            get_metrics().export(path, include_stats=True)
+            with open(path, encoding='utf-8') as f:
+                exported = json.load(f)
+
+        self.assertEqual(set(exported['stages']), {'fetch', 'parse', 'score', 'serialize', 'format', 'write'})
+        counters = exported['counters']
+        self.assertEqual(counters['api_requests'], self.fake.stats['calls'])
+        self.assertEqual(counters['rows_fetched'], 25)
+        self.assertEqual(counters['rows_written'], 25)
+        self.assertEqual(counters['cells_serialized'], 25 * len(extract_data.OUTPUT_COLUMNS))
+        self.assertEqual(exported['stats']['result_counts'], {'Ok': 15.0, 'Not ok': 10.0})
+        self.assertEqual(exported['stats']['mean_rating']['count'], 25)
+
+    def test_scoring_folds_no_stats_unless_collecting(self):
+        configure_metrics()
+
+        self.assertIsNotNone(extract_sheet_data(window_rows=10))
+
+        self.assertEqual(get_metrics().compute_stats(), {})
+        self.assertEqual(get_metrics().counters['rows_scored'], 25)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import threading
+import unittest
+from unittest.mock import patch
+from extract_data import extract_multi_source, parse_source, clear_header_index_cache, configure_scheduler
+from sheet_fixtures import mock_multi_source_service
+
+"""Unit tests for concurrent multi-source extraction."""
+
+HEADER = ['Email Address', 'Tool being used', 'Feature used', 'Context Awareness', 'Autonomy',
+          'Experience', 'Output Quality', 'Overall Rating', 'Unique ID']
+
+class TestExtractMultiSource(unittest.TestCase):
+    """Test cases for extract_multi_source and parse_source."""
+
+    def setUp(self):
+        clear_header_index_cache()
+        configure_scheduler()
+        self.sources = {
+            ('sheetA', 'POD 5'): [HEADER, ['a@email.com', 'Tool1', 'Feature1', '5', '5', '5', '5', '5', 'A1']],
+            ('sheetA', 'POD 6'): [HEADER, ['b@email.com', 'Tool2', 'Feature2', '5', '5', '5', '5', '1', 'B1'],
+                                  ['c@email.com', 'Tool2', 'Feature2', '4', '4', '4', '4', '4', 'B2']],
+            ('sheetB', 'Responses'): [HEADER, ['d@email.com', 'Tool3', 'Feature3', '3', '3', '3', '3', '3', 'C1']],
+        }
+
+    @patch('extract_data.connect_to_sheets')
+    def test_rows_are_tagged_with_pod_and_scored(self, mock_connect):
+        mock_connect.side_effect = lambda: mock_multi_source_service(self.sources)
+
+        result = extract_multi_source([('sheetA', 'POD 5'), ('sheetA', 'POD 6'), ('sheetB', 'Responses', 'Cohort B')])
+
+        self.assertEqual(list(result['Pod']), ['POD 5', 'POD 6', 'POD 6', 'Cohort B'])
+        self.assertEqual(list(result['Unique ID']), ['A1', 'B1', 'B2', 'C1'])
+        self.assertEqual(list(result['Result']), ['Ok', 'Not ok', 'Ok', 'Ok'])
+
+    @patch('extract_data.connect_to_sheets')
+    def test_compact_mode_keeps_pod_categorical(self, mock_connect):
+        mock_connect.side_effect = lambda: mock_multi_source_service(self.sources)
+
+        result = extract_multi_source([('sheetA', 'POD 5'), ('sheetA', 'POD 6'), ('sheetB', 'Responses', 'Cohort B')],
+                                      compact=True)
+
+        self.assertEqual(str(result['Pod'].dtype), 'category')
+        self.assertEqual(list(result['Pod']), ['POD 5', 'POD 6', 'POD 6', 'Cohort B'])
+        self.assertEqual(list(result['Tool being used'].cat.categories), ['Tool1', 'Tool2', 'Tool3'])
+        self.assertEqual(list(result['Result']), ['Ok', 'Not ok', 'Ok', 'Ok'])
+
+    @patch('extract_data.connect_to_sheets')
+    def test_sources_are_fetched_concurrently(self, mock_connect):
+        # Every header read waits for all three sources; sequential fetching would break the barrier
+        barrier = threading.Barrier(3, timeout=5)
+        services = []
+
+        def connect():
+            service = mock_multi_source_service(self.sources)
+            get = service.spreadsheets.return_value.values.return_value.get
+            fetch = get.side_effect
+
+            def waiting_get(spreadsheetId, range):
+                barrier.wait()
+                return fetch(spreadsheetId, range)
+
+            get.side_effect = waiting_get
+            services.append(service)
+            return service
+
+        mock_connect.side_effect = connect
+
+        result = extract_multi_source(list(self.sources), max_workers=3)
+
+        self.assertEqual(len(result), 4)
+        self.assertEqual(len(services), 3)  # One service per worker thread
+
+    @patch('extract_data.connect_to_sheets')
+    def test_failed_source_fails_the_run(self, mock_connect):
+        mock_connect.side_effect = lambda: mock_multi_source_service(self.sources)
+
+        self.assertIsNone(extract_multi_source([('sheetA', 'POD 5'), ('sheetC', 'Missing')]))
+
+    def test_parse_source(self):
+        self.assertEqual(parse_source('sheetA:POD 5'), ('sheetA', 'POD 5', 'POD 5'))
+        self.assertEqual(parse_source('sheetB:Responses:Cohort B'), ('sheetB', 'Responses', 'Cohort B'))
+        with self.assertRaises(ValueError):
+            parse_source('sheetA')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import csv
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import extract_data
+from extract_data import (configure_quality_gate, configure_scheduler, clear_header_index_cache, extract_sheet_data,
+                          extract_multi_source, get_quality_gate, write_quarantine)
+from fake_sheets import FakeSheetsService
+from quality_gate import QualityGate
+
+"""Unit tests for the data-quality gate and quarantine output."""
+
+def window(rows):
+    return {col: [row[i] for row in rows] for i, col in enumerate(extract_data.REQUIRED_COLUMNS)}
+
+class TestQualityGate(unittest.TestCase):
+    """Test cases for QualityGate.check."""
+
+    def setUp(self):
+        self.gate = QualityGate(extract_data.REQUIRED_COLUMNS, extract_data.RATING_COLUMNS)
+        self.rows = [
+            ['a@x.com', 'Tool', 'Chat', '4', '4', '', '4', '4', 'ID1'],
+            ['b@x.com', 'Tool', 'Chat', '4', '4.5', '4', '4', '4', 'ID2'],
+        ]
+
+    def test_clean_window_is_returned_unchanged(self):
+        values = window(self.rows)
+
+        self.assertIs(self.gate.check(values, set()), values)
+        self.assertEqual(self.gate.take(), [self.gate.header()])
+
+    def test_bad_rows_are_dropped_with_reason_codes(self):
+        bad = [
+            ['c@x.com', 'Tool', 'Chat', 'four', '4', '4', '4', '4', 'ID3'],
+            ['d@x.com', 'Tool', 'Chat', '4', '9', '4', '4', '0', ''],
+            ['e@x.com', 'Tool', 'Chat', '4', '4', '4', '4', '4', 'ID1'],
+        ]
+
+        clean = self.gate.check(window(self.rows + bad), set(), 'POD 5', first_row=10)
+
+        self.assertEqual(clean['Unique ID'], ['ID1', 'ID2'])
+        quarantined = self.gate.take()
+        self.assertEqual([row[:3] for row in quarantined[1:]], [
+            ['POD 5', '12', 'non_numeric_rating'],
+            ['POD 5', '13', 'missing_unique_id;rating_out_of_range'],
+            ['POD 5', '14', 'duplicate_unique_id'],
+        ])
+        self.assertEqual(quarantined[1][3:], bad[0])
+
+    def test_duplicates_are_found_across_windows_of_a_pass(self):
+        seen = set()
+        self.gate.check(window(self.rows), seen)
+
+        clean = self.gate.check(window([self.rows[1][:8] + ['ID3'], self.rows[0]]), seen, first_row=4)
+
+        self.assertEqual(clean['Unique ID'], ['ID3'])
+        self.assertEqual(self.gate.take()[1][1:3], ['5', 'duplicate_unique_id'])
+
+class TestQuarantineOutput(unittest.TestCase):
+    """Test cases for validation in the extraction pipeline and write_quarantine."""
+
+    def setUp(self):
+        configure_scheduler()
+        clear_header_index_cache()
+        self.addCleanup(configure_quality_gate, enabled=False)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.fake = FakeSheetsService()
+        rows = [['t', f'u{i}@x.com', 'Tool', 'Chat', '4', '4', '4', '4', '4', f'ID{i}'] for i in range(5)]
+        rows[1][5] = '6'
+        rows[3][-1] = 'ID0'
+        self.fake.add_sheet(extract_data.SOURCE_SPREADSHEET_ID, extract_data.SOURCE_TAB,
+                            [['Timestamp'] + extract_data.REQUIRED_COLUMNS] + rows)
+        self.fake.add_sheet(extract_data.TARGET_SPREADSHEET_ID, extract_data.TARGET_SHEET)
+        patcher = patch('extract_data.connect_to_sheets', return_value=self.fake)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_validation_is_off_by_default(self):
+        self.assertIsNone(get_quality_gate())
+        self.assertEqual(len(extract_sheet_data(window_rows=2)), 5)
+
+    def test_bad_rows_go_to_the_quarantine_file_and_tab(self):
+        configure_quality_gate()
+        data = extract_sheet_data(window_rows=2)
+        path = os.path.join(self.tmp_dir.name, 'quarantine.csv')
+
+        self.assertEqual(list(data['Unique ID']), ['ID0', 'ID2', 'ID4'])
+        self.assertTrue(write_quarantine(get_quality_gate().take(), path, self.fake))
+
+        with open(path, newline='', encoding='utf-8') as f:
+            written = list(csv.reader(f))
+        tab = self.fake.values(extract_data.TARGET_SPREADSHEET_ID, extract_data.QUARANTINE_SHEET)
+        self.assertEqual(written, tab)
+        self.assertEqual([row[1:3] for row in tab[1:]], [['3', 'rating_out_of_range'], ['5', 'duplicate_unique_id']])
+    def test_ids_repeated_across_sources_are_quarantined(self):
+        configure_quality_gate()
+        rows = [['t', 'z@x.com', 'Tool', 'Chat', '4', '4', '4', '4', '4', 'ID4'],
+                ['t', 'y@x.com', 'Tool', 'Chat', '4', '4', '4', '4', '4', 'ID9']]
+        self.fake.add_sheet(extract_data.SOURCE_SPREADSHEET_ID, 'POD 6',
+                            [['Timestamp'] + extract_data.REQUIRED_COLUMNS] + rows)
+
+        data = extract_multi_source([(extract_data.SOURCE_SPREADSHEET_ID, extract_data.SOURCE_TAB),
+                                     (extract_data.SOURCE_SPREADSHEET_ID, 'POD 6')], window_rows=2)
+
+        self.assertEqual(sorted(data['Unique ID']), ['ID0', 'ID2', 'ID4', 'ID9'])
+        reasons = [row[2] for row in get_quality_gate().take()[1:]]
+        self.assertEqual(reasons.count('duplicate_unique_id'), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import threading
+import unittest
+from unittest.mock import Mock
+import httplib2
+from googleapiclient.errors import HttpError
+from request_scheduler import RequestScheduler, TokenBucket
+
+"""Unit tests for the quota-aware request scheduler."""
+
+def http_error(status, headers=None):
+    return HttpError(httplib2.Response(dict(headers or {}, status=status)), b'{}')
+
+class FakeClock:
+    """Clock whose sleep advances time instead of blocking."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+class TestTokenBucket(unittest.TestCase):
+    """Test cases for TokenBucket."""
+
+    def test_bursts_up_to_capacity_then_spaces_requests(self):
+        clock = FakeClock()
+        bucket = TokenBucket(60, clock=clock, sleep=clock.sleep)
+
+        for _ in range(62):
+            bucket.acquire()
+
+        self.assertAlmostEqual(clock.now, 2.0)
+        self.assertEqual(len(clock.sleeps), 2)
+
+class TestRequestScheduler(unittest.TestCase):
+    """Test cases for RequestScheduler."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.scheduler = RequestScheduler(600, max_retries=3, clock=self.clock, sleep=self.clock.sleep)
+
+    def test_retries_rate_limit_errors(self):
+        request = Mock()
+        request.execute.side_effect = [http_error(429), http_error(503), {'ok': True}]
+
+        self.assertEqual(self.scheduler.execute(request), {'ok': True})
+        self.assertEqual(request.execute.call_count, 3)
+        self.assertEqual(self.scheduler.retries, 2)
+        self.assertTrue(all(0 <= delay <= 2 for delay in self.clock.sleeps))
+
+    def test_honours_retry_after(self):
+        request = Mock()
+        request.execute.side_effect = [http_error(429, {'retry-after': '7'}), {}]
+
+        self.scheduler.execute(request)
+        self.assertEqual(self.clock.sleeps, [7.0])
+
+    def test_gives_up_after_max_retries(self):
+        request = Mock()
+        request.execute.side_effect = http_error(500)
+
+        with self.assertRaises(HttpError):
+            self.scheduler.execute(request)
+        self.assertEqual(request.execute.call_count, 4)
+
+    def test_client_errors_are_not_retried(self):
+        request = Mock()
+        request.execute.side_effect = http_error(400)
+
+        with self.assertRaises(HttpError):
+            self.scheduler.execute(request)
+        request.execute.assert_called_once()
+
+    def test_other_exceptions_propagate(self):
+        request = Mock()
+        request.execute.side_effect = ValueError("bad request body")
+
+        with self.assertRaises(ValueError):
+            self.scheduler.execute(request)
+        request.execute.assert_called_once()
+
+    def test_identical_gets_in_flight_are_coalesced(self):
+        scheduler = RequestScheduler(600)
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_execute():
+            started.set()
+            release.wait(5)
+            return {'values': [['header']]}
+
+        first = Mock(method='GET', uri='https://sheets.googleapis.com/v4/spreadsheets/x/values/A1')
+        first.execute.side_effect = slow_execute
+        second = Mock(method='GET', uri=first.uri)
+        results = []
+
+        thread = threading.Thread(target=lambda: results.append(scheduler.execute(first)))
+        thread.start()
+        started.wait(5)
+        waiter = threading.Thread(target=lambda: results.append(scheduler.execute(second)))
+        waiter.start()
+        # Give the second caller time to join the in-flight request before it completes
+        waiter.join(0.2)
+        release.set()
+        thread.join(5)
+        waiter.join(5)
+
+        self.assertEqual(results, [{'values': [['header']]}] * 2)
+        second.execute.assert_not_called()
+        self.assertEqual(scheduler.calls, 1)
+
+if __name__ == '__main__':
+    unittest.main()
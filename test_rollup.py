@@ -0,0 +1,149 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import extract_data
+from extract_data import sync_incremental, build_frame, score_ratings, clear_header_index_cache, configure_scheduler
+from fake_sheets import FakeSheetsService
+from rollup import Rollup, SUMMARY_HEADER
+from rollup_tab import RollupTab, write_rollup_tab, ROLLUP_SHEET, ROLLUP_SHEET_ID
+
+"""Unit tests for the per Pod/Tool/Feature rollup."""
+
+def scored(rows, pod=None):
+    frame = build_frame({col: [row[i] for row in rows] for i, col in enumerate(extract_data.REQUIRED_COLUMNS)})
+    if pod is not None:
+        frame['Pod'] = pod
+    return score_ratings(frame)
+
+def summary(rollup):
+    """Return the summary rows keyed on (dimension, group)."""
+    rows = rollup.summary_rows()
+    return {(row[0], row[1]): dict(zip(rows[0], row)) for row in rows[1:]}
+
+class TestRollup(unittest.TestCase):
+    """Test cases for Rollup."""
+
+    def setUp(self):
+        self.rows = [
+            ['a@x.com', 'Tool1', 'Chat', '4', '4', '4', '4', '4', 'ID1'],
+            ['b@x.com', 'Tool1', 'Edit', '2', '2', '', '2', '5', 'ID2'],
+            ['c@x.com', 'Tool2', 'Chat', '5', '5', '5', '5', '1', 'ID3'],
+        ]
+
+    def test_add_groups_per_dimension(self):
+        rollup = Rollup()
+        rollup.add(scored(self.rows, 'POD 5'))
+
+        groups = summary(rollup)
+        self.assertEqual(list(groups), [('Pod', 'POD 5'), ('Tool being used', 'Tool1'), ('Tool being used', 'Tool2'),
+                                        ('Feature used', 'Chat'), ('Feature used', 'Edit')])
+        tool1 = groups[('Tool being used', 'Tool1')]
+        self.assertEqual((tool1['Responses'], tool1['Ok'], tool1['Not ok']), ('2', '1', '1'))
+        self.assertEqual(tool1['Mean Experience'], '4.0')  # The blank rating is left out of the mean
+        self.assertEqual(tool1['Difference ≤ -2'], '1')
+        self.assertEqual(tool1['Difference -1 to 0'], '1')
+
+    def test_chunks_add_up_to_the_whole(self):
+        whole, chunked = Rollup(), Rollup()
+        whole.add(scored(self.rows))
+        list(chunked.track([scored(self.rows[:1]), scored(self.rows[1:])]))
+
+        self.assertEqual(chunked.summary_rows(), whole.summary_rows())
+        self.assertEqual(chunked.total_responses(), 3)
+
+    def test_save_and_load_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'rollup.json')
+            rollup = Rollup()
+            rollup.add(scored(self.rows))
+            rollup.save(path)
+
+            self.assertEqual(Rollup.load(path).summary_rows(), rollup.summary_rows())
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('{"version": 0}')
+            self.assertEqual(Rollup.load(path).totals, {})
+
+class TestRollupTab(unittest.TestCase):
+    """Test cases for write_rollup_tab and RollupTab in incremental syncs."""
+
+    def setUp(self):
+        configure_scheduler()
+        clear_header_index_cache()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.fake = FakeSheetsService()
+        self.fake.add_sheet(extract_data.TARGET_SPREADSHEET_ID, extract_data.TARGET_SHEET)
+        self.rows = [
+            ['a@x.com', 'Tool1', 'Chat', '4', '4', '4', '4', '4', 'ID1'],
+            ['b@x.com', 'Tool2', 'Chat', '5', '5', '5', '5', '1', 'ID2'],
+        ]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def serve(self, rows):
+        self.fake.add_sheet(extract_data.SOURCE_SPREADSHEET_ID, extract_data.SOURCE_TAB,
+                            [['Timestamp'] + extract_data.REQUIRED_COLUMNS] + [['t'] + row for row in rows])
+
+    def tab(self):
+        return self.fake.values(extract_data.TARGET_SPREADSHEET_ID, ROLLUP_SHEET)
+
+    def test_tab_is_added_once_and_rewritten_in_place(self):
+        rollup = Rollup()
+        rollup.add(scored(self.rows))
+
+        self.assertTrue(write_rollup_tab(self.fake, rollup))
+        self.assertTrue(write_rollup_tab(self.fake, rollup))
+
+        self.assertEqual(self.tab(), rollup.summary_rows())
+        self.assertEqual(self.tab()[0], SUMMARY_HEADER)
+        self.assertEqual(len(self.fake.spreadsheets_by_id[extract_data.TARGET_SPREADSHEET_ID]), 2)
+
+    def test_tab_is_found_by_title_whatever_its_sheet_id(self):
+        self.fake.add_sheet(extract_data.TARGET_SPREADSHEET_ID, 'Notes', [['keep']],
+                            sheet_id=ROLLUP_SHEET_ID)
+        self.fake.add_sheet(extract_data.TARGET_SPREADSHEET_ID, ROLLUP_SHEET, sheet_id=7)
+        rollup = Rollup()
+        rollup.add(scored(self.rows))
+
+        self.assertTrue(write_rollup_tab(self.fake, rollup))
+
+        self.assertEqual(self.fake.values(extract_data.TARGET_SPREADSHEET_ID, 'Notes'), [['keep']])
+        self.assertEqual(self.fake.sheet(extract_data.TARGET_SPREADSHEET_ID, ROLLUP_SHEET).sheet_id, 7)
+        self.assertEqual(self.tab(), rollup.summary_rows())
+
+    def test_incremental_sync_keeps_the_tab_in_step_with_the_source(self):
+        state_path = os.path.join(self.tmp_dir.name, 'sync_state.json')
+        rollup_path = os.path.join(self.tmp_dir.name, 'rollup.json')
+
+        for rows in (self.rows,
+                     self.rows + [['c@x.com', 'Tool1', 'Edit', '1', '1', '1', '1', '1', 'ID3']],  # New row
+                     [self.rows[0][:7] + ['1', 'ID1']] + self.rows[1:]):  # Changed and removed rows
+            self.serve(rows)
+            self.assertTrue(sync_incremental(self.fake, state_path, RollupTab(rollup_path)))
+
+            expected = Rollup()
+            expected.add(scored(rows))
+            self.assertEqual(self.tab(), expected.summary_rows())
+            self.assertEqual(Rollup.load(rollup_path).summary_rows(), expected.summary_rows())
+
+    def test_failed_summary_write_keeps_the_sync_state_and_rebuilds_later(self):
+        state_path = os.path.join(self.tmp_dir.name, 'sync_state.json')
+        rollup_path = os.path.join(self.tmp_dir.name, 'rollup.json')
+        self.serve(self.rows)
+        sync_incremental(self.fake, state_path, RollupTab(rollup_path))
+        rows = self.rows + [['c@x.com', 'Tool1', 'Edit', '1', '1', '1', '1', '1', 'ID3']]
+        self.serve(rows)
+
+        with patch('rollup_tab.write_rollup_tab', return_value=False):
+            self.assertFalse(sync_incremental(self.fake, state_path, RollupTab(rollup_path)))
+        self.assertTrue(sync_incremental(self.fake, state_path, RollupTab(rollup_path)))
+
+        target = self.fake.values(extract_data.TARGET_SPREADSHEET_ID, extract_data.TARGET_SHEET)
+        self.assertEqual([row[8] for row in target[1:]], ['ID1', 'ID2', 'ID3'])
+        expected = Rollup()
+        expected.add(scored(rows))
+        self.assertEqual(self.tab(), expected.summary_rows())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from unittest.mock import patch
+import extract_data
+from extract_data import build_frame, score_ratings, configure_scheduler
+from fake_sheets import FakeSheetsService
+from sharding import write_sharded, SHARD_INDEX_COLUMNS
+
+"""Unit tests for sharded output across target tabs."""
+
+TARGET = extract_data.TARGET_SPREADSHEET_ID
+
+def scored(count, pods=None):
+    rows = [[f'u{i}@x.com', 'Tool', 'Chat', '4', '4', '4', '4', '4' if i % 2 else '1', f'ID{i}'] for i in range(count)]
+    frame = build_frame({col: [row[i] for row in rows] for i, col in enumerate(extract_data.REQUIRED_COLUMNS)})
+    if pods is not None:
+        frame['Pod'] = pods
+    return score_ratings(frame)
+
+class TestWriteSharded(unittest.TestCase):
+    """Test cases for write_sharded."""
+
+    def setUp(self):
+        configure_scheduler()
+        self.fake = FakeSheetsService()
+        self.fake.add_sheet(TARGET, extract_data.TARGET_SHEET)
+        patcher = patch('extract_data.connect_to_sheets', return_value=self.fake)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def titles(self):
+        return sorted(self.fake.spreadsheets_by_id[TARGET])
+
+    def test_rows_are_split_by_count_and_listed_in_the_index(self):
+        data = scored(5)
+
+        self.assertTrue(write_sharded(self.fake, data, shard_rows=2))
+
+        self.assertEqual(self.titles(), ['Results 1', 'Results 2', 'Results 3', 'Shard Index', 'Sheet1'])
+        shards = [self.fake.values(TARGET, f'Results {n}') for n in (1, 2, 3)]
+        self.assertEqual([len(shard) for shard in shards], [3, 3, 2])
+        self.assertEqual([row[8] for shard in shards for row in shard[1:]], [f'ID{i}' for i in range(5)])
+        self.assertEqual(self.fake.sheet(TARGET, 'Results 3').row_count, 2)
+        self.assertEqual(len(self.fake.sheet(TARGET, 'Results 1').conditional_formats), 2)
+        self.assertEqual(self.fake.values(TARGET, 'Shard Index'), [
+            SHARD_INDEX_COLUMNS,
+            ['Results 1', '', '2', '1', '2'],
+            ['Results 2', '', '2', '3', '4'],
+            ['Results 3', '', '1', '5', '5'],
+        ])
+
+    def test_rerun_reuses_tabs_and_drops_stale_shards(self):
+        write_sharded(self.fake, scored(5), shard_rows=2)
+        first_id = self.fake.sheet(TARGET, 'Results 1').sheet_id
+
+        self.assertTrue(write_sharded(self.fake, scored(3), shard_rows=2))
+
+        self.assertEqual(self.titles(), ['Results 1', 'Results 2', 'Shard Index', 'Sheet1'])
+        self.assertEqual(self.fake.sheet(TARGET, 'Results 1').sheet_id, first_id)
+        self.assertEqual(len(self.fake.values(TARGET, 'Shard Index')), 3)
+
+    def test_only_tabs_listed_in_the_index_are_deleted(self):
+        self.fake.add_sheet(TARGET, 'Results archive 2024', [['keep']])
+        write_sharded(self.fake, scored(5), shard_rows=2)
+
+        self.assertTrue(write_sharded(self.fake, scored(1), shard_rows=2))
+
+        self.assertEqual(self.titles(), ['Results 1', 'Results archive 2024', 'Shard Index', 'Sheet1'])
+        self.assertEqual(self.fake.values(TARGET, 'Results archive 2024'), [['keep']])
+
+    def test_rows_are_split_by_pod(self):
+        data = scored(4, ['POD 5', 'POD 6', 'POD 5', 'POD 5'])
+
+        self.assertTrue(write_sharded(self.fake, data, shard_rows=2, by_pod=True))
+
+        self.assertEqual(self.fake.values(TARGET, 'Shard Index')[1:], [
+            ['Results POD 5', 'POD 5', '2', '1', '2'],
+            ['Results POD 5 (2)', 'POD 5', '1', '3', '3'],
+            ['Results POD 6', 'POD 6', '1', '4', '4'],
+        ])
+        self.assertEqual([row[8] for row in self.fake.values(TARGET, 'Results POD 6')[1:]], ['ID1'])
+
+    def test_sharding_by_pod_needs_a_pod_column(self):
+        self.assertFalse(write_sharded(self.fake, scored(2), by_pod=True))
+        self.assertEqual(self.titles(), ['Sheet1'])
+
+if __name__ == '__main__':
+    unittest.main()
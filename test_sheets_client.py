@@ -0,0 +1,94 @@
+import datetime
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+from sheets_client import SheetsSession
+
+"""Unit tests for the reusable Sheets session."""
+
+class FakeCredentials:
+    """Minimal stand-in for service-account credentials."""
+
+    service_account_email = 'robot@example.iam.gserviceaccount.com'
+
+    def __init__(self):
+        self.token = None
+        self.expiry = None
+        self.refresh_count = 0
+
+    @property
+    def valid(self):
+        return self.token is not None and self.expiry > datetime.datetime.utcnow()
+
+    def refresh(self, request):
+        self.refresh_count += 1
+        self.token = f'token-{self.refresh_count}'
+        self.expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+
+class TestSheetsSession(unittest.TestCase):
+    """Test cases for SheetsSession."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.token_path = os.path.join(self.tmp_dir.name, 'token.json')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @patch('sheets_client.service_account.Credentials')
+    def test_token_is_reused_until_expiry(self, mock_credentials):
+        creds = FakeCredentials()
+        mock_credentials.from_service_account_file.return_value = creds
+        session = SheetsSession('credentials.json')
+
+        session.ensure_token()
+        session.ensure_token()
+        self.assertEqual(creds.refresh_count, 1)
+
+        creds.expiry = datetime.datetime.utcnow() - datetime.timedelta(seconds=1)
+        session.ensure_token()
+        self.assertEqual(creds.refresh_count, 2)
+
+    @patch('sheets_client.service_account.Credentials')
+    def test_token_is_cached_on_disk_across_sessions(self, mock_credentials):
+        mock_credentials.from_service_account_file.side_effect = lambda *args, **kwargs: FakeCredentials()
+
+        first = SheetsSession('credentials.json', token_cache_path=self.token_path)
+        token = first.ensure_token()
+        self.assertEqual(os.stat(self.token_path).st_mode & 0o777, 0o600)
+
+        second = SheetsSession('credentials.json', token_cache_path=self.token_path)
+        self.assertEqual(second.ensure_token(), token)
+        self.assertEqual(second.credentials.refresh_count, 0)
+
+    @patch('sheets_client.service_account.Credentials')
+    def test_cached_token_for_other_scopes_is_ignored(self, mock_credentials):
+        mock_credentials.from_service_account_file.side_effect = lambda *args, **kwargs: FakeCredentials()
+        SheetsSession('credentials.json', token_cache_path=self.token_path).ensure_token()
+
+        readonly = SheetsSession('credentials.json', scopes=['https://www.googleapis.com/auth/spreadsheets.readonly'],
+                                 token_cache_path=self.token_path)
+        readonly.ensure_token()
+        self.assertEqual(readonly.credentials.refresh_count, 1)
+
+    @patch('sheets_client.service_account.Credentials')
+    @patch('sheets_client.build')
+    def test_each_thread_gets_its_own_service(self, mock_build, mock_credentials):
+        mock_build.side_effect = lambda *args, **kwargs: MagicMock()
+        session = SheetsSession('credentials.json')
+        services = []
+
+        thread = threading.Thread(target=lambda: services.append(session.service()))
+        thread.start()
+        thread.join()
+        services.append(session.service())
+        services.append(session.service())
+
+        self.assertIsNot(services[0], services[1])
+        self.assertIs(services[1], services[2])
+        mock_credentials.from_service_account_file.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
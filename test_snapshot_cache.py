@@ -0,0 +1,119 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+from extract_data import prepare_sheet_values, clear_header_index_cache, configure_scheduler
+from sheet_fixtures import mock_source_service
+from snapshot_cache import SourceSnapshot
+from snapshot_sync import sync_with_snapshot, load_snapshot_data
+
+"""Unit tests for the content-hash source snapshot."""
+
+HEADER = ['Email Address', 'Tool being used', 'Feature used', 'Context Awareness', 'Autonomy',
+          'Experience', 'Output Quality', 'Overall Rating', 'Unique ID']
+
+class TestSourceSnapshot(unittest.TestCase):
+    """Test cases for SourceSnapshot."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'snapshot')
+        self.columns = {'Unique ID': ['ID1', 'ID2'], 'Autonomy': ['4', '']}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_save_and_load_round_trip(self):
+        SourceSnapshot(self.columns).save(self.path)
+
+        snapshot = SourceSnapshot.load(self.path)
+
+        self.assertEqual(snapshot.to_values(), self.columns)
+        self.assertEqual(snapshot.content_hash, SourceSnapshot(self.columns).content_hash)
+        self.assertEqual(len(snapshot), 2)
+
+    def test_hash_depends_on_content_and_salt(self):
+        base = SourceSnapshot(self.columns).content_hash
+
+        self.assertNotEqual(SourceSnapshot({**self.columns, 'Autonomy': ['4', '5']}).content_hash, base)
+        self.assertNotEqual(SourceSnapshot(self.columns, salt='other').content_hash, base)
+
+    def test_missing_or_incomplete_snapshot_loads_as_none(self):
+        self.assertIsNone(SourceSnapshot.load(self.path))
+
+        SourceSnapshot(self.columns).save(self.path)
+        os.remove(os.path.join(self.path, '0.npy'))
+        self.assertIsNone(SourceSnapshot.load(self.path))
+
+class TestSyncWithSnapshot(unittest.TestCase):
+    """Test cases for sync_with_snapshot and load_snapshot_data."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'snapshot')
+        self.rows = [
+            ['test@email.com', 'Tool1', 'Feature1', '4', '3', '5', '4', '4', 'ID1'],
+            ['test2@email.com', 'Tool2', 'Feature2', '5', '5', '5', '5', '2', 'ID2']
+        ]
+        clear_header_index_cache()
+        configure_scheduler()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @patch('extract_data.connect_to_sheets')
+    def test_unchanged_source_skips_scoring_and_write(self, mock_connect):
+        mock_connect.return_value = mock_source_service([HEADER] + self.rows)
+        write = Mock(return_value=True)
+
+        self.assertTrue(sync_with_snapshot(self.path, write=write))
+        self.assertTrue(sync_with_snapshot(self.path, write=write))
+
+        write.assert_called_once()
+
+    @patch('extract_data.connect_to_sheets')
+    def test_changed_source_is_written_again(self, mock_connect):
+        mock_connect.return_value = mock_source_service([HEADER] + self.rows)
+        write = Mock(return_value=True)
+        sync_with_snapshot(self.path, write=write)
+
+        mock_connect.return_value = mock_source_service([HEADER] + self.rows[:1])
+        self.assertTrue(sync_with_snapshot(self.path, write=write))
+
+        self.assertEqual(write.call_count, 2)
+        self.assertEqual(list(write.call_args.args[0]['Unique ID']), ['ID1'])
+
+    @patch('extract_data.connect_to_sheets')
+    def test_unchanged_source_is_written_again_with_other_output_options(self, mock_connect):
+        mock_connect.return_value = mock_source_service([HEADER] + self.rows)
+        write = Mock(return_value=True)
+        sync_with_snapshot(self.path, write=write, output_options=['diff=False'])
+
+        self.assertTrue(sync_with_snapshot(self.path, write=write, output_options=['diff=True']))
+        self.assertTrue(sync_with_snapshot(self.path, write=write, output_options=['diff=True']))
+        with patch('extract_data.TARGET_SHEET', 'Other'):
+            self.assertTrue(sync_with_snapshot(self.path, write=write, output_options=['diff=True']))
+
+        self.assertEqual(write.call_count, 3)
+
+    @patch('extract_data.connect_to_sheets')
+    def test_failed_write_does_not_save_snapshot(self, mock_connect):
+        mock_connect.return_value = mock_source_service([HEADER] + self.rows)
+
+        self.assertFalse(sync_with_snapshot(self.path, write=Mock(return_value=False)))
+
+        self.assertIsNone(SourceSnapshot.load(self.path))
+
+    @patch('extract_data.connect_to_sheets')
+    def test_reload_matches_fetched_output(self, mock_connect):
+        mock_connect.return_value = mock_source_service([HEADER] + self.rows)
+        write = Mock(return_value=True)
+        sync_with_snapshot(self.path, write=write)
+
+        data = load_snapshot_data(self.path)
+
+        self.assertEqual(prepare_sheet_values(data), prepare_sheet_values(write.call_args.args[0]))
+        self.assertEqual(list(data['Result']), ['Ok', 'Not ok'])
+
+if __name__ == '__main__':
+    unittest.main()
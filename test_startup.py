@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+import unittest
+
+"""Unit tests for import-time behaviour of extract_data."""
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+class TestStartup(unittest.TestCase):
+    """Importing extract_data must be cheap and free of side effects."""
+
+    def run_python(self, code):
+        return subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True,
+                              capture_output=True, text=True).stdout.strip()
+
+    def test_import_defers_heavy_modules(self):
+        loaded = self.run_python(
+            "import sys, extract_data; "
+            "print(sorted(m for m in ('pandas', 'numpy', 'googleapiclient.discovery', "
+            "'google.oauth2.service_account', 'httplib2') if m in sys.modules))"
+        )
+
+        self.assertEqual(loaded, '[]')
+
+    def test_import_configures_no_logging_handlers(self):
+        handlers = self.run_python("import logging, extract_data; print(len(logging.getLogger().handlers))")
+
+        self.assertEqual(handlers, '0')
+
+    def test_deferred_client_modules_resolve_on_access(self):
+        resolved = self.run_python("import sheets_client; print(sheets_client.build.__module__)")
+
+        self.assertEqual(resolved, 'googleapiclient.discovery')
+
+class TestModeArguments(unittest.TestCase):
+    """Flag combinations the program would partly ignore are rejected before it starts."""
+
+    def run_program(self, *args):
+        return subprocess.run([sys.executable, 'extract_data.py', *args], cwd=ROOT,
+                              capture_output=True, text=True)
+
+    def test_conflicting_modes_and_options_are_rejected(self):
+        for args, message in ((['--watch', '--source', 'id:POD 5'], '--watch cannot be combined with --source'),
+                              (['--stream', '--shard-rows', '10'], '--shard-rows is not supported with --stream'),
+                              (['--incremental', '--diff'], '--diff is not supported with --incremental'),
+                              (['--no-sheet'], '--no-sheet needs at least one --sink')):
+            with self.subTest(args=args):
+                result = self.run_program(*args)
+
+                self.assertEqual(result.returncode, 2)
+                self.assertIn(message, result.stderr)
+
+if __name__ == '__main__':
+    unittest.main()
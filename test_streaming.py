@@ -0,0 +1,85 @@
+import unittest
+from unittest.mock import Mock, patch
+import httplib2
+from googleapiclient.errors import HttpError
+from extract_data import (fetch_source_values, iter_scored_chunks, write_streaming,
+                          clear_header_index_cache, configure_scheduler)
+from sheet_fixtures import mock_source_service
+
+"""Unit tests for windowed, streaming extraction."""
+
+HEADER = ['Email Address', 'Tool being used', 'Feature used', 'Context Awareness', 'Autonomy',
+          'Experience', 'Output Quality', 'Overall Rating', 'Unique ID']
+
+class TestStreamingExtraction(unittest.TestCase):
+    """Test cases for iter_source_windows, iter_scored_chunks and write_streaming."""
+
+    def setUp(self):
+        self.values = [HEADER] + [
+            [f'user{i}@email.com', 'Tool1', 'Feature1', '5', '5', '5', '5', str(i % 5 + 1), f'ID{i}']
+            for i in range(7)
+        ]
+        clear_header_index_cache()
+        configure_scheduler()
+        self.mock_service = mock_source_service(self.values)
+        self.mock_sheets = self.mock_service.spreadsheets.return_value
+
+    def test_fetches_windows_until_empty_page(self):
+        values = fetch_source_values(self.mock_service, window_rows=3)
+
+        self.assertEqual(values['Unique ID'], [f'ID{i}' for i in range(7)])
+        starts = [ranges[0] for ranges in self.mock_service.requested_ranges[1:]]
+        self.assertEqual(starts, ['POD 5!A2:A4', 'POD 5!A5:A7', 'POD 5!A8:A10', 'POD 5!A11:A13'])
+
+    def test_window_past_grid_limit_ends_the_stream(self):
+        batch_get = self.mock_sheets.values.return_value.batchGet
+        fetch = batch_get.side_effect
+        error = HttpError(httplib2.Response({'status': 400}),
+                          b'{"error": {"message": "Range exceeds grid limits. Max rows: 4"}}')
+
+        def grid_limited(spreadsheetId, ranges, majorDimension):
+            if not ranges[0].endswith(':A4'):
+                return Mock(execute=Mock(side_effect=error))
+            return fetch(spreadsheetId, ranges, majorDimension)
+
+        batch_get.side_effect = grid_limited
+
+        values = fetch_source_values(self.mock_service, window_rows=3)
+
+        self.assertEqual(values['Unique ID'], ['ID0', 'ID1', 'ID2'])
+
+    def test_scored_chunks_follow_windows(self):
+        chunks = list(iter_scored_chunks(self.mock_service, window_rows=3))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 1])
+        self.assertEqual(list(chunks[2]['Unique ID']), ['ID6'])
+        self.assertTrue(all('Result' in chunk.columns for chunk in chunks))
+
+    def test_scored_chunks_are_lazy(self):
+        chunks = iter_scored_chunks(self.mock_service, window_rows=3)
+        next(chunks)
+
+        self.assertEqual(len(self.mock_service.requested_ranges), 2)  # Header plus one window
+
+    @patch('extract_data.write_to_target_sheet', return_value=True)
+    def test_write_streaming_writes_below_first_chunk(self, mock_write):
+        written = write_streaming(self.mock_service, iter_scored_chunks(self.mock_service, window_rows=3))
+
+        self.assertEqual(written, 7)
+        mock_write.assert_called_once()
+        requests = [call.kwargs['body']['requests'] for call in self.mock_sheets.batchUpdate.call_args_list]
+        self.assertEqual([request['updateSheetProperties']['properties']['gridProperties']['rowCount']
+                          for request, _ in requests], [7, 8])
+        self.assertEqual([update['updateCells']['start']['rowIndex'] for _, update in requests], [4, 7])
+        self.assertEqual(requests[1][1]['updateCells']['rows'][0]['values'][8],
+                         {'userEnteredValue': {'stringValue': 'ID6'}})
+
+    @patch('extract_data.write_to_target_sheet', return_value=False)
+    def test_write_streaming_stops_on_failed_first_write(self, mock_write):
+        written = write_streaming(self.mock_service, iter_scored_chunks(self.mock_service, window_rows=3))
+
+        self.assertIsNone(written)
+        self.mock_sheets.batchUpdate.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from extract_data import sync_incremental, clear_header_index_cache, configure_scheduler
+from sheet_fixtures import mock_source_service
+from sync_state import SyncState
+
+"""Unit tests for incremental sync keyed on Unique ID."""
+
+HEADER = ['Email Address', 'Tool being used', 'Feature used', 'Context Awareness', 'Autonomy',
+          'Experience', 'Output Quality', 'Overall Rating', 'Unique ID']
+
+class TestSyncIncremental(unittest.TestCase):
+    """Test cases for sync_incremental function."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.state_path = os.path.join(self.tmp_dir.name, 'sync_state.json')
+        self.rows = [
+            ['test@email.com', 'Tool1', 'Feature1', '4', '3', '5', '4', '4', 'ID1'],
+            ['test2@email.com', 'Tool2', 'Feature2', '5', '5', '5', '5', '4', 'ID2']
+        ]
+        clear_header_index_cache()
+        configure_scheduler()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _serve(self, header, rows):
+        self.mock_service = mock_source_service([header] + rows)
+        self.mock_sheets = self.mock_service.spreadsheets.return_value
+
+    @patch('extract_data.write_to_target_sheet', return_value=True)
+    def test_first_run_does_full_rebuild(self, mock_write):
+        self._serve(HEADER, self.rows)
+
+        self.assertTrue(sync_incremental(self.mock_service, self.state_path))
+
+        mock_write.assert_called_once()
+        state = SyncState.load(self.state_path)
+        self.assertEqual(state.rows['ID1'][1], 2)
+        self.assertEqual(state.rows['ID2'][1], 3)
+
+    @patch('extract_data.write_to_target_sheet', return_value=True)
+    def test_unchanged_source_writes_nothing(self, mock_write):
+        self._serve(HEADER, self.rows)
+        sync_incremental(self.mock_service, self.state_path)
+        mock_write.reset_mock()
+
+        self.assertTrue(sync_incremental(self.mock_service, self.state_path))
+
+        mock_write.assert_not_called()
+        self.mock_sheets.batchUpdate.assert_not_called()
+
+    @patch('extract_data.write_to_target_sheet', return_value=True)
+    def test_new_and_changed_rows_are_patched(self, mock_write):
+        self._serve(HEADER, self.rows)
+        sync_incremental(self.mock_service, self.state_path)
+        mock_write.reset_mock()
+
+        changed = [self.rows[0], self.rows[1][:7] + ['2', 'ID2'],
+                   ['test3@email.com', 'Tool3', 'Feature3', '1', '1', '1', '1', '1', 'ID3']]
+        self._serve(HEADER, changed)
+
+        self.assertTrue(sync_incremental(self.mock_service, self.state_path))
+
+        mock_write.assert_not_called()
+        self.mock_sheets.batchUpdate.assert_called_once()
+        resize, update = self.mock_sheets.batchUpdate.call_args.kwargs['body']['requests']
+        self.assertEqual(resize['updateSheetProperties']['properties']['gridProperties'], {'rowCount': 4})
+        self.assertEqual(update['updateCells']['start']['rowIndex'], 2)  # Sheet row 3, then the new row 4
+        rows = update['updateCells']['rows']
+        self.assertEqual(rows[0]['values'][-1], {'userEnteredValue': {'stringValue': 'Not ok'}})
+        self.assertEqual(rows[1]['values'][8], {'userEnteredValue': {'stringValue': 'ID3'}})
+        self.assertEqual(SyncState.load(self.state_path).rows['ID3'][1], 4)
+
+    @patch('extract_data.write_to_target_sheet', return_value=True)
+    def test_header_change_triggers_full_rebuild(self, mock_write):
+        self._serve(HEADER, self.rows)
+        sync_incremental(self.mock_service, self.state_path)
+        mock_write.reset_mock()
+
+        self._serve(HEADER + ['Pod'], [row + ['POD 5'] for row in self.rows])
+
+        self.assertTrue(sync_incremental(self.mock_service, self.state_path))
+        mock_write.assert_called_once()
+
+    @patch('extract_data.write_to_target_sheet', return_value=True)
+    def test_removed_row_triggers_full_rebuild(self, mock_write):
+        self._serve(HEADER, self.rows)
+        sync_incremental(self.mock_service, self.state_path)
+        mock_write.reset_mock()
+
+        self._serve(HEADER, self.rows[1:])
+
+        self.assertTrue(sync_incremental(self.mock_service, self.state_path))
+        mock_write.assert_called_once()
+        self.assertNotIn('ID1', SyncState.load(self.state_path).rows)
+
+    @patch('extract_data.write_to_target_sheet', return_value=False)
+    def test_failed_rebuild_keeps_state_untouched(self, mock_write):
+        self._serve(HEADER, self.rows)
+
+        self.assertFalse(sync_incremental(self.mock_service, self.state_path))
+        self.assertFalse(os.path.exists(self.state_path))
+
+if __name__ == '__main__':
+    unittest.main()
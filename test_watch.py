@@ -0,0 +1,90 @@
+import threading
+import unittest
+from unittest.mock import Mock, patch
+from extract_data import clear_header_index_cache, configure_scheduler
+from sheet_fixtures import mock_multi_source_service
+from snapshot_sync import watch_source
+from watch import AdaptivePoller
+
+"""Unit tests for the adaptive polling watch mode."""
+
+HEADER = ['Email Address', 'Tool being used', 'Feature used', 'Context Awareness', 'Autonomy',
+          'Experience', 'Output Quality', 'Overall Rating', 'Unique ID']
+
+class InstantEvent(threading.Event):
+    """Event whose wait() returns immediately, records the requested timeouts and calls ``on_wait``."""
+
+    def __init__(self, on_wait=None):
+        super().__init__()
+        self.waits = []
+        self.on_wait = on_wait
+
+    def wait(self, timeout=None):
+        self.waits.append(timeout)
+        if self.on_wait:
+            self.on_wait(self)
+        return self.is_set()
+
+class TestAdaptivePoller(unittest.TestCase):
+    """Test cases for AdaptivePoller."""
+
+    def test_interval_backs_off_when_idle_and_resets_on_change(self):
+        poller = AdaptivePoller(1, 5, backoff=2)
+
+        intervals = [poller.next_interval(changed) for changed in [False, False, False, True, False]]
+
+        self.assertEqual(intervals, [2, 4, 5, 1, 2])
+
+    def test_run_stops_when_event_is_set_and_survives_failures(self):
+        stop = InstantEvent()
+        poller = AdaptivePoller(1, 8, stop=stop)
+        results = iter([True, RuntimeError('boom'), False, True])
+
+        def tick():
+            result = next(results)
+            if isinstance(result, Exception):
+                raise result
+            if result is True and len(stop.waits) == 3:
+                stop.set()
+            return result
+
+        self.assertEqual(poller.run(tick), 4)
+        self.assertEqual(stop.waits, [1, 2, 4, 1])
+
+    def test_rejects_invalid_intervals(self):
+        with self.assertRaises(ValueError):
+            AdaptivePoller(10, 5)
+
+class TestWatchSource(unittest.TestCase):
+    """Test cases for watch_source."""
+
+    def setUp(self):
+        clear_header_index_cache()
+        configure_scheduler()
+        self.rows = [
+            ['test@email.com', 'Tool1', 'Feature1', '4', '3', '5', '4', '4', 'ID1'],
+            ['test2@email.com', 'Tool2', 'Feature2', '5', '5', '5', '5', '2', 'ID2']
+        ]
+
+    @patch('extract_data.connect_to_sheets')
+    def test_writes_only_when_the_source_changes(self, mock_connect):
+        served = [HEADER] + self.rows[:1]
+        mock_connect.return_value = mock_multi_source_service(lambda spreadsheet_id, tab: served)
+
+        def on_wait(stop):
+            # A response arrives after the second poll; stop after the third
+            if len(stop.waits) == 2:
+                served.append(self.rows[1])
+            elif len(stop.waits) == 3:
+                stop.set()
+        poller = AdaptivePoller(1, 8, stop=InstantEvent(on_wait))
+        write = Mock(return_value=True)
+
+        self.assertEqual(watch_source(poller, write=write), 3)
+
+        self.assertEqual(write.call_count, 2)
+        self.assertEqual(list(write.call_args.args[0]['Unique ID']), ['ID1', 'ID2'])
+        self.assertEqual(poller.stop.waits, [1, 2, 1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+import pandas as pd
+from extract_data import write_diff_to_target_sheet, prepare_sheet_values, configure_scheduler
+
+"""Unit tests for the keyed diff writer."""
+
+class TestWriteDiffToTargetSheet(unittest.TestCase):
+    """Test cases for write_diff_to_target_sheet function."""
+
+    def setUp(self):
+        configure_scheduler()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.last_write_path = os.path.join(self.tmp_dir.name, 'last_write.json')
+        self.data = pd.DataFrame({
+            'Email Address': ['test1@email.com', 'test2@email.com', 'test3@email.com'],
+            'Overall Rating': [4.0, 4.0, 2.0],
+            'Unique ID': ['ID1', 'ID2', 'ID3'],
+            'Mean Rating': [4.0, 5.0, 5.0],
+            'Difference': [0.0, 1.0, 3.0],
+            'Result': ['Ok', 'Ok', 'Not ok']
+        })
+        self.mock_service = Mock()
+        self.mock_sheets = self.mock_service.spreadsheets.return_value
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _serve_target(self, values):
+        self.mock_sheets.values.return_value.get.return_value.execute.return_value = {'values': values}
+
+    def _requests(self):
+        return self.mock_sheets.batchUpdate.call_args.kwargs['body']['requests']
+
+    def test_unchanged_rows_are_not_rewritten(self):
+        current = prepare_sheet_values(self.data)
+        updated = self.data.copy()
+        updated.loc[1, 'Result'] = 'Not ok'
+        # Rows come back in a different order; ID2 should still be patched in place
+        self._serve_target([current[0], current[2], current[1], current[3]])
+
+        self.assertTrue(write_diff_to_target_sheet(self.mock_service, updated))
+
+        requests = self._requests()
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(requests[0]['updateCells']['range']['startRowIndex'], 1)
+        self.assertEqual(requests[0]['updateCells']['rows'][0]['values'],
+                         [{'userEnteredValue': {'stringValue': 'Not ok'}}])
+
+    def test_deleted_row_is_replaced_by_inserted_row(self):
+        self._serve_target(prepare_sheet_values(self.data))
+        updated = self.data.drop(index=1).reset_index(drop=True)
+        updated.loc[len(updated)] = ['new@email.com', 5.0, 'ID4', 5.0, 0.0, 'Ok']
+
+        self.assertTrue(write_diff_to_target_sheet(self.mock_service, updated))
+
+        rows = {request['updateCells']['range']['startRowIndex'] for request in self._requests()}
+        self.assertEqual(rows, {2})
+
+    @patch('extract_data.write_to_target_sheet', return_value=True)
+    def test_header_change_falls_back_to_full_write(self, mock_write):
+        self._serve_target([['Old header']])
+
+        self.assertTrue(write_diff_to_target_sheet(self.mock_service, self.data))
+        mock_write.assert_called_once()
+
+    def test_local_copy_replaces_target_read(self):
+        with open(self.last_write_path, 'w', encoding='utf-8') as f:
+            json.dump(prepare_sheet_values(self.data), f)
+
+        self.assertTrue(write_diff_to_target_sheet(self.mock_service, self.data, self.last_write_path))
+
+        self.mock_sheets.values.return_value.get.assert_not_called()
+        self.mock_sheets.batchUpdate.assert_not_called()
+
+    @patch('extract_data.write_to_target_sheet', return_value=True)
+    def test_local_copy_is_saved_after_write(self, mock_write):
+        self._serve_target([])
+
+        self.assertTrue(write_diff_to_target_sheet(self.mock_service, self.data, self.last_write_path))
+
+        with open(self.last_write_path, encoding='utf-8') as f:
+            self.assertEqual(json.load(f), prepare_sheet_values(self.data))
+
+    def test_failed_write_returns_false(self):
+        self._serve_target(prepare_sheet_values(self.data[:1]))
+        self.mock_sheets.batchUpdate.return_value.execute.side_effect = Exception("Write failed")
+
+        self.assertFalse(write_diff_to_target_sheet(self.mock_service, self.data, self.last_write_path))
+        self.assertFalse(os.path.exists(self.last_write_path))
+
+if __name__ == '__main__':
+    unittest.main()
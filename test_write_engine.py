@@ -0,0 +1,187 @@
+import threading
+import unittest
+from unittest.mock import Mock
+from fake_sheets import FakeSheetsService
+from write_engine import SheetWriter, chunk_rows, diff_cells, estimate_row_bytes, keyed_layout, split_rows
+
+"""Unit tests for the batched write engine."""
+
+class TestChunkRows(unittest.TestCase):
+    """Test cases for chunk_rows."""
+
+    def test_chunks_respect_size_limit(self):
+        rows = [['x' * 10] * 5 for _ in range(100)]
+        limit = estimate_row_bytes(rows[0]) * 30
+
+        chunks = chunk_rows(rows, limit)
+
+        self.assertEqual([offset for offset, _ in chunks], [0, 30, 60, 90])
+        self.assertEqual(sum(len(chunk) for _, chunk in chunks), 100)
+
+    def test_oversized_row_gets_its_own_chunk(self):
+        rows = [['a'], ['b' * 1000], ['c']]
+
+        chunks = chunk_rows(rows, 100)
+
+        self.assertEqual([chunk for _, chunk in chunks], [[['a']], [['b' * 1000]], [['c']]])
+
+    def test_first_chunk_budget(self):
+        rows = [['x' * 10] for _ in range(10)]
+        row_bytes = estimate_row_bytes(rows[0])
+
+        chunks = chunk_rows(rows, row_bytes * 5, first_chunk_budget=row_bytes * 2)
+
+        self.assertEqual([len(chunk) for _, chunk in chunks], [2, 5, 3])
+
+class TestSplitRows(unittest.TestCase):
+    """Test cases for split_rows."""
+
+    def test_split_by_row_count(self):
+        rows = [[str(i)] for i in range(5)]
+
+        shards = split_rows(rows, 2)
+
+        self.assertEqual([(key, part, offset, len(chunk)) for key, part, offset, chunk in shards],
+                         [(None, 1, 0, 2), (None, 2, 2, 2), (None, 3, 4, 1)])
+
+    def test_split_by_key_keeps_order_and_caps_groups(self):
+        rows = [['a', '1'], ['b', '2'], ['a', '3'], ['a', '4']]
+
+        shards = split_rows(rows, 2, key_index=0)
+
+        self.assertEqual([(key, part, offset, chunk) for key, part, offset, chunk in shards], [
+            ('a', 1, 0, [['a', '1'], ['a', '3']]),
+            ('a', 2, 2, [['a', '4']]),
+            ('b', 1, 3, [['b', '2']]),
+        ])
+
+class TestKeyedDiff(unittest.TestCase):
+    """Test cases for keyed_layout and diff_cells."""
+
+    def test_existing_rows_keep_their_slot(self):
+        self.assertEqual(keyed_layout(['a', 'b', 'c'], ['c', 'a', 'b', 'd']), [1, 2, 0, 3])
+
+    def test_inserted_rows_fill_deleted_slots(self):
+        self.assertEqual(keyed_layout(['a', 'b', 'c'], ['a', 'c', 'x']), [0, 2, 1])
+
+    def test_deletions_are_compacted_from_the_end(self):
+        # 'b' is gone, so 'd' moves up from the last slot instead of leaving a gap
+        self.assertEqual(keyed_layout(['a', 'b', 'c', 'd'], ['a', 'c', 'd']), [0, 2, 1])
+        self.assertEqual(keyed_layout(['a', 'b', 'c'], ['a']), [0])
+
+    def test_duplicate_keys_are_rejected(self):
+        with self.assertRaises(ValueError):
+            keyed_layout(['a', 'a'], ['a'])
+
+    def test_diff_cells_yields_changed_runs(self):
+        old = [['h1', 'h2', 'h3'], ['1', '2', '3'], ['4', '5']]
+        new = [['h1', 'h2', 'h3'], ['1', 'x', 'y'], ['4', '5', ''], ['7', '8', '9']]
+
+        self.assertEqual(list(diff_cells(old, new, 3)), [(1, 1, ['x', 'y']), (3, 0, ['7', '8', '9'])])
+
+class TestSheetWriter(unittest.TestCase):
+    """Test cases for SheetWriter."""
+
+    def setUp(self):
+        self.mock_service = Mock()
+        self.values = [['Header', 'Result']] + [[f'row{i}', 'Ok'] for i in range(50)]
+        self.row_bytes = estimate_row_bytes(self.values[1])
+
+    def _requests(self, service=None):
+        service = service or self.mock_service
+        calls = service.spreadsheets.return_value.batchUpdate.call_args_list
+        return [call.kwargs['body']['requests'] for call in calls]
+
+    def test_small_table_is_one_round_trip(self):
+        format_request = {'addConditionalFormatRule': {}}
+        writer = SheetWriter(self.mock_service, 'target', sheet_id=7)
+
+        self.assertEqual(writer.replace(self.values, [format_request]), 1)
+
+        (requests,) = self._requests()
+        self.assertEqual(requests[0], {'updateCells': {'range': {'sheetId': 7}, 'fields': 'userEnteredValue'}})
+        grid = requests[1]['updateSheetProperties']['properties']['gridProperties']
+        self.assertEqual(grid, {'rowCount': 51, 'columnCount': 2})
+        self.assertEqual(len(requests[2]['updateCells']['rows']), 51)
+        self.assertEqual(requests[3], format_request)
+
+    def test_large_table_is_chunked_and_sent_concurrently(self):
+        workers = []
+        barrier = threading.Barrier(2, timeout=5)
+
+        def service_factory():
+            service = Mock()
+            service.spreadsheets.return_value.batchUpdate.return_value.execute.side_effect = barrier.wait
+            workers.append(service)
+            return service
+
+        writer = SheetWriter(self.mock_service, 'target', service_factory=service_factory,
+                             max_request_bytes=self.row_bytes * 20, max_workers=2)
+
+        self.assertEqual(writer.replace(self.values), 3)
+
+        first = self._requests()[0]
+        self.assertEqual(first[2]['updateCells']['start']['rowIndex'], 0)
+        later = [requests[0]['updateCells']['start']['rowIndex']
+                 for worker in workers for requests in self._requests(worker)]
+        self.assertEqual(len(workers), 2)
+        first_rows = len(first[2]['updateCells']['rows'])
+        expected = [offset for offset, _ in chunk_rows(self.values[first_rows:], self.row_bytes * 20)]
+        self.assertEqual(sorted(later), [first_rows + offset for offset in expected])
+
+    def test_patch_merges_consecutive_rows_and_sizes_the_grid_first(self):
+        writer = SheetWriter(self.mock_service, 'target')
+
+        calls = writer.patch([(5, ['b', 'Ok']), (4, ['a', 'Ok']), (9, ['c', 'Not ok'])], row_count=10)
+
+        self.assertEqual(calls, 1)
+        (requests,) = self._requests()
+        self.assertEqual(requests[0]['updateSheetProperties']['properties']['gridProperties'], {'rowCount': 10})
+        self.assertEqual([request['updateCells']['start']['rowIndex'] for request in requests[1:]], [4, 9])
+        self.assertEqual(len(requests[1]['updateCells']['rows']), 2)
+
+    def test_resent_write_rows_leaves_the_same_table(self):
+        fake = FakeSheetsService()
+        fake.add_sheet('target', 'Sheet1', [['h'], ['a']])
+        writer = SheetWriter(fake, 'target')
+
+        writer.write_rows(2, [['b'], ['c']])
+        writer.write_rows(2, [['b'], ['c']])
+
+        self.assertEqual(fake.values('target', 'Sheet1'), [['h'], ['a'], ['b'], ['c']])
+        self.assertEqual(fake.sheet('target', 'Sheet1').row_count, 4)
+
+    def test_apply_diff_sends_only_changed_cells(self):
+        writer = SheetWriter(self.mock_service, 'target')
+        new_values = [row[:] for row in self.values] + [['row50', 'Ok']]
+        new_values[3][1] = 'Not ok'
+
+        changed, calls = writer.apply_diff(self.values, new_values)
+
+        self.assertEqual((changed, calls), (3, 1))
+        (requests,) = self._requests()
+        self.assertEqual(requests[0]['appendDimension']['length'], 1)
+        ranges = [request['updateCells']['range'] for request in requests[1:]]
+        self.assertEqual([(r['startRowIndex'], r['startColumnIndex'], r['endColumnIndex']) for r in ranges],
+                         [(3, 1, 2), (51, 0, 2)])
+
+    def test_apply_diff_clears_leftover_rows(self):
+        writer = SheetWriter(self.mock_service, 'target')
+
+        changed, _ = writer.apply_diff(self.values, self.values[:49])
+
+        self.assertEqual(changed, 4)
+        (requests,) = self._requests()
+        self.assertEqual(requests, [{'updateCells': {
+            'range': {'sheetId': 0, 'startRowIndex': 49, 'endRowIndex': 51}, 'fields': 'userEnteredValue'
+        }}])
+
+    def test_failure_propagates(self):
+        self.mock_service.spreadsheets.return_value.batchUpdate.return_value.execute.side_effect = Exception("boom")
+        writer = SheetWriter(self.mock_service, 'target')
+
+        with self.assertRaises(Exception):
+            writer.replace(self.values)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,7 @@ import unittest
 from unittest.mock import Mock, patch
 import pandas as pd
 import numpy as np
-from extract_data import write_to_target_sheet
+from extract_data import write_to_target_sheet, configure_scheduler, prepare_sheet_values, round_values
 
 """Unit tests for Google Sheets write functionality."""
 
@@ -10,6 +10,7 @@ class TestWriteToTargetSheet(unittest.TestCase):
     """Test cases for write_to_target_sheet function."""
     
     def setUp(self):
+        configure_scheduler()
         # Create sample DataFrame for testing
         self.sample_data = pd.DataFrame({
             'Email Address': ['test1@email.com', 'test2@email.com'],
@@ -30,12 +31,11 @@ class TestWriteToTargetSheet(unittest.TestCase):
         self.mock_service = Mock()
         self.mock_sheets = Mock()
         self.mock_service.spreadsheets.return_value = self.mock_sheets
+        self.mock_sheets.get.return_value.execute.return_value = {'sheets': [{'properties': {'sheetId': 0}}]}
 
     def test_successful_write(self):
         # Configure mocks
-        self.mock_sheets.values().clear().execute.return_value = {}
-        self.mock_sheets.values().update().execute.return_value = {}
-        self.mock_sheets.batchUpdate().execute.return_value = {}
+        self.mock_sheets.batchUpdate.return_value.execute.return_value = {}
         
         # Execute function
         result = write_to_target_sheet(self.mock_service, self.sample_data)
@@ -43,14 +43,37 @@ class TestWriteToTargetSheet(unittest.TestCase):
         # Verify result
         self.assertTrue(result)
         
-        # Verify clear was called
-        self.mock_sheets.values().clear.assert_called_once()
-        
-        # Verify update was called
-        self.mock_sheets.values().update.assert_called_once()
-        
-        # Verify batch update for formatting was called
+        # Verify clear, data write and formatting went out in a single batch update
         self.mock_sheets.batchUpdate.assert_called_once()
+        self.mock_sheets.values.return_value.clear.assert_not_called()
+        self.mock_sheets.values.return_value.update.assert_not_called()
+
+        requests = self.mock_sheets.batchUpdate.call_args.kwargs['body']['requests']
+        self.assertEqual([list(request)[0] for request in requests],
+                         ['updateCells', 'updateSheetProperties', 'updateCells',
+                          'addConditionalFormatRule', 'addConditionalFormatRule'])
+        self.assertEqual(requests[0]['updateCells']['fields'], 'userEnteredValue')
+        rows = requests[2]['updateCells']['rows']
+        self.assertEqual(len(rows), 3)  # Header plus two data rows
+        self.assertEqual(rows[0]['values'][0], {'userEnteredValue': {'stringValue': 'Email Address'}})
+
+    def test_rerun_does_not_stack_format_rules(self):
+        # Configure mocks: a first run wrote the rules, then the sheet picked up a duplicate
+        self.mock_sheets.batchUpdate.return_value.execute.return_value = {}
+        write_to_target_sheet(self.mock_service, self.sample_data)
+        requests = self.mock_sheets.batchUpdate.call_args.kwargs['body']['requests']
+        rules = [request['addConditionalFormatRule']['rule'] for request in requests[3:]]
+        self.mock_sheets.get.return_value.execute.return_value = {
+            'sheets': [{'properties': {}, 'conditionalFormats': rules + rules[:1]}]
+        }
+
+        # Execute function again
+        result = write_to_target_sheet(self.mock_service, self.sample_data)
+
+        # Verify only the duplicate is removed and nothing is added
+        self.assertTrue(result)
+        requests = self.mock_sheets.batchUpdate.call_args.kwargs['body']['requests']
+        self.assertEqual(requests[3:], [{'deleteConditionalFormatRule': {'index': 2, 'sheetId': 0}}])
 
     def test_handle_empty_values(self):
         # Create DataFrame with empty values
@@ -58,9 +81,7 @@ class TestWriteToTargetSheet(unittest.TestCase):
         data_with_empty.loc[0, 'Context Awareness'] = np.nan
         
         # Configure mocks
-        self.mock_sheets.values().clear().execute.return_value = {}
-        self.mock_sheets.values().update().execute.return_value = {}
-        self.mock_sheets.batchUpdate().execute.return_value = {}
+        self.mock_sheets.batchUpdate.return_value.execute.return_value = {}
         
         # Execute function
         result = write_to_target_sheet(self.mock_service, data_with_empty)
@@ -68,26 +89,13 @@ class TestWriteToTargetSheet(unittest.TestCase):
         # Verify result
         self.assertTrue(result)
 
-    def test_handle_clear_failure(self):
-        # Configure mock to fail on clear
-        self.mock_sheets.values().clear().execute.side_effect = Exception("Clear failed")
-        
-        # Execute function
-        result = write_to_target_sheet(self.mock_service, self.sample_data)
-        
-        # Verify result
-        self.assertFalse(result)
-        
-        # Verify clear was attempted
-        self.mock_sheets.values().clear.assert_called_once()
-        
-        # Verify update was not called
-        self.mock_sheets.values().update.assert_not_called()
+        # Verify the empty rating clears its cell
+        requests = self.mock_sheets.batchUpdate.call_args.kwargs['body']['requests']
+        self.assertEqual(requests[2]['updateCells']['rows'][1]['values'][3], {})
 
-    def test_handle_update_failure(self):
-        # Configure mocks
-        self.mock_sheets.values().clear().execute.return_value = {}
-        self.mock_sheets.values().update().execute.side_effect = Exception("Update failed")
+    def test_handle_write_failure(self):
+        # Configure mock to fail on the batch update
+        self.mock_sheets.batchUpdate.return_value.execute.side_effect = Exception("Write failed")
         
         # Execute function
         result = write_to_target_sheet(self.mock_service, self.sample_data)
@@ -95,28 +103,37 @@ class TestWriteToTargetSheet(unittest.TestCase):
         # Verify result
         self.assertFalse(result)
         
-        # Verify clear was called
-        self.mock_sheets.values().clear.assert_called_once()
-        
-        # Verify update was attempted
-        self.mock_sheets.values().update.assert_called_once()
-
-    def test_handle_formatting_failure(self):
-        # Configure mocks
-        self.mock_sheets.values().clear().execute.return_value = {}
-        self.mock_sheets.values().update().execute.return_value = {}
-        self.mock_sheets.batchUpdate().execute.side_effect = Exception("Formatting failed")
-        
-        # Execute function
-        result = write_to_target_sheet(self.mock_service, self.sample_data)
-        
-        # Verify result
-        self.assertFalse(result)
-        
-        # Verify previous operations were called
-        self.mock_sheets.values().clear.assert_called_once()
-        self.mock_sheets.values().update.assert_called_once()
+        # Verify the write was attempted once
         self.mock_sheets.batchUpdate.assert_called_once()
 
+class TestPrepareSheetValues(unittest.TestCase):
+    """Test cases for the vectorized cell serialization."""
+
+    def test_round_values_matches_builtin_round(self):
+        values = np.concatenate([
+            [2.675, 1.005, 0.125, 0.375, 123456.785, -0.004, 1e308, np.inf],
+            np.random.default_rng(0).uniform(-1000, 1000, 10000)
+        ])
+
+        expected = [round(float(value), 2) for value in values]
+        self.assertEqual(round_values(values).tolist(), expected)
+
+    def test_cells_match_str_of_rounded_values(self):
+        data = pd.DataFrame({
+            'Email Address': ['a@x.com', None, 'c@x.com', 'a@x.com'],
+            'Unique ID': [1, 1.0, True, 'ID4'],
+            'Mean Rating': [10 / 3, np.nan, 2.675, 3.3333],
+            'Difference': [-0.004, 0.0, 1e16, ' '],
+            'Result': ['Ok', 'Not ok', 'Ok', 'Ok']
+        })
+
+        self.assertEqual(prepare_sheet_values(data), [
+            ['Email Address', 'Unique ID', 'Mean Rating', 'Difference', 'Result'],
+            ['a@x.com', '1', '3.33', '-0.0', 'Ok'],
+            ['', '1.0', '', '0.0', 'Not ok'],
+            ['c@x.com', 'True', '2.67', '1e+16', 'Ok'],
+            ['a@x.com', 'ID4', '3.33', '', 'Ok'],
+        ])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,66 @@
+import logging
+import signal
+import threading
+
+"""Long-running polling loop with an adaptive interval."""
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_INTERVAL = 15.0
+DEFAULT_MAX_INTERVAL = 600.0
+DEFAULT_BACKOFF = 2.0
+
+class AdaptivePoller:
+    """Calls ``tick`` repeatedly, polling quickly while it reports changes and backing off when idle.
+
+    After a tick that changed something the next poll is ``min_interval`` away;
+    every idle or failed tick multiplies the interval by ``backoff`` up to
+    ``max_interval``. The loop ends as soon as ``stop`` is set, including while
+    waiting between ticks.
+    """
+
+    def __init__(self, min_interval=DEFAULT_MIN_INTERVAL, max_interval=DEFAULT_MAX_INTERVAL,
+                 backoff=DEFAULT_BACKOFF, stop=None):
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("Expected 0 < min_interval <= max_interval")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = max(1.0, backoff)
+        self.stop = stop or threading.Event()
+        self.interval = min_interval
+
+    def next_interval(self, changed):
+        """Update and return the wait before the next tick given whether this one changed anything."""
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+        return self.interval
+
+    def run(self, tick):
+        """Run ``tick`` until stopped; it returns True when it found and processed changes.
+
+        Exceptions from ``tick`` are logged and count as an idle tick, so one failed
+        poll does not end the loop. Returns the number of ticks run.
+        """
+        ticks = 0
+        while not self.stop.is_set():
+            try:
+                changed = bool(tick())
+            except Exception as e:
+                logger.error(f"Poll failed: {str(e)}", exc_info=True)
+                changed = False
+            ticks += 1
+            wait = self.next_interval(changed)
+            logger.info(f"Next poll in {wait:.1f}s")
+            self.stop.wait(wait)
+        logger.info(f"Stopped polling after {ticks} ticks")
+        return ticks
+
+def install_stop_handlers(stop, signals=(signal.SIGTERM, signal.SIGINT)):
+    """Set ``stop`` when the process receives any of ``signals`` (main thread only)."""
+    def handle(signum, frame):
+        logger.info(f"Received {signal.Signals(signum).name}, finishing the current poll and exiting")
+        stop.set()
+    for signum in signals:
+        signal.signal(signum, handle)
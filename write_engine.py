@@ -0,0 +1,286 @@
+from concurrent.futures import ThreadPoolExecutor
+import logging
+
+"""Batched, size-aware writes of tabular values to a Google Sheet."""
+
+logger = logging.getLogger(__name__)
+
+# Google recommends keeping request payloads under 2 MB
+DEFAULT_MAX_REQUEST_BYTES = 2 * 1024 * 1024
+DEFAULT_MAX_WORKERS = 4
+
+# Approximate JSON overhead of one cell ('{"userEnteredValue":{"stringValue":""}},') and one row
+_CELL_OVERHEAD_BYTES = 41
+_ROW_OVERHEAD_BYTES = 14
+
+def cell_data(cell):
+    """Return the CellData for one string cell; empty strings clear the cell."""
+    return {'userEnteredValue': {'stringValue': cell}} if cell != '' else {}
+
+def row_data(row):
+    """Return the RowData for one row of string cells."""
+    return {'values': [cell_data(cell) for cell in row]}
+
+def estimate_row_bytes(row):
+    """Cheaply estimate the serialized size of a row without encoding it."""
+    return _ROW_OVERHEAD_BYTES + sum(len(cell) + _CELL_OVERHEAD_BYTES for cell in row)
+
+def chunk_rows(rows, max_request_bytes=DEFAULT_MAX_REQUEST_BYTES, first_chunk_budget=None):
+    """Split rows into (offset, rows) chunks whose estimated size fits one request.
+
+    ``first_chunk_budget`` reserves room in the first chunk for other requests sent
+    alongside it. A single row larger than the limit still gets its own chunk.
+    """
+    chunks = []
+    start, size = 0, 0
+    budget = first_chunk_budget if first_chunk_budget is not None else max_request_bytes
+    for i, row in enumerate(rows):
+        row_bytes = estimate_row_bytes(row)
+        if i > start and size + row_bytes > budget:
+            chunks.append((start, rows[start:i]))
+            start, size, budget = i, 0, max_request_bytes
+        size += row_bytes
+    if start < len(rows):
+        chunks.append((start, rows[start:]))
+    return chunks
+
+def split_rows(rows, max_rows=None, key_index=None):
+    """Split data rows into ``(key, part, offset, rows)`` shards of at most ``max_rows`` rows.
+
+    With ``key_index`` rows are first grouped on the value in that column, in
+    order of first appearance and keeping their order within a group; otherwise
+    ``key`` is None. ``part`` counts the shards of one key from 1 and ``offset``
+    is the position of the shard's first row in the grouped order.
+    """
+    groups = {}
+    if key_index is None:
+        groups[None] = rows
+    else:
+        for row in rows:
+            groups.setdefault(row[key_index] if key_index < len(row) else '', []).append(row)
+    shards, offset = [], 0
+    for key, group in groups.items():
+        size = max_rows or len(group) or 1
+        for part, start in enumerate(range(0, len(group), size), start=1):
+            shards.append((key, part, offset + start, group[start:start + size]))
+        offset += len(group)
+    return shards
+
+def fetch_sheet_ids(service, spreadsheet_id, execute=None):
+    """Return the sheet ID of every tab of a spreadsheet, keyed on title.
+
+    ``execute`` runs the request as in SheetWriter (defaults to ``request.execute()``).
+    """
+    request = service.spreadsheets().get(spreadsheetId=spreadsheet_id, fields='sheets.properties(sheetId,title)')
+    spreadsheet = execute(request) if execute else request.execute()
+    return {sheet['properties']['title']: sheet['properties']['sheetId'] for sheet in spreadsheet.get('sheets', [])}
+
+def keyed_layout(old_keys, new_keys):
+    """Assign every new row a sheet slot, keeping rows whose key already exists in place.
+
+    Returns a list whose item ``slot`` is the index of the new row written to data
+    slot ``slot``. Rows whose key disappeared free their slot for inserted rows;
+    any slots still free are filled by moving rows from the end so the table stays
+    contiguous. Raises ValueError when either side has duplicate keys.
+    """
+    if len(set(old_keys)) != len(old_keys) or len(set(new_keys)) != len(new_keys):
+        raise ValueError("Keys must be unique to diff rows")
+    new_index = {key: i for i, key in enumerate(new_keys)}
+    old_set = set(old_keys)
+    layout = [new_index.get(key) for key in old_keys]
+    inserted = iter([i for i, key in enumerate(new_keys) if key not in old_set])
+
+    for slot, index in enumerate(layout):
+        if index is None:
+            layout[slot] = next(inserted, None)
+    layout.extend(inserted)
+
+    holes = [slot for slot, index in enumerate(layout) if index is None]
+    for hole in holes:
+        while layout and layout[-1] is None:
+            layout.pop()
+        if hole >= len(layout):
+            break
+        layout[hole] = layout.pop()
+    while layout and layout[-1] is None:
+        layout.pop()
+    return layout
+
+def diff_cells(old_rows, new_rows, width):
+    """Yield ``(row_offset, column_offset, cells)`` runs where ``new_rows`` differ from ``old_rows``.
+
+    Rows are compared cell by cell up to ``width`` columns, missing cells counting
+    as empty strings; each run covers consecutive changed cells of one row.
+    """
+    for row_offset, new_row in enumerate(new_rows):
+        old_row = old_rows[row_offset] if row_offset < len(old_rows) else []
+        run_start = None
+        for col in range(width + 1):
+            new_cell = new_row[col] if col < len(new_row) else ''
+            old_cell = old_row[col] if col < len(old_row) else ''
+            changed = col < width and new_cell != old_cell
+            if changed and run_start is None:
+                run_start = col
+            elif not changed and run_start is not None:
+                yield row_offset, run_start, [new_row[c] if c < len(new_row) else '' for c in range(run_start, col)]
+                run_start = None
+
+class SheetWriter:
+    """Writes whole tables to one sheet in as few batchUpdate calls as possible.
+
+    ``execute`` runs a prepared API request (defaults to ``request.execute()``) and
+    ``service_factory``, when given, supplies a service per worker thread so
+    independent chunks can be sent concurrently.
+    """
+
+    def __init__(self, service, spreadsheet_id, sheet_id=0, execute=None, service_factory=None,
+                 max_request_bytes=DEFAULT_MAX_REQUEST_BYTES, max_workers=DEFAULT_MAX_WORKERS):
+        self.service = service
+        self.spreadsheet_id = spreadsheet_id
+        self.sheet_id = sheet_id
+        self.execute = execute or (lambda request: request.execute())
+        self.service_factory = service_factory
+        self.max_request_bytes = max_request_bytes
+        self.max_workers = max_workers
+
+    def _batch_update(self, requests, service=None):
+        return self.execute((service or self.service).spreadsheets().batchUpdate(
+            spreadsheetId=self.spreadsheet_id,
+            body={'requests': requests}
+        ))
+
+    def _update_cells(self, row_offset, rows):
+        return {
+            'updateCells': {
+                'start': {'sheetId': self.sheet_id, 'rowIndex': row_offset, 'columnIndex': 0},
+                'rows': [row_data(row) for row in rows],
+                'fields': 'userEnteredValue'
+            }
+        }
+
+    def replace(self, values, extra_requests=(), before_requests=()):
+        """Replace the sheet contents with ``values`` (lists of strings, header first).
+
+        The first batchUpdate applies ``before_requests`` (e.g. adding the sheet),
+        clears the sheet, sizes the grid to the table, writes the first chunk and
+        applies ``extra_requests`` (e.g. formatting); remaining chunks follow
+        concurrently. Returns the number of batchUpdate calls made.
+        """
+        extra_requests = list(extra_requests)
+        before_requests = list(before_requests)
+        column_count = max((len(row) for row in values), default=1)
+        setup = [
+            {'updateCells': {'range': {'sheetId': self.sheet_id}, 'fields': 'userEnteredValue'}},
+            {'updateSheetProperties': {
+                'properties': {'sheetId': self.sheet_id,
+                               'gridProperties': {'rowCount': max(len(values), 1), 'columnCount': column_count}},
+                'fields': 'gridProperties(rowCount,columnCount)'
+            }}
+        ]
+        chunks = chunk_rows(values, self.max_request_bytes,
+                            first_chunk_budget=self.max_request_bytes - len(str(extra_requests + before_requests)))
+        first = before_requests + setup + ([self._update_cells(*chunks[0])] if chunks else []) + extra_requests
+        logger.info(f"Writing {len(values)} rows in {max(len(chunks), 1)} batch request(s)")
+        self._batch_update(first)
+        self._send_concurrently(chunks[1:])
+        return max(len(chunks), 1)
+
+    def _resize_rows(self, row_count):
+        return {
+            'updateSheetProperties': {
+                'properties': {'sheetId': self.sheet_id, 'gridProperties': {'rowCount': row_count}},
+                'fields': 'gridProperties.rowCount'
+            }
+        }
+
+    def patch(self, updates, row_count=None):
+        """Overwrite rows at fixed positions in a minimal number of batchUpdate calls.
+
+        ``updates`` is an iterable of ``(row_offset, row)`` pairs (0-based sheet row);
+        consecutive offsets are merged into one updateCells request. ``row_count``
+        first sets the grid to that many rows, so rows past the current end fit.
+        Every request names absolute positions, so a batch re-sent after a retry
+        or a failed run writes the same cells again instead of duplicating rows.
+        Returns the number of batchUpdate calls made.
+        """
+        runs = []
+        for row_offset, row in sorted(updates, key=lambda update: update[0]):
+            if runs and row_offset == runs[-1][0] + len(runs[-1][1]):
+                runs[-1][1].append(row)
+            else:
+                runs.append((row_offset, [row]))
+
+        sized_requests = [(120, self._resize_rows(row_count))] if row_count is not None else []
+        for run_start, rows in runs:
+            for offset, chunk in chunk_rows(rows, self.max_request_bytes):
+                sized_requests.append((sum(map(estimate_row_bytes, chunk)),
+                                       self._update_cells(run_start + offset, chunk)))
+
+        # The grid is resized by the first batch, before any row past the old end is written
+        return self._send_sized(sized_requests)
+
+    def write_rows(self, row_offset, rows):
+        """Write ``rows`` from sheet row ``row_offset`` (0-based) on, sizing the grid to end with them."""
+        return self.patch(enumerate(rows, start=row_offset), row_count=row_offset + len(rows))
+
+    def _send_sized(self, sized_requests):
+        """Pack ``(bytes, request)`` pairs into size-bounded batches and send them in order."""
+        batches, size = [], 0
+        for request_bytes, request in sized_requests:
+            if not batches or size + request_bytes > self.max_request_bytes:
+                batches.append([])
+                size = 0
+            batches[-1].append(request)
+            size += request_bytes
+        for requests in batches:
+            self._batch_update(requests)
+        return len(batches)
+
+    def apply_diff(self, old_values, new_values):
+        """Rewrite only the cells of ``old_values`` that differ from ``new_values``.
+
+        Both tables are lists of string rows with the header first. The grid grows
+        when the new table is longer and rows left over from a shorter table are
+        cleared. Returns ``(changed_cells, batch_calls)``.
+        """
+        width = max((len(row) for row in new_values + old_values), default=0)
+        sized_requests = []
+        if len(new_values) > len(old_values):
+            sized_requests.append((64, {'appendDimension': {
+                'sheetId': self.sheet_id, 'dimension': 'ROWS', 'length': len(new_values) - len(old_values)
+            }}))
+
+        changed_cells = 0
+        for row_offset, column_offset, cells in diff_cells(old_values, new_values, width):
+            changed_cells += len(cells)
+            sized_requests.append((estimate_row_bytes(cells) + 120, {'updateCells': {
+                'range': {'sheetId': self.sheet_id,
+                          'startRowIndex': row_offset, 'endRowIndex': row_offset + 1,
+                          'startColumnIndex': column_offset, 'endColumnIndex': column_offset + len(cells)},
+                'rows': [row_data(cells)],
+                'fields': 'userEnteredValue'
+            }}))
+
+        if len(old_values) > len(new_values):
+            changed_cells += sum(len(row) for row in old_values[len(new_values):])
+            sized_requests.append((120, {'updateCells': {
+                'range': {'sheetId': self.sheet_id,
+                          'startRowIndex': len(new_values), 'endRowIndex': len(old_values)},
+                'fields': 'userEnteredValue'
+            }}))
+
+        logger.info(f"Diff touches {changed_cells} cells in {len(sized_requests)} ranges")
+        return changed_cells, self._send_sized(sized_requests)
+
+    def _send_concurrently(self, chunks):
+        """Write ``(offset, rows)`` chunks, building each request only when it is sent."""
+        if not chunks:
+            return
+        if self.service_factory is None or self.max_workers <= 1 or len(chunks) == 1:
+            for chunk in chunks:
+                self._batch_update([self._update_cells(*chunk)])
+            return
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as executor:
+            # list() re-raises the first failure
+            list(executor.map(lambda chunk: self._batch_update([self._update_cells(*chunk)], self.service_factory()),
+                              chunks))